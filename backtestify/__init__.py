@@ -1,19 +1,54 @@
 from backtestify.account import Account
+from backtestify.analytics import Analytics
+from backtestify.bar_costs import BarCosts
+from backtestify.bar_data import BarData
+from backtestify.bar_window import BarWindow
 from backtestify.backtester import Backtester
 from backtestify.financial_instrument import FinancialInstrument
 from backtestify.cfd import CFD
+from backtestify.compiled_backtester import CompiledBacktester
+from backtestify.cost_model import CostModel
 from backtestify.event_execution_context import EventExecutionContext
-from backtestify.event_execution_strategy import EventExecutionStrategy
+from backtestify.event_execution_strategy import EventExecutionStrategy, PositionBookExecutionStrategy
+from backtestify.event_registry import EventRegistry
 from backtestify.event_type import EventType
 from backtestify.event import Event
+from backtestify.event_store import EventStore
+from backtestify.execution_result import ExecutionResult
+from backtestify.history import History
 from backtestify.instrument_type import InstrumentType
+from backtestify.instrumentation import Instrumentation
+from backtestify.intrabar_resolver import IntrabarResolver
+from backtestify.journal import Journal
+from backtestify.journal_reader import JournalReader
+from backtestify.monte_carlo import MonteCarlo
+from backtestify.monte_carlo_result import MonteCarloResult
+from backtestify.multi_strategy_runner import MultiStrategyRunner
+from backtestify.optimizer import Optimizer, optimize
+from backtestify.order import Order
+from backtestify.order_book import OrderBook
+from backtestify.paper_trader import PaperTrader
+from backtestify.portfolio_backtester import PortfolioBacktester
+from backtestify.position import Position
+from backtestify.position_book import PositionBook
+from backtestify.price_store import PriceStore
+from backtestify.record_store import RecordStore
+from backtestify.replay_feed import ReplayFeed
+from backtestify.replay_server import ReplayServer
+from backtestify.result_cache import ResultCache
+from backtestify.shared_frame import SharedFrame
 from backtestify.signal_event import SignalEvent
 from backtestify.signal_type import SignalType
 from backtestify.strategy import Strategy
+from backtestify.timeframe import Timeframe
 from backtestify.trade_executor import TradeExecutor
 from backtestify.trade import Trade
 from backtestify.trade_state import TradeState
+from backtestify.trade_state_store import TradeStateStore
+from backtestify.trade_store import TradeStore
 from backtestify.backtester import Backtester
+from backtestify.vectorized_backtester import VectorizedBacktester
+from backtestify.walk_forward import WalkForward
 
 
 # from backtestify import financial_instrument
@@ -0,0 +1,116 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+class Analytics:
+    """
+    The Analytics class computes the performance metrics of a backtest from its equity at the end of every bar
+    and the profit of its closed positions. Every metric is computed with array operations the first time it is
+    accessed and memoized, so reports reading the same metric many times pay for it once.
+
+    Attributes:
+        equity (pandas.Series): The equity at the end of every bar.
+        trade_profits (numpy.ndarray): The profit of every closed position.
+        initial_balance (float): The balance of the account before the backtest.
+        positions (numpy.ndarray, optional): Whether a position is open at the end of every bar. Defaults to None.
+        periods_per_year (int): The number of bars per year, used to annualize the ratios. Defaults to 252.
+    """
+
+    def __init__(self, equity, trade_profits, initial_balance, positions=None, periods_per_year=252):
+        """
+        Initializes a new instance of the Analytics class.
+
+        Args:
+            equity (pandas.Series or array-like): The equity at the end of every bar.
+            trade_profits (array-like): The profit of every closed position.
+            initial_balance (float): The balance of the account before the backtest.
+            positions (array-like, optional): Whether a position is open at the end of every bar. Defaults to None.
+            periods_per_year (int, optional): The number of bars per year. Defaults to 252.
+        """
+        self.equity = equity if isinstance(equity, pd.Series) else pd.Series(np.asarray(equity, dtype=float), name="equity")
+        self.trade_profits = np.asarray(trade_profits, dtype=float)
+        self.initial_balance = initial_balance
+        self.positions = None if positions is None else np.asarray(positions, dtype=bool)
+        self.periods_per_year = periods_per_year
+
+    @cached_property
+    def equity_values(self):
+        return self.equity.to_numpy(dtype=float)
+
+    @cached_property
+    def returns(self):
+        equity = self.equity_values
+        return np.diff(equity) / equity[:-1]
+
+    @cached_property
+    def drawdown(self):
+        equity = self.equity_values
+        running_max = np.maximum.accumulate(equity)
+        drawdown = np.divide(running_max - equity, running_max, out=np.zeros_like(equity), where=running_max > 0)
+
+        return pd.Series(drawdown, index=self.equity.index, name="drawdown")
+
+    @cached_property
+    def net_profit(self):
+        return self.equity_values[-1] - self.initial_balance if len(self.equity_values) else 0.0
+
+    @cached_property
+    def total_return(self):
+        return self.net_profit / self.initial_balance if self.initial_balance else np.nan
+
+    @cached_property
+    def max_drawdown(self):
+        return self.drawdown.to_numpy().max() if len(self.drawdown) else 0.0
+
+    @cached_property
+    def sharpe_ratio(self):
+        returns_std = self.returns.std() if len(self.returns) else 0
+
+        return self.returns.mean() / returns_std * np.sqrt(self.periods_per_year) if returns_std > 0 else np.nan
+
+    @cached_property
+    def sortino_ratio(self):
+        downside_deviation = np.sqrt(np.mean(np.minimum(self.returns, 0) ** 2)) if len(self.returns) else 0
+
+        return self.returns.mean() / downside_deviation * np.sqrt(self.periods_per_year) if downside_deviation > 0 else np.nan
+
+    @cached_property
+    def trades(self):
+        return len(self.trade_profits)
+
+    @cached_property
+    def win_rate(self):
+        return np.mean(self.trade_profits > 0) if self.trades else np.nan
+
+    @cached_property
+    def profit_factor(self):
+        gross_profit = self.trade_profits[self.trade_profits > 0].sum()
+        gross_loss = -self.trade_profits[self.trade_profits < 0].sum()
+
+        if gross_loss > 0:
+            return gross_profit / gross_loss
+
+        return np.inf if gross_profit > 0 else np.nan
+
+    @cached_property
+    def exposure(self):
+        if self.positions is None or not len(self.positions):
+            return np.nan
+
+        return self.positions.mean()
+
+    @cached_property
+    def metrics(self):
+        return {
+            "net_profit": self.net_profit,
+            "total_return": self.total_return,
+            "max_drawdown": self.max_drawdown,
+            "sharpe_ratio": self.sharpe_ratio,
+            "sortino_ratio": self.sortino_ratio,
+            "trades": self.trades,
+            "win_rate": self.win_rate,
+            "profit_factor": self.profit_factor,
+            "exposure": self.exposure,
+        }
@@ -1,81 +1,559 @@
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
 import pandas as pd
 
+from backtestify.analytics import Analytics
 from backtestify.trade_state import TradeState
 from backtestify.event_execution_context import EventExecutionContext
-from backtestify.event_execution_strategy import SignalEventExecutionStrategy
-from backtestify.signal_event import SignalEvent
-from backtestify.trade import Trade
+from backtestify.event_execution_strategy import PositionBookExecutionStrategy, SignalEventExecutionStrategy
+from backtestify.event_registry import EventRegistry
+from backtestify.event_store import EventStore
+from backtestify.event_type import EventType
+from backtestify.order_book import OrderBook
+from backtestify.position_book import PositionBook
+from backtestify.record_store import RecordStore
+from backtestify.signal_type import SignalType
+from backtestify.trade_state_store import TradeStateStore
+from backtestify.trade_store import TradeStore
 
 
 class Backtester:
-    def __init__(self, strategy, instrument, account):
+    checkpoint_version = 2
+
+    def __init__(
+        self,
+        strategy,
+        instrument,
+        account,
+        record_store=False,
+        intrabar_resolver=None,
+        instrumentation=None,
+        cost_model=None,
+        hedging=False,
+        checkpoint_path=None,
+        checkpoint_bars=None,
+        checkpoint_seconds=None,
+        result_cache=None,
+        journal=None,
+        keep_results=True,
+        event_registry=None,
+    ):
         self.strategy = strategy
         self.instrument = instrument
         self.account = account
+        # With record_store the events and trade states are kept as rows of record arrays, not as objects
+        self.record_store = record_store
+        # Resolves the fill order of the stop loss and take profit touched in the same bar
+        self.intrabar_resolver = intrabar_resolver
+        # Times the stages of the runs and calls their hooks, the instrumented code paths are only taken when set
+        self.instrumentation = instrumentation
+        # Computes the costs of every bar once per run, the instrument costs are used without it
+        self.cost_model = cost_model
+        self.bar_costs = None
+        # The pending orders of the run
+        self.order_book = OrderBook()
+        # With hedging the symbol holds any number of long and short positions in a position book
+        self.hedging = hedging
+        self.position_book = PositionBook() if hedging else None
+        # The execution context of the events of a run, created again when a run starts
+        self.context = self.create_context()
+        # The execution strategy of every event type, created once, the signal events are executed against the
+        # position book with hedging. The registry is copied, a registry shared by backtesters is left as it is
+        self.event_registry = EventRegistry(event_registry.execution_strategies if event_registry is not None else None)
+
+        if EventType.SIGNAL not in self.event_registry:
+            self.event_registry.register(EventType.SIGNAL, PositionBookExecutionStrategy() if hedging else SignalEventExecutionStrategy())
+        # With a checkpoint path the bars are executed as they are generated and the state of the run is saved
+        # every checkpoint_bars bars and/or checkpoint_seconds seconds, so it can be resumed
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_bars = checkpoint_bars
+        self.checkpoint_seconds = checkpoint_seconds
+        # A run already in the result cache is restored from it instead of being run again
+        self.result_cache = result_cache
+        # The journal writes the trades and trade states to disk as they are produced, without keep_results they
+        # are only in the journal and the backtester keeps its counters
+        if not keep_results and journal is None:
+            raise ValueError("A backtester that doesn't keep its results needs a journal.")
+
+        self.journal = journal
+        self.keep_results = keep_results
+        self.event_count = 0
+        # The number of events executed before the run was resumed, the list of trade states starts after them
+        self.event_offset = 0
         self.events = []
         self.trading_state = []
         self.trades = []
         self.current_trade_state = None
+        self.event_store = None
+        self.trade_store = None
+        self.initial_balance = account.balance
+        # The results and analytics of the last run, with the key of the run they were built for
+        self.results_cache = None
+        self.analytics_cache = None
+        # The equity at the end of every bar of a run restored from the result cache, with the key of the run
+        self.cached_bar_states = None
 
     def run(self):
-        events = self.strategy.generate_signals()
-        print(f'Generated {len(events)} events')
-        self.events.extend(events)
-        self.execute()
-
-    def execute(self):
-        self.trading_state = [None] * len(self.events)
-
-        for current_bar, event in enumerate(self.events):
-            execution_strategy = self.get_execution_strategy(event)
-            context = EventExecutionContext(
-                instrument=self.instrument, 
-                balance=self.account.balance, 
-                current_trade_state=self.current_trade_state, 
-                current_bar=current_bar
-            )
+        # Without keep_results the events of a bar are released once executed, the run never holds all of them
+        if self.checkpoint_path is not None or not self.keep_results:
+            return self.run_bars()
+
+        # An instrumented run measures the run itself and a journaled run writes its journal, neither is restored
+        cache_key = None
+
+        if self.result_cache is not None and self.instrumentation is None and self.journal is None:
+            cache_key = self.result_cache.get_key(self)
+
+            if self.result_cache.load(cache_key, self):
+                return None
+
+        self.start_run()
+
+        try:
+            events = self.strategy.generate_signals()
+
+            if self.instrumentation is not None:
+                self.instrumentation.count("events", len(events))
+
+            if self.record_store:
+                self.execute(events)
+                # The events are now rows of the event store, release the objects
+                events.clear()
+            else:
+                self.events.extend(events)
+                self.execute()
+        except BaseException:
+            self.abort_run()
+            raise
+
+        self.end_run()
+
+        if cache_key is not None:
+            self.result_cache.save(cache_key, self)
+
+    def run_bars(self, checkpoint=None):
+        """
+        Runs the strategy executing the events of every bar as soon as they are generated, saving a checkpoint
+        when it is due. With a checkpoint, the run continues after the last bar it saved.
+        """
+        strategy = self.strategy
+
+        if not hasattr(strategy, "on_tick"):
+            raise NotImplementedError("Subclasses should implement a on_tick method.")
+
+        self.start_bars(checkpoint)
+        execute_event = self.get_event_executor()
+        last_checkpoint_bar = strategy.start_bar
+        last_checkpoint_time = time.monotonic()
+
+        try:
+            for events in strategy.iter_bar_events(strategy.on_tick):
+                self.execute_bar(events, execute_event)
+                bars = strategy.current_index + 1 - last_checkpoint_bar
+
+                if (self.checkpoint_bars is not None and bars >= self.checkpoint_bars) or (
+                    self.checkpoint_seconds is not None
+                    and time.monotonic() - last_checkpoint_time >= self.checkpoint_seconds
+                ):
+                    self.save_checkpoint()
+                    last_checkpoint_bar = strategy.current_index + 1
+                    last_checkpoint_time = time.monotonic()
+        except BaseException:
+            self.abort_run()
+            raise
+
+        if self.instrumentation is not None:
+            self.instrumentation.count("events", self.event_count - self.event_offset)
+
+        self.end_run()
+
+    def start_bars(self, checkpoint=None):
+        """
+        Starts a run whose events are executed bar by bar with execute_bar, from a checkpoint when given.
+        """
+        self.start_run(None if checkpoint is None else checkpoint.get("journal"))
+        self.initial_balance = self.account.balance if checkpoint is None else checkpoint["initial_balance"]
+        self.create_stores()
+        self.events = []
+        self.event_count = 0
+
+        if not self.record_store:
+            self.trading_state = [] if self.keep_results else None
+
+        if checkpoint is not None:
+            self.order_book = checkpoint["order_book"]
+            self.position_book = checkpoint["position_book"]
+            self.restore_trades(checkpoint["trades"])
+            self.event_count = checkpoint["event_count"]
+            self.context = self.create_context()
+
+        self.event_offset = self.event_count
+
+    def execute_bar(self, events, execute_event):
+        if self.keep_results and not self.record_store:
+            self.events.extend(events)
+            self.trading_state.extend([None] * len(events))
+
+        for event in events:
+            execute_event(event, self.event_count)
+            self.event_count += 1
+
+    def save_checkpoint(self, path=None):
+        """
+        Saves the state of the run after the last executed bar: the next bar, the strategy state, the current
+        trade state, the pending orders, the open positions, the account and the trades. The events and trade states of the executed bars are not saved,
+        so the size of a checkpoint only grows with the number of trades.
+
+        Args:
+            path (str, optional): The file of the checkpoint. Defaults to checkpoint_path.
+        """
+        path = path or self.checkpoint_path
+        trade_state = self.current_trade_state
+        checkpoint = {
+            "version": self.checkpoint_version,
+            "next_bar": self.strategy.current_index + 1,
+            "event_count": self.event_count,
+            "initial_balance": self.initial_balance,
+            "balance": self.account.balance,
+            "equity": self.account.equity,
+            "trade_state": None if trade_state is None else {slot: getattr(trade_state, slot) for slot in TradeState.__slots__},
+            "strategy_state": self.strategy.get_state(),
+            "order_book": self.order_book,
+            "position_book": self.position_book,
+            "trades": self.trade_store.view().copy(),
+            # The journal rows of the executed bars are on disk, a resumed run appends to them
+            "journal": None if self.journal is None else self.journal.get_state(),
+        }
+
+        # Written next to the target and renamed, a run dying while saving keeps the previous checkpoint
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+
+        with os.fdopen(descriptor, "wb") as file:
+            pickle.dump(checkpoint, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def load_checkpoint(path):
+        with open(path, "rb") as file:
+            checkpoint = pickle.load(file)
+
+        if checkpoint.get("version") != Backtester.checkpoint_version:
+            raise ValueError(f"Unsupported checkpoint version {checkpoint.get('version')}.")
+
+        return checkpoint
+
+    def resume(self, path=None):
+        """
+        Continues the run saved in a checkpoint from the bar after the last one it executed, with the same
+        strategy class and parameters, instrument and market info as the run that saved it. The trades and the
+        account end as in an uninterrupted run, the events and trade states only cover the resumed bars and the
+        journal continues with the rows of the bars executed before the checkpoint.
+
+        Args:
+            path (str, optional): The file of the checkpoint. Defaults to checkpoint_path.
+        """
+        checkpoint = self.load_checkpoint(path or self.checkpoint_path)
+        strategy = self.strategy
+
+        self.account.set_balance(checkpoint["balance"])
+        self.account.set_equity(checkpoint["equity"])
+        self.current_trade_state = None
+
+        if checkpoint["trade_state"] is not None:
+            self.current_trade_state = TradeState(balance=checkpoint["balance"])
+
+            for slot, value in checkpoint["trade_state"].items():
+                setattr(self.current_trade_state, slot, value)
+
+        strategy.set_state(checkpoint["strategy_state"])
+        strategy.start_bar = checkpoint["next_bar"]
+        strategy.resumed = True
+        self.run_bars(checkpoint)
+
+    def restore_trades(self, trades):
+        self.trade_store.reserve(len(trades))
+        self.trade_store.records[:len(trades)] = trades
+        self.trade_store.size = len(trades)
+        self.trades = [self.trade_store[index] for index in range(len(trades))]
+
+    def start_run(self, journal_state=None):
+        if self.instrumentation is not None:
+            self.instrumentation.start_run()
+
+        self.order_book = OrderBook()
+
+        if self.journal is not None:
+            self.journal.open(journal_state)
+
+        if self.hedging:
+            self.position_book = PositionBook()
+
+        if self.cost_model is not None:
+            self.bar_costs = self.cost_model.compute(self.strategy.prices_info, self.instrument)
+
+        self.strategy.instrumentation = self.instrumentation
+        self.context = self.create_context()
+
+    def end_run(self):
+        if self.journal is not None:
+            self.journal.close()
+
+        if self.instrumentation is not None:
+            self.instrumentation.end_run()
 
-            response = execution_strategy.execute(event, context)
+    def abort_run(self):
+        # The journal of a failed run keeps the rows written before the error, its writer thread is stopped
+        if self.journal is not None:
+            try:
+                self.journal.close()
+            except RuntimeError:
+                pass
 
-            self.handle_execution_response(response, current_bar, execution_strategy)
+    def run_stream(self, bars, lookback=1000):
+        """
+        Runs the strategy on a stream of bars, every event is executed as soon as the strategy generates it.
+        Only the last `lookback` bars, the current trade state and the trades are kept in memory. The events
+        and trade states are recorded in the stores when record_store is set, otherwise they are discarded.
+
+        Args:
+            bars (iterable): Single bars (dict, pandas.Series) or chunks of bars (pandas.DataFrame).
+            lookback (int, optional): The number of bars in the history passed to on_tick. Defaults to 1000.
+        """
+        if self.cost_model is not None:
+            raise ValueError("The costs of a cost model are computed from the whole market info, not from a stream.")
+
+        current_bar = 0
+        self.event_offset = 0
+        self.trade_store = None
+        self.trading_state = None
+        self.initial_balance = self.account.balance
+        self.start_run()
+        execute_event = self.get_event_executor()
+
+        try:
+            for events in self.strategy.stream_signals(bars, lookback):
+                if self.trade_store is None:
+                    self.create_stores()
+
+                for event in events:
+                    execute_event(event, current_bar)
+                    current_bar += 1
+        except BaseException:
+            self.abort_run()
+            raise
+
+        if self.instrumentation is not None:
+            self.instrumentation.count("events", current_bar)
+
+        self.end_run()
+
+    def create_stores(self, capacity=1024):
+        bars = getattr(self.strategy, "bars", None)
+        timestamp_dtype = RecordStore.get_timestamp_dtype(bars.timestamp_values if bars is not None else None)
+        self.trade_store = TradeStore(timestamp_dtype=timestamp_dtype)
+
+        if self.record_store:
+            self.event_store = EventStore(timestamp_dtype=timestamp_dtype, capacity=capacity)
+            self.trading_state = TradeStateStore(capacity=capacity)
+
+    def execute(self, events=None):
+        events = self.events if events is None else events
+        self.initial_balance = self.account.balance
+        self.event_offset = 0
+        self.create_stores(capacity=len(events))
+
+        if not self.record_store:
+            self.trading_state = [None] * len(events) if self.keep_results else None
+
+        execute_event = self.get_event_executor()
+
+        for current_bar, event in enumerate(events):
+            execute_event(event, current_bar)
+
+    def get_event_executor(self):
+        return self.execute_event if self.instrumentation is None else self.execute_instrumented_event
+
+    def execute_event(self, event, current_bar):
+        result = self.get_event_result(event, current_bar)
+
+        if self.record_store and self.keep_results:
+            self.event_store.append_event(event)
+
+        self.handle_execution_result(result, current_bar)
+
+        if self.journal is not None:
+            self.journal.write_state(current_bar, event, self.current_trade_state)
+
+    def execute_instrumented_event(self, event, current_bar):
+        instrumentation = self.instrumentation
+        start = instrumentation.clock()
+        result = self.get_event_result(event, current_bar)
+        execute_end = instrumentation.clock()
+
+        if self.record_store and self.keep_results:
+            self.event_store.append_event(event)
+
+        self.handle_execution_result(result, current_bar)
+
+        if self.journal is not None:
+            self.journal.write_state(current_bar, event, self.current_trade_state)
+
+        end = instrumentation.clock()
+
+        instrumentation.add_time("execute", execute_end - start)
+        instrumentation.add_time("handle_response", end - execute_end)
+
+    def create_context(self):
+        # Created once per run, only the fields that change from an event to the next are set before each one
+        return EventExecutionContext(
+            instrument=self.instrument,
+            intrabar_resolver=self.intrabar_resolver,
+            bar_costs=self.bar_costs,
+            order_book=self.order_book,
+            position_book=self.position_book,
+        )
+
+    def get_event_result(self, event, current_bar):
+        context = self.context
+        context.balance = self.account.balance
+        context.current_trade_state = self.current_trade_state
+        context.current_bar = current_bar
+
+        return self.get_execution_strategy(event).execute(event, context)
 
     def get_execution_strategy(self, event):
-        if isinstance(event, SignalEvent):
-            return SignalEventExecutionStrategy()
-        else:
-            raise NotImplementedError("Unknown event type")
+        return self.event_registry.get_execution_strategy(event.event_type)
+
+    def handle_execution_result(self, result, current_bar):
+        trade_state = result.trade_state
 
-    def handle_execution_response(self, response, current_bar, execution_strategy):
-        if isinstance(execution_strategy, SignalEventExecutionStrategy):
-            self.handle_signal_event_execution_response(response, current_bar)
+        if trade_state is None:
+            # An event that doesn't change the trade state records the current one, every event has a state
+            trade_state = self.current_trade_state
         else:
-            raise NotImplementedError("Unknown execution strategy")
-        
-    def handle_signal_event_execution_response(self, response, current_bar):
-        if response is None:
-            return
-
-        # If is not a list or tuple, convert it to a list
-        if not isinstance(response, (list, tuple)):
-            response = [response]
-
-        for res in response:
-            if isinstance(res, TradeState):
-                self.trading_state[current_bar] = res
-                self.current_trade_state = res
-                self.account.set_equity(res.equity)
-                self.account.set_balance(res.balance)
-            elif isinstance(res, Trade):
-                self.trades.append(res)
+            self.current_trade_state = trade_state
+            self.account.set_equity(trade_state.equity)
+            self.account.set_balance(trade_state.balance)
+
+        if self.keep_results and trade_state is not None:
+            if self.record_store:
+                self.trading_state.append_trade_state(trade_state)
+            elif self.trading_state is not None:
+                self.trading_state[current_bar - self.event_offset] = trade_state
+
+        for trade in result.trades:
+            if self.keep_results:
+                self.trades.append(trade)
+                self.trade_store.append_trade(trade)
+
+            if self.journal is not None:
+                self.journal.write_trade(trade)
+
+            if self.instrumentation is not None:
+                self.instrumentation.fill(trade)
+
+    def get_run_key(self):
+        # Changes when a new run starts or the current one executes more events
+        trading_state = self.trading_state
+
+        return (
+            self.trade_store,
+            len(self.trade_store) if self.trade_store is not None else 0,
+            id(trading_state),
+            len(trading_state) if trading_state is not None else 0,
+        )
 
     @property
     def results(self):
-        trades = []
+        # Built once per run from the trade store, every access returns the same DataFrame
+        run_key = self.get_run_key()
+
+        if self.results_cache is None or self.results_cache[0] != run_key:
+            self.results_cache = (run_key, self.trade_store.to_frame())
+
+        return self.results_cache[1]
+
+    def get_bar_states(self):
+        """
+        Returns the timestamps, equity and whether a position is open after the last event of every bar.
+        """
+        if not self.keep_results:
+            raise ValueError("A backtester with keep_results=False keeps no trade states, they are in its journal.")
+
+        if self.cached_bar_states is not None and self.cached_bar_states[0] == self.get_run_key():
+            return self.cached_bar_states[1]
+
+        if self.record_store:
+            events = self.event_store.view()
+            states = self.trading_state.view()
+            last_events = self.get_last_events(events["bar"])
 
-        for trade in self.trades:
-            trades.append(trade.__dict__)
+            return (
+                events["timestamp"][last_events],
+                states["equity"][last_events],
+                np.isin(states["signal"][last_events], [SignalType.BUY.value, SignalType.SELL.value]),
+            )
+
+        if not self.trading_state or len(self.events) != len(self.trading_state):
+            raise ValueError("The trade states of every event are only kept by run() or with record_store.")
+
+        bars = np.fromiter((event.bar for event in self.events), dtype=np.int64, count=len(self.events))
+        last_events = self.get_last_events(bars)
+        states = [self.trading_state[event] for event in last_events]
+
+        return (
+            [self.events[event].timestamp for event in last_events],
+            np.array([state.equity for state in states], dtype=float),
+            np.array([state.signal in [SignalType.BUY, SignalType.SELL] for state in states], dtype=bool),
+        )
+
+    def get_closing_trades(self):
+        """
+        Returns the positions of the trades closing a position in the trade store.
+        """
+        signals = self.trade_store.view()["signal"]
+
+        if self.hedging:
+            # The positions open and close in any order, the closing trades are the ones that are not entries
+            return np.flatnonzero(~np.isin(signals, [SignalType.BUY.value, SignalType.SELL.value]))
+
+        # Every position is a trade opening it followed by a trade closing it
+        return np.arange(1, len(signals), 2)
 
-        df_trades = pd.DataFrame(trades)
-        df_trades = df_trades.set_index('timestamp')
+    @staticmethod
+    def get_last_events(bars):
+        return np.flatnonzero(np.append(bars[1:] != bars[:-1], True)) if len(bars) else np.array([], dtype=np.int64)
 
-        return df_trades
+    def get_analytics(self, periods_per_year=252):
+        """
+        Returns the Analytics of the last run, built from the equity at the end of every bar and the profit of
+        the closed positions. It is memoized until the run changes.
+
+        Args:
+            periods_per_year (int, optional): The number of bars per year. Defaults to 252.
+        """
+        analytics_key = (self.get_run_key(), periods_per_year)
+
+        if self.analytics_cache is None or self.analytics_cache[0] != analytics_key:
+            timestamps, equity, positions = self.get_bar_states()
+            self.analytics_cache = (
+                analytics_key,
+                Analytics(
+                    equity=pd.Series(equity, index=pd.Index(timestamps, name="timestamp"), name="equity"),
+                    trade_profits=self.trade_store.view()["profit"][self.get_closing_trades()],
+                    initial_balance=self.initial_balance,
+                    positions=positions,
+                    periods_per_year=periods_per_year,
+                ),
+            )
+
+        return self.analytics_cache[1]
+
+    @property
+    def analytics(self):
+        return self.get_analytics()
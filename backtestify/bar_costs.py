@@ -0,0 +1,34 @@
+class BarCosts:
+    """
+    The BarCosts class holds the trading costs of every bar of a run, computed once by a CostModel. The costs are
+    kept as lists of floats so the execution of an event reads the costs of its bar by position.
+
+    Attributes:
+        spread_points (list): The spread of every bar in price units, slippage included.
+        commission (list): The commission of a position closed in every bar.
+        swap_long (list): The swap of a long position held through every bar.
+        swap_short (list): The swap of a short position held through every bar.
+        days_per_year (float): The number of days the swap is divided by.
+    """
+
+    __slots__ = ("spread_points", "commission", "swap_long", "swap_short", "days_per_year")
+
+    def __init__(self, spread_points, commission, swap_long, swap_short, days_per_year):
+        """
+        Initializes a new instance of the BarCosts class.
+
+        Args:
+            spread_points (numpy.ndarray): The spread of every bar in price units.
+            commission (numpy.ndarray): The commission of a position closed in every bar.
+            swap_long (numpy.ndarray): The swap of a long position of every bar.
+            swap_short (numpy.ndarray): The swap of a short position of every bar.
+            days_per_year (float): The number of days the swap is divided by.
+        """
+        self.spread_points = spread_points.tolist()
+        self.commission = commission.tolist()
+        self.swap_long = swap_long.tolist()
+        self.swap_short = swap_short.tolist()
+        self.days_per_year = days_per_year
+
+    def __len__(self):
+        return len(self.spread_points)
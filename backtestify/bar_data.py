@@ -0,0 +1,54 @@
+import numpy as np
+
+
+class BarData:
+    """
+    The BarData class is a columnar view of the market info. Every column is converted once to a
+    contiguous NumPy array so a bar can be read by position without slicing the DataFrame.
+
+    Attributes:
+        columns (dict): The NumPy array of every column of the market info, by column name.
+        timestamps (pandas.Index or pandas.api.extensions.ExtensionArray): The timestamps of the bars taken from the
+            'timestamp' index or column, None if the market info doesn't have them.
+        timestamp_values (numpy.ndarray): The timestamps as a NumPy array, None if the market info doesn't have them.
+    """
+
+    def __init__(self, prices_info):
+        """
+        Initializes a new instance of the BarData class.
+
+        Args:
+            prices_info (pandas.DataFrame): The market info of the strategy.
+        """
+        self.prices_info = prices_info
+        self.columns = {
+            column: np.ascontiguousarray(prices_info[column].to_numpy())
+            for column in prices_info.columns
+        }
+
+        if prices_info.index.name == "timestamp":
+            self.timestamps = prices_info.index
+        elif "timestamp" in prices_info.columns:
+            self.timestamps = prices_info["timestamp"].array
+        else:
+            self.timestamps = None
+
+        self.timestamp_values = np.asarray(self.timestamps) if self.timestamps is not None else None
+
+    def __len__(self):
+        return len(self.prices_info)
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def to_frame(self, start, end):
+        return self.prices_info.iloc[start:end]
+
+    def get_timestamp(self, index):
+        if self.timestamps is None:
+            raise ValueError("The market info must have a 'timestamp' column or index.")
+
+        return self.timestamps[index]
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+
+
+class BarWindow:
+    """
+    The BarWindow class is the columnar view of the market info used when the bars are streamed. It keeps
+    only the last `lookback` bars in fixed size NumPy buffers, twice the lookback long, so the memory doesn't
+    grow with the number of bars. When a buffer is full the last bars are moved to its start, the windows
+    read by the History stay contiguous views.
+
+    It has the same interface as BarData for the Strategy, the position of a bar is its row in the buffers.
+
+    Attributes:
+        lookback (int): The number of bars kept, including the current one. At least 2.
+        capacity (int): The number of rows of the buffers.
+        columns (dict): The buffer of every column, by column name.
+        timestamp_values (numpy.ndarray): The buffer of the timestamps, None if the bars don't have them.
+        end (int): The number of rows in use.
+    """
+
+    def __init__(self, lookback, columns, timestamps=None):
+        """
+        Initializes a new instance of the BarWindow class.
+
+        Args:
+            lookback (int): The number of bars to keep, including the current one.
+            columns (dict): The first bars by column name, used to create the buffers.
+            timestamps (numpy.ndarray, optional): The timestamps of the first bars. Defaults to None.
+        """
+        self.lookback = max(lookback, 2)
+        self.capacity = 2 * self.lookback
+        self.columns = {
+            column: np.empty(self.capacity, dtype=values.dtype)
+            for column, values in columns.items()
+        }
+        self.timestamp_values = np.empty(self.capacity, dtype=timestamps.dtype) if timestamps is not None else None
+        self.end = 0
+
+    def __len__(self):
+        return self.end
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def get_start(self, position):
+        return max(0, position - self.lookback + 1)
+
+    def get_timestamp(self, position):
+        if self.timestamp_values is None:
+            raise ValueError("The market info must have a 'timestamp' column or index.")
+
+        timestamp = self.timestamp_values[position]
+
+        return pd.Timestamp(timestamp) if self.timestamp_values.dtype.kind == "M" else timestamp
+
+    def to_frame(self, start, end):
+        data = {column: values[start:end] for column, values in self.columns.items()}
+        index = pd.Index(self.timestamp_values[start:end], name="timestamp") if self.timestamp_values is not None else None
+
+        return pd.DataFrame(data, index=index)
+
+    def compact(self):
+        # Keep the bars the next window still needs at the start of the buffers
+        keep = min(self.lookback - 1, self.end)
+
+        for values in self.columns.values():
+            values[:keep] = values[self.end - keep:self.end]
+
+        if self.timestamp_values is not None:
+            self.timestamp_values[:keep] = self.timestamp_values[self.end - keep:self.end]
+
+        self.end = keep
+
+    def append(self, columns, timestamps=None):
+        """
+        Appends bars to the window, yielding the position of every bar once it is in the buffers.
+        The bars must be consumed in order, the buffers can be compacted between two positions.
+
+        Args:
+            columns (dict): The bars by column name, every column of the first bars is required.
+            timestamps (numpy.ndarray, optional): The timestamps of the bars. Defaults to None.
+        """
+        if columns.keys() != self.columns.keys():
+            raise ValueError("Every bar must have the same columns as the first one.")
+
+        for column, values in columns.items():
+            self.columns[column] = self.promote(self.columns[column], values, column)
+
+        if self.timestamp_values is not None and timestamps is not None:
+            self.timestamp_values = self.promote(self.timestamp_values, timestamps, "timestamp")
+
+        size = len(next(iter(columns.values())))
+        step = self.capacity - self.lookback + 1
+
+        for offset in range(0, size, step):
+            rows = min(step, size - offset)
+
+            if self.end + rows > self.capacity:
+                self.compact()
+
+            for column, values in self.columns.items():
+                values[self.end:self.end + rows] = columns[column][offset:offset + rows]
+
+            if self.timestamp_values is not None:
+                self.timestamp_values[self.end:self.end + rows] = timestamps[offset:offset + rows]
+
+            first = self.end
+            self.end += rows
+
+            for position in range(first, self.end):
+                yield position
+
+    @staticmethod
+    def promote(buffer, values, column):
+        # A buffer takes the dtype of the first bars, later bars of a wider dtype (floats after integers) widen
+        # it instead of being cast into it
+        if values.dtype == buffer.dtype:
+            return buffer
+
+        try:
+            dtype = np.result_type(buffer, values)
+        except TypeError:
+            raise ValueError(
+                f"The '{column}' bars of dtype {values.dtype} don't fit the previous ones of dtype {buffer.dtype}."
+            ) from None
+
+        return buffer if dtype == buffer.dtype else buffer.astype(dtype)
+
+    @staticmethod
+    def to_columns(bars):
+        """
+        Converts a chunk of bars (pandas.DataFrame) or a single bar (dict, pandas.Series) to its columns
+        as NumPy arrays and its timestamps, taken from the 'timestamp' index, column or key.
+        """
+        if isinstance(bars, pd.DataFrame):
+            columns = {column: bars[column].to_numpy() for column in bars.columns}
+
+            if bars.index.name == "timestamp":
+                timestamps = bars.index.to_numpy()
+            else:
+                timestamps = columns.get("timestamp")
+        else:
+            columns = {column: np.asarray([value]) for column, value in bars.items()}
+            timestamps = columns.get("timestamp")
+
+            if timestamps is None and isinstance(bars, pd.Series) and bars.name is not None:
+                timestamps = np.asarray([bars.name])
+
+        # Fixed width strings would truncate the longer values of the next bars
+        for column, values in columns.items():
+            if values.dtype.kind in "US":
+                columns[column] = values.astype(object)
+
+        if timestamps is not None and timestamps.dtype.kind in "US":
+            timestamps = timestamps.astype(object)
+
+        return columns, timestamps
@@ -0,0 +1,3 @@
+from backtestify.bench.benchmark import Benchmark
+from backtestify.bench.benchmark_strategy import BenchmarkStrategy
+from backtestify.bench.market_data_generator import MarketDataGenerator
@@ -0,0 +1,60 @@
+import argparse
+import sys
+
+from backtestify.bench.benchmark import Benchmark
+from backtestify.bench.market_data_generator import MarketDataGenerator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backtestify.bench", description="Benchmarks of backtestify.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write the report as JSON.")
+    run_parser.add_argument("--sizes", nargs="+", default=["10k"], choices=list(Benchmark.size_bars))
+    run_parser.add_argument("--markets", nargs="+", default=MarketDataGenerator.markets, choices=MarketDataGenerator.markets)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--no-isolate", action="store_true", help="Run every scenario in this process.")
+    run_parser.add_argument("--trace-allocations", action="store_true")
+    run_parser.add_argument("--output", default="benchmark.json")
+
+    compare_parser = commands.add_parser("compare", help="Compare a report with a baseline report.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    compare_parser.add_argument("--metrics", nargs="+", default=["wall_time"])
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = Benchmark(
+            sizes=args.sizes,
+            markets=args.markets,
+            seed=args.seed,
+            isolate=not args.no_isolate,
+            trace_allocations=args.trace_allocations,
+        ).run()
+        Benchmark.save(report, args.output)
+
+        for result in report["results"]:
+            print(f"{result['market']:<12} {result['stage']:<8} {result['bars']:>10} bars {result['wall_time']:>10.3f}s {result['bars_per_second'] or 0:>14,.0f} bars/s")
+
+        return 0
+
+    regressions = Benchmark.find_regressions(
+        Benchmark.load(args.baseline),
+        Benchmark.load(args.current),
+        threshold=args.threshold,
+        metrics=args.metrics,
+    )
+
+    for regression in regressions:
+        print(f"{regression['market']:<12} {regression['stage']:<8} {regression['bars']:>10} bars {regression['metric']}: {regression['baseline']:.3f} -> {regression['current']:.3f} ({regression['change']:+.1%})")
+
+    if not regressions:
+        print("No regressions.")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
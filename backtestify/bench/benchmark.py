@@ -0,0 +1,227 @@
+import datetime
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+from backtestify.account import Account
+from backtestify.backtester import Backtester
+from backtestify.bench.benchmark_strategy import BenchmarkStrategy
+from backtestify.bench.market_data_generator import MarketDataGenerator
+from backtestify.cfd import CFD
+from backtestify.instrument_type import InstrumentType
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, the peak RSS is then not reported
+    resource = None
+
+
+class Benchmark:
+    """
+    The Benchmark class measures the stages of a backtest, the signal generation (Strategy.generate_signals), the
+    execution (Backtester.execute) and the results (Backtester.results), on synthetic markets of several sizes.
+    Every stage reports its wall time, bars per second, the peak RSS of the process and, when allocations are
+    traced, the peak of the memory allocated by Python.
+
+    Every market and size runs in a fresh process by default, so the peak RSS of a scenario is not the one of a
+    previous scenario. Tracing the allocations slows down the stages, compare wall times of runs with the same
+    setting.
+
+    The report is a dict that can be saved as JSON and compared with the report of another version with
+    find_regressions.
+
+    Attributes:
+        sizes (list): The names of the sizes to run, keys of Benchmark.size_bars.
+        markets (list): The markets to run, from MarketDataGenerator.markets.
+        seed (int): The seed of the market data.
+        isolate (bool): Run every market and size in a fresh process.
+        trace_allocations (bool): Trace the memory allocated by Python in every stage.
+    """
+
+    size_bars = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+    stages = ["signals", "execute", "results"]
+
+    def __init__(self, sizes=("10k",), markets=None, seed=0, isolate=True, trace_allocations=False):
+        """
+        Initializes a new instance of the Benchmark class.
+
+        Args:
+            sizes (list, optional): The names of the sizes to run ('10k', '1m', '10m'). Defaults to ('10k',).
+            markets (list, optional): The markets to run. Defaults to all of MarketDataGenerator.markets.
+            seed (int, optional): The seed of the market data. Defaults to 0.
+            isolate (bool, optional): Run every market and size in a fresh process. Defaults to True.
+            trace_allocations (bool, optional): Trace the memory allocated by Python. Defaults to False.
+        """
+        unknown_sizes = [size for size in sizes if size not in self.size_bars]
+
+        if unknown_sizes:
+            raise ValueError(f"Unknown sizes {unknown_sizes}, use some of {list(self.size_bars)}.")
+
+        self.sizes = list(sizes)
+        self.markets = list(markets or MarketDataGenerator.markets)
+        self.seed = seed
+        self.isolate = isolate
+        self.trace_allocations = trace_allocations
+
+    def run(self):
+        results = []
+
+        for size in self.sizes:
+            for market in self.markets:
+                args = (market, self.size_bars[size], self.seed, self.trace_allocations)
+
+                if self.isolate:
+                    with ProcessPoolExecutor(max_workers=1) as executor:
+                        results.extend(executor.submit(Benchmark.run_scenario, *args).result())
+                else:
+                    results.extend(Benchmark.run_scenario(*args))
+
+        return {"metadata": self.get_metadata(), "results": results}
+
+    def get_metadata(self):
+        try:
+            version = metadata.version("backtestify")
+        except metadata.PackageNotFoundError:
+            version = None
+
+        return {
+            "backtestify": version,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "seed": self.seed,
+            "trace_allocations": self.trace_allocations,
+        }
+
+    @staticmethod
+    def get_instrument():
+        return CFD(
+            instrument_type=InstrumentType.FOREX,
+            lot_size=1,
+            entry_lots=1,
+            commission=1,
+            point_value=1,
+            leverage=100,
+            period=None,
+            point=0.01,
+            spread=2,
+            pips=0.01,
+            symbol="BENCH",
+        )
+
+    @staticmethod
+    def run_scenario(market, bars, seed, trace_allocations=False):
+        prices_info = MarketDataGenerator(seed=seed).generate(market, bars)
+        strategy = BenchmarkStrategy(prices_info, stop_loss=30, take_profit=60)
+        backtester = Backtester(strategy, Benchmark.get_instrument(), Account(100000))
+        results = []
+
+        events = Benchmark.measure(results, "signals", strategy.generate_signals, bars, trace_allocations)
+        Benchmark.measure(results, "execute", lambda: backtester.execute(events), bars, trace_allocations)
+        Benchmark.measure(results, "results", lambda: backtester.results, bars, trace_allocations)
+
+        for result in results:
+            result["market"] = market
+            result["events"] = len(events)
+            result["trades"] = len(backtester.trades)
+
+        return results
+
+    @staticmethod
+    def measure(results, stage, function, bars, trace_allocations=False):
+        gc.collect()
+
+        if trace_allocations:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        value = function()
+        wall_time = time.perf_counter() - start
+        allocated_peak = None
+
+        if trace_allocations:
+            allocated_peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+        results.append({
+            "stage": stage,
+            "bars": bars,
+            "wall_time": wall_time,
+            "bars_per_second": bars / wall_time if wall_time > 0 else None,
+            "peak_rss_mb": Benchmark.get_peak_rss(),
+            "allocated_peak_mb": allocated_peak,
+        })
+
+        return value
+
+    @staticmethod
+    def get_peak_rss():
+        if resource is None:
+            return None
+
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # Kilobytes on Linux, bytes on macOS
+        return peak_rss / 2**20 if platform.system() == "Darwin" else peak_rss / 2**10
+
+    @staticmethod
+    def save(report, path):
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+
+    @staticmethod
+    def load(path):
+        with open(path) as file:
+            return json.load(file)
+
+    @staticmethod
+    def find_regressions(baseline, current, threshold=0.1, metrics=("wall_time",)):
+        """
+        Returns the stages of the current report whose metrics are worse than in the baseline report by more
+        than the threshold, a relative change (0.1 is 10% slower). Stages are matched by market, stage and bars,
+        the ones missing from either report are skipped.
+
+        Args:
+            baseline (dict): The report of the reference version.
+            current (dict): The report of the version being checked.
+            threshold (float, optional): The largest accepted relative change. Defaults to 0.1.
+            metrics (list, optional): The metrics to compare, where higher is worse. Defaults to ('wall_time',).
+        """
+        baseline_results = {(result["market"], result["stage"], result["bars"]): result for result in baseline["results"]}
+        regressions = []
+
+        for result in current["results"]:
+            reference = baseline_results.get((result["market"], result["stage"], result["bars"]))
+
+            if reference is None:
+                continue
+
+            for metric in metrics:
+                before, after = reference.get(metric), result.get(metric)
+
+                if not before or after is None:
+                    continue
+
+                change = after / before - 1
+
+                if change > threshold:
+                    regressions.append({
+                        "market": result["market"],
+                        "stage": result["stage"],
+                        "bars": result["bars"],
+                        "metric": metric,
+                        "baseline": before,
+                        "current": after,
+                        "change": change,
+                    })
+
+        return regressions
@@ -0,0 +1,40 @@
+from backtestify.signal_event import SignalEvent
+from backtestify.signal_type import SignalType
+from backtestify.strategy import Strategy
+
+
+class BenchmarkStrategy(Strategy):
+    """
+    The BenchmarkStrategy class is the strategy of the benchmarks, a moving average crossover whose on_tick does
+    a constant amount of work per bar so the measures reflect the cost of the engine. Every crossover closes the
+    open position and opens one in its direction with the given stop loss and take profit.
+
+    Attributes:
+        period (int): The number of bars of the moving average.
+        stop_loss (float, optional): The stop loss in pips of the positions. Defaults to None.
+        take_profit (float, optional): The take profit in pips of the positions. Defaults to None.
+    """
+
+    def __init__(self, prices_info, period=20, stop_loss=None, take_profit=None):
+        super().__init__(prices_info, dataframe_history=False)
+        self.period = period
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+
+    def on_tick(self, history):
+        if len(history) <= self.period:
+            return None
+
+        close = history.close[-self.period - 1:]
+        previous_above = close[-2] > close[:-1].mean()
+        current_above = close[-1] > close[1:].mean()
+
+        if previous_above == current_above:
+            return None
+
+        signal = SignalType.BUY if current_above else SignalType.SELL
+
+        return [
+            SignalEvent(SignalType.EXIT),
+            SignalEvent(signal, stop_loss=self.stop_loss, take_profit=self.take_profit),
+        ]
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+
+class MarketDataGenerator:
+    """
+    The MarketDataGenerator class builds deterministic synthetic OHLCV market info for benchmarks. The same seed
+    always gives the same bars, so the runs of different versions are compared on the same data.
+
+    The bars have 'open', 'high', 'low', 'close', 'volume', 'swap_long' and 'swap_short' columns and are indexed
+    by 'timestamp', as the market info expected by the Strategy.
+
+    Attributes:
+        seed (int): The seed of the random generator.
+        start (str): The timestamp of the first bar.
+        freq (str): The frequency of the bars.
+        initial_price (float): The open price of the first bar.
+        volatility (float): The standard deviation of the log return of a bar.
+    """
+
+    markets = ["random_walk", "gaps", "sl_tp_heavy"]
+
+    def __init__(self, seed=0, start="2000-01-01", freq="min", initial_price=100.0, volatility=0.001):
+        """
+        Initializes a new instance of the MarketDataGenerator class.
+
+        Args:
+            seed (int, optional): The seed of the random generator. Defaults to 0.
+            start (str, optional): The timestamp of the first bar. Defaults to "2000-01-01".
+            freq (str, optional): The frequency of the bars. Defaults to "min".
+            initial_price (float, optional): The open price of the first bar. Defaults to 100.0.
+            volatility (float, optional): The standard deviation of the log return of a bar. Defaults to 0.001.
+        """
+        self.seed = seed
+        self.start = start
+        self.freq = freq
+        self.initial_price = initial_price
+        self.volatility = volatility
+
+    def generate(self, market, size):
+        """
+        Returns the bars of one of the markets ('random_walk', 'gaps' or 'sl_tp_heavy').
+        """
+        if market not in self.markets:
+            raise ValueError(f"Unknown market '{market}', use one of {self.markets}.")
+
+        return getattr(self, market)(size)
+
+    def random_walk(self, size):
+        """
+        Returns bars following a geometric random walk, every bar opens at the close of the previous one.
+        """
+        rng = np.random.default_rng(self.seed)
+        returns = rng.normal(0, self.volatility, size)
+
+        return self.build_bars(rng, returns, np.zeros(size), range_scale=1)
+
+    def gaps(self, size, gap_probability=0.02, gap_scale=10):
+        """
+        Returns a random walk where some bars open away from the previous close, exercising the gap fills of
+        the stop loss and take profit.
+        """
+        rng = np.random.default_rng(self.seed)
+        returns = rng.normal(0, self.volatility, size)
+        gaps = np.where(rng.random(size) < gap_probability, rng.normal(0, gap_scale * self.volatility, size), 0)
+
+        return self.build_bars(rng, returns, gaps, range_scale=1)
+
+    def sl_tp_heavy(self, size, range_scale=8):
+        """
+        Returns a random walk with wide bar ranges, so most bars touch the stop loss or the take profit of the
+        open position and many touch both.
+        """
+        rng = np.random.default_rng(self.seed)
+        returns = rng.normal(0, self.volatility, size)
+
+        return self.build_bars(rng, returns, np.zeros(size), range_scale=range_scale)
+
+    def build_bars(self, rng, returns, gaps, range_scale):
+        # Log prices of the open and close of every bar, the gaps move the open away from the previous close
+        log_close = np.log(self.initial_price) + np.cumsum(gaps + returns)
+        log_open = log_close - returns
+        open_price = np.exp(log_open)
+        close_price = np.exp(log_close)
+        wicks = np.abs(rng.normal(0, range_scale * self.volatility, (2, len(returns))))
+
+        return pd.DataFrame(
+            {
+                "open": open_price,
+                "high": np.maximum(open_price, close_price) * np.exp(wicks[0]),
+                "low": np.minimum(open_price, close_price) * np.exp(-wicks[1]),
+                "close": close_price,
+                "volume": rng.integers(1, 1000, len(returns)).astype(float),
+                "swap_long": np.full(len(returns), -5.0),
+                "swap_short": np.full(len(returns), 2.0),
+            },
+            index=pd.date_range(self.start, periods=len(returns), freq=self.freq, name="timestamp"),
+        )
@@ -0,0 +1,467 @@
+import operator
+
+import numpy as np
+
+from backtestify.record_store import RecordStore
+from backtestify.signal_event import SignalEvent
+from backtestify.signal_type import SignalType
+from backtestify.trade import Trade
+from backtestify.trade_state import TradeState
+from backtestify.trade_state_store import TradeStateStore
+from backtestify.trade_store import TradeStore
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, the kernel then runs as plain Python
+    njit = None
+
+# Signal codes of the kernel, the values of RecordStore.encode_signal
+NONE = 0
+BUY = SignalType.BUY.value
+SELL = SignalType.SELL.value
+EXIT = SignalType.EXIT.value
+TAKE_PROFIT = SignalType.TAKE_PROFIT.value
+STOP_LOSS = SignalType.STOP_LOSS.value
+
+
+def jit(function):
+    return njit(cache=True, nogil=True)(function) if njit is not None else function
+
+
+@jit
+def execute_signal_events(
+    signals,
+    has_stop_loss,
+    event_stop_loss,
+    has_take_profit,
+    event_take_profit,
+    open_price,
+    high_price,
+    low_price,
+    close_price,
+    previous_close_price,
+    swap_long,
+    swap_short,
+    initial_balance,
+    position_size,
+    commission,
+    point,
+    pips,
+    point_value,
+    currency_ratio,
+    spread_points,
+    margin,
+    required_margin,
+    days_per_year,
+    state_signal,
+    state_balance,
+    state_equity,
+    state_size,
+    state_adjusted_price,
+    state_stop_loss,
+    state_take_profit,
+    state_unrealized_profit,
+    state_realized_profit,
+    trade_event,
+    trade_signal,
+    trade_direction,
+    trade_price,
+    trade_profit,
+    trade_balance,
+    trade_stop_loss,
+    trade_take_profit,
+):
+    # SignalEvent.execute, TradeState.copy_and_update and TradeExecutor with the trade state as scalars,
+    # every step keeps the order of the float operations of the object engine so the results are identical
+    trades = 0
+    signal = NONE
+    balance = initial_balance
+    equity = initial_balance
+    size = 0.0
+    adjusted_price = 0.0
+    stop_loss = 0.0
+    take_profit = 0.0
+    unrealized_profit = 0.0
+    realized_profit = 0.0
+
+    for event in range(len(signals)):
+        event_signal = signals[event]
+
+        if event > 0:
+            # TradeState.copy_and_update
+            if signal == NONE:
+                size = 0.0
+                adjusted_price = 0.0
+                stop_loss = 0.0
+                take_profit = 0.0
+            else:
+                swap = -swap_long[event] if signal == BUY else swap_short[event]
+                adjusted_price = adjusted_price + swap / days_per_year * point
+                signal = NONE if signal == EXIT else signal
+
+            equity = balance
+            unrealized_profit = 0.0
+            realized_profit = 0.0
+
+            # SignalEvent.get_stop_loss and get_take_profit, only the levels of the event are used to open
+            use_stop_loss = has_stop_loss[event]
+            stop_loss_pips = event_stop_loss[event] * pips if use_stop_loss else 0.0
+            use_take_profit = has_take_profit[event]
+            take_profit_pips = event_take_profit[event] * pips if use_take_profit else 0.0
+
+            insufficient_equity = equity <= margin * currency_ratio
+            is_trade_open = False
+            is_flat = False
+
+            if signal == NONE:
+                if equity <= required_margin or (event_signal != BUY and event_signal != SELL):
+                    is_flat = True
+                else:
+                    # TradeExecutor.open_trade
+                    size = position_size
+                    signal = event_signal
+                    adjusted_price = open_price[event] + (spread_points if event_signal == BUY else 0.0)
+
+                    if not use_stop_loss:
+                        stop_loss = 0.0
+                    elif event_signal == BUY:
+                        stop_loss = open_price[event] - stop_loss_pips
+                    else:
+                        stop_loss = open_price[event] + spread_points + stop_loss_pips
+
+                    if not use_take_profit:
+                        take_profit = 0.0
+                    elif event_signal == BUY:
+                        take_profit = open_price[event] + take_profit_pips
+                    else:
+                        take_profit = open_price[event] + spread_points - take_profit_pips
+
+                    balance -= commission
+                    equity = balance
+
+                    trade_event[trades] = event
+                    trade_signal[trades] = event_signal
+                    trade_direction[trades] = 1 if event_signal == BUY else -1
+                    trade_price[trades] = adjusted_price
+                    trade_profit[trades] = 0.0
+                    trade_balance[trades] = balance
+                    trade_stop_loss[trades] = stop_loss
+                    trade_take_profit[trades] = take_profit
+                    trades += 1
+                    is_trade_open = True
+
+            if not is_flat:
+                use_stop_loss = stop_loss > 0
+                use_take_profit = take_profit > 0
+
+                # TradeExecutor.should_close_position
+                if event_signal == EXIT:
+                    close_position = True
+                elif signal == BUY:
+                    close_position = (
+                        insufficient_equity
+                        or (use_stop_loss and stop_loss >= open_price[event])
+                        or (use_take_profit and take_profit <= open_price[event])
+                    )
+                else:
+                    close_position = (
+                        insufficient_equity
+                        or (use_stop_loss and stop_loss <= open_price[event] + spread_points)
+                        or (use_take_profit and take_profit >= open_price[event] + spread_points)
+                    )
+
+                if close_position:
+                    # TradeExecutor.close_trade
+                    if signal == BUY:
+                        profit = position_size * (open_price[event] - adjusted_price)
+                    else:
+                        profit = position_size * (adjusted_price - (open_price[event] + spread_points))
+
+                    signal = EXIT
+                    size = 0.0
+                    unrealized_profit = 0.0
+                    realized_profit = profit
+                    balance += profit
+                    equity = balance
+
+                    trade_event[trades] = event
+                    trade_signal[trades] = event_signal
+                    trade_direction[trades] = 1 if event_signal == BUY else -1
+                    trade_price[trades] = adjusted_price
+                    trade_profit[trades] = profit
+                    trade_balance[trades] = balance
+                    trade_stop_loss[trades] = stop_loss
+                    trade_take_profit[trades] = take_profit
+                    trades += 1
+                else:
+                    level_hit = NONE
+                    profit = 0.0
+
+                    # TradeExecutor.execute_stop_loss
+                    if use_stop_loss:
+                        if signal == BUY and low_price[event] <= stop_loss:
+                            level_hit = STOP_LOSS
+                            if not is_trade_open and previous_close_price[event] > stop_loss and open_price[event] < stop_loss:
+                                stop_loss = open_price[event]
+
+                            profit = position_size * (stop_loss - adjusted_price) * point_value * currency_ratio - commission
+
+                        if signal == SELL and high_price[event] + spread_points >= stop_loss:
+                            level_hit = STOP_LOSS
+                            if not is_trade_open and close_price[event] < stop_loss and stop_loss <= open_price[event] + spread_points:
+                                stop_loss = open_price[event] + spread_points
+
+                            profit = position_size * (adjusted_price - stop_loss) * point_value * currency_ratio - commission
+
+                    # TradeExecutor.execute_take_profit
+                    if use_take_profit and level_hit == NONE:
+                        if signal == BUY:
+                            if not is_trade_open and open_price[event] >= take_profit:
+                                take_profit = open_price[event]
+
+                            if high_price[event] >= take_profit:
+                                level_hit = TAKE_PROFIT
+                                profit = position_size * (take_profit - adjusted_price) * point_value * currency_ratio - commission
+
+                        if signal == SELL:
+                            if (
+                                not is_trade_open
+                                and close_price[event] > take_profit
+                                and take_profit >= open_price[event] + spread_points
+                            ):
+                                take_profit = open_price[event] + spread_points
+
+                            if low_price[event] <= take_profit:
+                                level_hit = TAKE_PROFIT
+                                profit = position_size * (adjusted_price - take_profit) * point_value * currency_ratio - commission
+
+                    if level_hit != NONE:
+                        signal = NONE
+                        size = 0.0
+                        unrealized_profit = 0.0
+                        realized_profit = profit
+                        balance += profit
+                        equity = balance
+
+                        trade_event[trades] = event
+                        trade_signal[trades] = level_hit
+                        trade_direction[trades] = 1 if event_signal == BUY else -1
+                        trade_price[trades] = stop_loss if level_hit == STOP_LOSS else take_profit
+                        trade_profit[trades] = profit
+                        trade_balance[trades] = balance
+                        trade_stop_loss[trades] = stop_loss
+                        trade_take_profit[trades] = take_profit
+                        trades += 1
+
+                # SignalEvent.update_unrealized_profit
+                if signal == BUY or signal == SELL:
+                    current_close_price = close_price[event] + (spread_points if signal == SELL else 0.0)
+                    if signal == BUY:
+                        unrealized_profit = position_size * (current_close_price - adjusted_price) * point_value * currency_ratio
+                    else:
+                        unrealized_profit = position_size * (adjusted_price - current_close_price) * point_value * currency_ratio
+                    equity = balance + unrealized_profit
+
+        state_signal[event] = signal
+        state_balance[event] = balance
+        state_equity[event] = equity
+        state_size[event] = size
+        state_adjusted_price[event] = adjusted_price
+        state_stop_loss[event] = stop_loss
+        state_take_profit[event] = take_profit
+        state_unrealized_profit[event] = unrealized_profit
+        state_realized_profit[event] = realized_profit
+
+    return trades
+
+
+class CompiledBacktester:
+    """
+    The CompiledBacktester class runs the events of a strategy through a compiled loop instead of the SignalEvent,
+    TradeState and TradeExecutor objects of the Backtester. The events are encoded once as typed arrays and the
+    state machine runs over them with the trade state held in scalars, compiled with numba when it is installed
+    (`pip install backtestify[numba]`) and as plain Python otherwise.
+
+    The trades, trade states and account are identical to the ones of the Backtester with the same strategy. The
+    trade states are kept in a TradeStateStore, as with the record_store option of the Backtester.
+
+    Attributes:
+        strategy (Strategy): The strategy generating the events.
+        instrument (FinancialInstrument): The instrument being traded.
+        account (Account): The account, its balance and equity are updated at the end of the run.
+        trades (list): The trades of the run.
+        trade_store (TradeStore): The trades of the run as records.
+        trading_state (TradeStateStore): The trade state after every event.
+    """
+
+    is_compiled = njit is not None
+    signal_codes = {id(signal): RecordStore.encode_signal(signal) for signal in [None, *SignalType]}
+    order_signal_codes = [RecordStore.encode_signal(signal) for signal in SignalEvent.order_signals]
+
+    def __init__(self, strategy, instrument, account):
+        """
+        Initializes a new instance of the CompiledBacktester class.
+
+        Args:
+            strategy (Strategy): The strategy generating the events.
+            instrument (FinancialInstrument): The instrument being traded.
+            account (Account): The account of the backtest.
+        """
+        self.strategy = strategy
+        self.instrument = instrument
+        self.account = account
+        self.trades = []
+        self.trade_store = None
+        self.trading_state = None
+
+    def run(self):
+        events = self.strategy.generate_signals()
+        # The events were generated from the bars of the strategy, their prices are read from its arrays
+        self.execute(events, bars=self.strategy.bars)
+
+    def encode_events(self, events, bars=None):
+        size = len(events)
+
+        # The types are checked once per type, not once per event
+        for event_type in set(map(type, events)):
+            if not issubclass(event_type, SignalEvent):
+                raise NotImplementedError("Unknown event type")
+
+        # Every attribute is gathered from all the events in a single pass
+        def gather(field, dtype=object):
+            return np.fromiter(map(operator.attrgetter(field), events), dtype=dtype, count=size)
+
+        # The signal types are singletons, their codes are looked up by identity instead of hashing the enum
+        signal_ids = map(id, map(operator.attrgetter("signal"), events))
+        signals = np.fromiter(map(self.signal_codes.__getitem__, signal_ids), dtype=np.int8, count=size)
+        stop_loss = gather("stop_loss")
+        take_profit = gather("take_profit")
+
+        if np.isin(signals, self.order_signal_codes).any() or (gather("trailing_stop") != None).any():
+            raise NotImplementedError("Pending orders and trailing stops are only executed by the Backtester.")
+
+        if bars is None:
+            open_price, high_price, low_price, close_price = (
+                gather(field, np.float64) for field in ("open_price", "high_price", "low_price", "close_price")
+            )
+            previous_close_price = gather("previous_close_price")
+
+            # The events without a previous close read it from their previous event
+            for position in np.flatnonzero(previous_close_price == None):
+                previous_close_price[position] = events[position].get_previous_close_price()
+
+            previous_close_price = previous_close_price.astype(np.float64)
+        else:
+            # The prices of an event generated by the strategy are the ones of its bar (Strategy.set_information)
+            positions = gather("bar", np.int64) - 1
+            open_price, high_price, low_price, close_price = (
+                bars[column].astype(np.float64)[positions] for column in ("open", "high", "low", "close")
+            )
+            previous_close_price = np.full(size, np.nan)
+            has_previous_close = positions > 0
+            previous_close_price[has_previous_close] = bars["close"].astype(np.float64)[positions[has_previous_close] - 1]
+
+        return (
+            signals,
+            stop_loss != None,
+            stop_loss.astype(np.float64),
+            take_profit != None,
+            take_profit.astype(np.float64),
+            open_price,
+            high_price,
+            low_price,
+            close_price,
+            previous_close_price,
+            gather("swap_long", np.float64),
+            gather("swap_short", np.float64),
+        )
+
+    def execute(self, events, bars=None):
+        """
+        Runs the events through the compiled loop.
+
+        Args:
+            events (list): The signal events, in execution order.
+            bars (BarData, optional): The bars the events were generated from, their prices are then read from
+                its arrays instead of from every event. Defaults to None.
+        """
+        instrument = self.instrument
+        size = len(events)
+        strategy_bars = getattr(self.strategy, "bars", None)
+        timestamp_dtype = RecordStore.get_timestamp_dtype(
+            strategy_bars.timestamp_values if strategy_bars is not None else None
+        )
+
+        self.trading_state = TradeStateStore(capacity=size)
+        self.trading_state.size = size
+        states = self.trading_state.view()
+
+        # An event opens at most one position and closes at most one
+        trade_columns = {
+            "event": np.zeros(2 * size, dtype=np.int64),
+            "signal": np.zeros(2 * size, dtype=np.int8),
+            "direction": np.zeros(2 * size, dtype=np.int8),
+            "price": np.zeros(2 * size, dtype=np.float64),
+            "profit": np.zeros(2 * size, dtype=np.float64),
+            "balance": np.zeros(2 * size, dtype=np.float64),
+            "stop_loss": np.zeros(2 * size, dtype=np.float64),
+            "take_profit": np.zeros(2 * size, dtype=np.float64),
+        }
+        state_columns = {field: np.zeros(size, dtype=states.dtype[field]) for field in TradeStateStore.fields}
+
+        trades = execute_signal_events(
+            *self.encode_events(events, bars),
+            float(self.account.balance),
+            float(instrument.position_size),
+            float(instrument.commission),
+            float(instrument.point),
+            float(instrument.pips),
+            float(instrument.point_value),
+            float(instrument.currency_ratio),
+            float(instrument.spread_points),
+            float(instrument.margin),
+            float(instrument.required_margin),
+            float(TradeState.days_per_year),
+            *state_columns.values(),
+            *trade_columns.values(),
+        )
+
+        for field, values in state_columns.items():
+            states[field] = values
+
+        self.trades = [
+            Trade(
+                timestamp=events[event].timestamp,
+                bar=int(event),
+                signal=RecordStore.signals[signal],
+                size=instrument.position_size * int(direction),
+                price=price,
+                profit=profit,
+                balance=balance,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+            )
+            for event, signal, direction, price, profit, balance, stop_loss, take_profit in zip(
+                *[values[:trades].tolist() for values in trade_columns.values()]
+            )
+        ]
+        # The trade store is filled from the columns of the kernel, not trade by trade
+        self.trade_store = TradeStore(timestamp_dtype=timestamp_dtype, capacity=max(trades, 1))
+        records = self.trade_store.records[:trades]
+        records["timestamp"] = [RecordStore.encode_timestamp(trade.timestamp) for trade in self.trades]
+        records["bar"] = trade_columns["event"][:trades]
+        records["signal"] = trade_columns["signal"][:trades]
+        records["size"] = instrument.position_size * trade_columns["direction"][:trades]
+
+        for field in ["price", "profit", "balance", "stop_loss", "take_profit"]:
+            records[field] = trade_columns[field][:trades]
+
+        self.trade_store.size = trades
+
+        if size:
+            self.account.set_balance(states["balance"][-1])
+            self.account.set_equity(states["equity"][-1])
+
+    @property
+    def results(self):
+        return self.trade_store.to_frame()
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+
+from backtestify.bar_costs import BarCosts
+from backtestify.bar_data import BarData
+from backtestify.trade_state import TradeState
+
+
+class CostModel:
+    """
+    The CostModel class describes the trading costs of an instrument bar by bar: a time-varying spread, a slippage
+    that grows with the size of the position relative to the volume of the bar, a commission by tiers of position
+    size and a swap that is tripled on the rollover weekday. Every cost is computed as an array once per run
+    (compute) and the execution of an event only reads the costs of its bar.
+
+    A cost can be given as a number, the name of a column of the market info, an array with a value per bar or a
+    callable returning that array from the market info. A column named explicitly must exist. Without a cost model the instrument costs and the swap
+    columns are used, a CostModel() with the default arguments gives the same costs.
+
+    Attributes:
+        spread (optional): The spread in points. Defaults to None, the spread of the instrument.
+        slippage (optional): The slippage of a fill in points, paid on the entry and on the exit. Defaults to 0.
+        slippage_impact (float): The slippage in points per unit of position size over the volume of the bar.
+            Defaults to 0.
+        volume_column (str): The column of the volume of the bars. Defaults to "volume".
+        commission (optional): The commission of a position. Defaults to None, the commission of the instrument.
+        commission_tiers (list, optional): (minimum lots, commission per lot) pairs, the commission of a position
+            is the one of the highest tier reached by the entry lots of the instrument. Defaults to None.
+        swap_long (optional): The swap of a long position. Defaults to None, the "swap_long" column, 0 without it.
+        swap_short (optional): The swap of a short position. Defaults to None, the "swap_short" column, 0 without
+            it.
+        triple_swap_weekday (int, optional): The weekday (Monday is 0) whose bars pay three times the swap, e.g. 2
+            for the Wednesday rollover of forex. Defaults to None.
+        days_per_year (float): The number of days the swap is divided by. Defaults to 252.
+    """
+
+    def __init__(
+        self,
+        spread=None,
+        slippage=0,
+        slippage_impact=0,
+        volume_column="volume",
+        commission=None,
+        commission_tiers=None,
+        swap_long=None,
+        swap_short=None,
+        triple_swap_weekday=None,
+        days_per_year=TradeState.days_per_year,
+    ):
+        """
+        Initializes a new instance of the CostModel class.
+
+        Args:
+            spread (optional): The spread in points. Defaults to None.
+            slippage (optional): The slippage of a fill in points. Defaults to 0.
+            slippage_impact (float, optional): The slippage in points per unit of position size over the volume.
+                Defaults to 0.
+            volume_column (str, optional): The column of the volume of the bars. Defaults to "volume".
+            commission (optional): The commission of a position. Defaults to None.
+            commission_tiers (list, optional): (minimum lots, commission per lot) pairs. Defaults to None.
+            swap_long (optional): The swap of a long position. Defaults to None, the "swap_long" column.
+            swap_short (optional): The swap of a short position. Defaults to None, the "swap_short" column.
+            triple_swap_weekday (int, optional): The weekday whose bars pay three times the swap. Defaults to None.
+            days_per_year (float, optional): The number of days the swap is divided by. Defaults to 252.
+        """
+        if commission is not None and commission_tiers is not None:
+            raise ValueError("The commission and the commission tiers can't be given together.")
+
+        self.spread = spread
+        self.slippage = slippage
+        self.slippage_impact = slippage_impact
+        self.volume_column = volume_column
+        self.commission = commission
+        self.commission_tiers = sorted(commission_tiers) if commission_tiers is not None else None
+        self.swap_long = swap_long
+        self.swap_short = swap_short
+        self.triple_swap_weekday = triple_swap_weekday
+        self.days_per_year = days_per_year
+
+    def compute(self, prices_info, instrument):
+        """
+        Returns the BarCosts of every bar of the market info for an instrument.
+
+        Args:
+            prices_info (pandas.DataFrame): The market info of the run.
+            instrument (FinancialInstrument): The instrument being traded.
+        """
+        bars = BarData(prices_info)
+        spread = self.get_series(self.spread, prices_info, instrument.spread)
+        slippage = self.get_series(self.slippage, prices_info, 0)
+
+        if self.slippage_impact:
+            if self.volume_column not in bars:
+                raise ValueError(f"The market info must have a '{self.volume_column}' column for the slippage impact.")
+
+            volume = bars[self.volume_column].astype(float)
+            # Bars without volume have no impact, their size can't be measured against it
+            slippage = slippage + np.divide(
+                self.slippage_impact * instrument.position_size, volume, out=np.zeros(len(bars)), where=volume > 0
+            )
+
+        # The spread is paid once per position, the slippage on both of its fills
+        spread_points = (spread + 2 * slippage) * instrument.point
+        swap_multiplier = self.get_swap_multiplier(bars)
+
+        return BarCosts(
+            spread_points=spread_points,
+            commission=self.get_series(self.commission, prices_info, self.get_tier_commission(instrument)),
+            swap_long=self.get_swap_series(self.swap_long, "swap_long", prices_info) * swap_multiplier,
+            swap_short=self.get_swap_series(self.swap_short, "swap_short", prices_info) * swap_multiplier,
+            days_per_year=self.days_per_year,
+        )
+
+    def get_tier_commission(self, instrument):
+        if self.commission_tiers is None:
+            return instrument.commission
+
+        commission_per_lot = self.commission_tiers[0][1]
+
+        for min_lots, tier_commission in self.commission_tiers:
+            if instrument.entry_lots >= min_lots:
+                commission_per_lot = tier_commission
+
+        return commission_per_lot * instrument.entry_lots
+
+    def get_swap_multiplier(self, bars):
+        if self.triple_swap_weekday is None:
+            return np.ones(len(bars))
+
+        if bars.timestamps is None:
+            raise ValueError("The market info must have a 'timestamp' column or index for the triple swap.")
+
+        weekdays = pd.DatetimeIndex(bars.timestamps).weekday.to_numpy()
+
+        return np.where(weekdays == self.triple_swap_weekday, 3.0, 1.0)
+
+    @staticmethod
+    def get_swap_series(value, column, prices_info):
+        # Without a swap the column of the market info is used if it has one, the bars without it pay no swap
+        if value is None:
+            value = column if column in prices_info.columns else 0
+
+        return CostModel.get_series(value, prices_info, 0)
+
+    @staticmethod
+    def get_series(value, prices_info, default):
+        # A cost by bar from a number, a column, an array or a callable of the market info
+        size = len(prices_info)
+
+        if value is None:
+            value = default
+        elif isinstance(value, str):
+            if value not in prices_info.columns:
+                raise ValueError(f"The market info has no '{value}' column for the cost.")
+
+            value = prices_info[value].to_numpy()
+        elif callable(value):
+            value = value(prices_info)
+
+        series = np.asarray(value, dtype=float)
+
+        if series.ndim == 0:
+            return np.full(size, float(series))
+
+        if len(series) != size:
+            raise ValueError(f"A cost must have a value for each of the {size} bars, not {len(series)}.")
+
+        return series
@@ -7,8 +7,11 @@ class Event:
         event_type (str): A string describing the type of event.
         timestamp (datetime.datetime, optional): A datetime object representing the time at which the event occurred. Defaults to None.
         symbol (str, optional): A string representing the ticker symbol of the security involved in the event. Defaults to None.
+        bar (int, optional): The number of the bar the event was generated on, starting at 1, set by the strategy. Defaults to None.
     """
 
+    __slots__ = ("event_type", "timestamp", "symbol", "bar")
+
     def __init__(self, event_type, timestamp=None, symbol=None):
         """
         Initializes a new instance of the Event class.
@@ -21,6 +24,7 @@ class Event:
         self.event_type = event_type
         self.timestamp = timestamp
         self.symbol = symbol
+        self.bar = None
 
     def execute(self, *args, **kwargs):
         """
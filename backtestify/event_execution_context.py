@@ -1,6 +1,15 @@
 class EventExecutionContext:
-    def __init__(self, instrument=None, balance=None, current_trade_state=None, current_bar=None):
+    def __init__(self, instrument=None, balance=None, current_trade_state=None, current_bar=None, reserved_margin=0, intrabar_resolver=None, bar_costs=None, order_book=None, position_book=None):
         self.instrument = instrument
         self.balance = balance
         self.current_trade_state = current_trade_state
         self.current_bar = current_bar
+        # Margin used by the other positions of the account, less their unrealized profit
+        self.reserved_margin = reserved_margin
+        self.intrabar_resolver = intrabar_resolver
+        # The costs of every bar of the run when a cost model is used
+        self.bar_costs = bar_costs
+        # The pending orders of the symbol
+        self.order_book = order_book
+        # The open positions of the symbol when it can hold many
+        self.position_book = position_book
@@ -1,3 +1,10 @@
+from backtestify.execution_result import ExecutionResult
+from backtestify.signal_event import SignalEvent
+from backtestify.signal_type import SignalType
+from backtestify.trade import Trade
+from backtestify.trade_state import TradeState
+
+
 class EventExecutionStrategy:
     def execute(self, event, context):
         raise NotImplementedError("execute() method must be implemented by subclass.")
@@ -9,4 +16,175 @@ class SignalEventExecutionStrategy(EventExecutionStrategy):
             balance=context.balance, 
             current_trade_state=context.current_trade_state,
             current_bar=context.current_bar,
-        )
\ No newline at end of file
+            reserved_margin=context.reserved_margin,
+            intrabar_resolver=context.intrabar_resolver,
+            bar_costs=context.bar_costs,
+            order_book=context.order_book,
+        )
+
+
+class PositionBookExecutionStrategy(SignalEventExecutionStrategy):
+    """
+    Executes the signal events against the PositionBook of the context, which holds any number of long and short
+    positions of the symbol. BUY and SELL open a new position (pyramiding and hedging), EXIT closes the position
+    of its position_id or all of them, and every triggered pending order opens a position while the margin allows
+    it. The commission is paid when a position opens and again when its stop loss or take profit closes it, as for
+    a single position, and the profit of a close is in the account currency. The intrabar resolver of the context
+    decides which level of a position is filled first when the bar reaches both.
+    """
+
+    def execute(self, event, context):
+        if context.current_bar == 0:
+            return ExecutionResult(TradeState(context.balance))
+
+        instrument, book, order_book = context.instrument, context.position_book, context.order_book
+        spread_points, commission, swap_long, swap_short, days_per_year = event.get_costs(instrument, context.bar_costs)
+        book.apply_swap(swap_long, swap_short, instrument.point, days_per_year or TradeState.days_per_year)
+        trade_state = TradeState(balance=context.balance)
+        trades = []
+
+        triggered_orders = order_book.trigger(event.bar, event.open_price, event.high_price, event.low_price) if order_book is not None else ()
+
+        if event.signal in SignalEvent.order_signals:
+            if order_book is None:
+                raise ValueError("Pending orders need an order book in the execution context.")
+
+            order_book.place_event(event)
+
+        if event.signal == SignalType.EXIT:
+            position_ids = list(book.positions) if event.position_id is None else [event.position_id]
+
+            for position_id in position_ids:
+                position = book.positions.get(position_id)
+
+                if position is None:
+                    continue
+
+                price = event.open_price + (spread_points if position.signal == SignalType.SELL else 0)
+                trades.append(self.close_position(book, position, SignalType.EXIT, price, trade_state, event, context))
+        elif event.signal in [SignalType.BUY, SignalType.SELL]:
+            trade = self.open_position(
+                book, event.signal, event.open_price, event.stop_loss, event.take_profit, event.trailing_stop,
+                event.position_id, spread_points, commission, trade_state, event, context,
+            )
+
+            if trade is not None:
+                trades.append(trade)
+
+        resolve_levels = self.get_level_resolver(event, context.intrabar_resolver, spread_points)
+
+        # The positions opened by triggered orders are checked from the next bar, as for a single position
+        for position, signal, price in book.pop_stops(event.open_price, event.high_price, event.low_price, spread_points, resolve_levels):
+            trades.append(self.close_position(book, position, signal, price, trade_state, event, context, commission))
+
+        for order in list(triggered_orders):
+            trade = self.open_position(
+                book, order.side, order.get_fill_price(event.open_price), order.stop_loss, order.take_profit,
+                order.trailing_stop, None, spread_points, commission, trade_state, event, context,
+            )
+
+            # The orders left are rejected by the order book when the next bar is checked
+            if trade is None:
+                break
+
+            order_book.fill(order)
+            trades.append(trade)
+
+        book.trail(event.close_price, spread_points)
+
+        trade_state.unrealized_profit = book.get_unrealized_profit(
+            event.close_price, spread_points, instrument.point_value, instrument.currency_ratio
+        )
+        trade_state.equity = trade_state.balance + trade_state.unrealized_profit
+        trade_state.size = book.net_size
+
+        if book.positions:
+            is_long = book.sizes[SignalType.BUY] >= book.sizes[SignalType.SELL]
+            trade_state.signal = SignalType.BUY if is_long else SignalType.SELL
+
+        return ExecutionResult(trade_state, trades)
+
+    def open_position(
+        self, book, signal, price, stop_loss, take_profit, trailing_stop, position_id, spread_points, commission,
+        trade_state, event, context,
+    ):
+        instrument = context.instrument
+
+        if trade_state.balance - book.used_margin - context.reserved_margin <= instrument.required_margin:
+            return None
+
+        # The stop loss, take profit and trailing stop of the event are pips, as for a single position
+        pips = instrument.pips
+        is_buy = signal == SignalType.BUY
+        entry_price = price + (spread_points if is_buy else 0)
+        stop_loss = (price - stop_loss * pips if is_buy else price + spread_points + stop_loss * pips) if stop_loss is not None else 0
+        take_profit = (price + take_profit * pips if is_buy else price + spread_points - take_profit * pips) if take_profit is not None else 0
+
+        position = book.open(
+            signal=signal,
+            size=instrument.position_size,
+            entry_price=entry_price,
+            margin=instrument.required_margin,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            trailing_stop=trailing_stop * pips if trailing_stop else 0,
+            position_id=position_id,
+            bar=context.current_bar,
+            timestamp=event.timestamp,
+        )
+        trade_state.balance -= commission
+
+        return Trade(
+            timestamp=event.timestamp,
+            bar=context.current_bar,
+            signal=signal,
+            size=position.size * (1 if is_buy else -1),
+            price=entry_price,
+            profit=0,
+            balance=trade_state.balance,
+            stop_loss=position.stop_loss,
+            take_profit=position.take_profit,
+        )
+
+    @staticmethod
+    def get_level_resolver(event, intrabar_resolver, spread_points):
+        if intrabar_resolver is None:
+            return None
+
+        def resolve_levels(position):
+            return intrabar_resolver.resolve(
+                timestamp=event.timestamp,
+                trade_state_signal=position.signal,
+                stop_loss=position.stop_loss,
+                take_profit=position.take_profit,
+                use_stop_loss=position.stop_loss > 0,
+                use_take_profit=position.take_profit > 0,
+                spread_points=spread_points,
+                high_price=event.high_price,
+                low_price=event.low_price,
+            )
+
+        return resolve_levels
+
+    def close_position(self, book, position, signal, price, trade_state, event, context, commission=0):
+        instrument = context.instrument
+        entry_price = book.get_entry_price(position)
+        book.close(position.position_id)
+        direction = 1 if position.signal == SignalType.BUY else -1
+        # The stop loss and take profit pay the commission again, an EXIT doesn't (TradeExecutor)
+        profit = position.size * (price - entry_price) * direction * instrument.point_value * instrument.currency_ratio - commission
+
+        trade_state.realized_profit += profit
+        trade_state.balance += profit
+
+        return Trade(
+            timestamp=event.timestamp,
+            bar=context.current_bar,
+            signal=signal,
+            size=-position.size * direction,
+            price=price,
+            profit=profit,
+            balance=trade_state.balance,
+            stop_loss=position.stop_loss,
+            take_profit=position.take_profit,
+        )
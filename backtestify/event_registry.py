@@ -0,0 +1,41 @@
+class EventRegistry:
+    """
+    The EventRegistry class maps every event type to the execution strategy of its events. The execution
+    strategies are created once and shared by all the events of their type, and new kinds of events are executed
+    by registering their strategy instead of changing the backtester. An execution strategy returns an
+    ExecutionResult.
+
+    Attributes:
+        execution_strategies (dict): The execution strategy of every event type, by event type.
+    """
+
+    def __init__(self, execution_strategies=None):
+        """
+        Initializes a new instance of the EventRegistry class.
+
+        Args:
+            execution_strategies (dict, optional): The execution strategy of every event type, by event type.
+                Defaults to None.
+        """
+        self.execution_strategies = dict(execution_strategies or {})
+
+    def __contains__(self, event_type):
+        return event_type in self.execution_strategies
+
+    def register(self, event_type, execution_strategy):
+        """
+        Registers the execution strategy of an event type, replacing the previous one.
+
+        Args:
+            event_type (EventType): The event type, or any other key set as the event_type of the events.
+            execution_strategy (EventExecutionStrategy): The execution strategy of the events of the type.
+        """
+        self.execution_strategies[event_type] = execution_strategy
+
+        return execution_strategy
+
+    def get_execution_strategy(self, event_type):
+        try:
+            return self.execution_strategies[event_type]
+        except KeyError:
+            raise NotImplementedError(f"No execution strategy is registered for the event type {event_type}.") from None
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from backtestify.event_type import EventType
+from backtestify.record_store import RecordStore
+
+
+class EventStore(RecordStore):
+    """
+    The EventStore class keeps the signal events of a backtest as rows of a record array, the row of an
+    event is its index. The Backtester records the events here instead of keeping the SignalEvent objects
+    when the history is recorded in stores.
+    """
+
+    fields = [
+        "timestamp",
+        "bar",
+        "signal",
+        "stop_loss",
+        "take_profit",
+        "open_price",
+        "high_price",
+        "low_price",
+        "close_price",
+        "volume",
+        "swap_long",
+        "swap_short",
+    ]
+    # The stop loss, take profit, prices, volume and swaps of an event without them
+    empty_prices = (np.nan,) * 9
+
+    def __init__(self, timestamp_dtype=object, capacity=1024):
+        dtype = np.dtype([
+            ("timestamp", timestamp_dtype),
+            ("bar", np.int64),
+            ("signal", np.int8),
+            ("stop_loss", np.float64),
+            ("take_profit", np.float64),
+            ("open_price", np.float64),
+            ("high_price", np.float64),
+            ("low_price", np.float64),
+            ("close_price", np.float64),
+            ("volume", np.float64),
+            ("swap_long", np.float64),
+            ("swap_short", np.float64),
+        ])
+        super().__init__(dtype, capacity)
+
+    def append_event(self, event):
+        if event.event_type != EventType.SIGNAL:
+            # Other events only have a time and a bar, their signal and prices are empty
+            self.append((self.encode_timestamp(event.timestamp), event.bar, self.encode_signal(None), *self.empty_prices))
+            return None
+
+        self.append((
+            self.encode_timestamp(event.timestamp),
+            event.bar,
+            self.encode_signal(event.signal),
+            self.encode_float(event.stop_loss),
+            self.encode_float(event.take_profit),
+            event.open_price,
+            event.high_price,
+            event.low_price,
+            event.close_price,
+            self.encode_float(event.volume),
+            event.swap_long,
+            event.swap_short,
+        ))
+
+    def to_frame(self):
+        records = self.view()
+        columns = {field: records[field] for field in self.fields if field != "timestamp"}
+        columns["signal"] = self.decode_signals(records["signal"])
+
+        return pd.DataFrame(columns, index=pd.Index(records["timestamp"], name="timestamp"))
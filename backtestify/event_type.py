@@ -1,4 +1,9 @@
 from enum import Enum, auto
 
 class EventType(Enum):
-    SIGNAL = auto()
\ No newline at end of file
+    SIGNAL = auto()
+    # Kinds of events without an execution strategy by default, registered in an EventRegistry
+    MARKET = auto()
+    ORDER = auto()
+    FILL = auto()
+    FUNDING = auto()
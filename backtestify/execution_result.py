@@ -0,0 +1,29 @@
+class ExecutionResult:
+    """
+    The ExecutionResult class is the response of an execution strategy to an event: the trade state after the
+    event and the trades it executed, in execution order.
+
+    Attributes:
+        trade_state (TradeState): The trade state after the event, None when the event doesn't change it and the
+            current trade state is kept for the event.
+        trades (list): The trades executed by the event.
+    """
+
+    __slots__ = ("trade_state", "trades")
+
+    def __init__(self, trade_state=None, trades=()):
+        """
+        Initializes a new instance of the ExecutionResult class.
+
+        Args:
+            trade_state (TradeState, optional): The trade state after the event. Defaults to None.
+            trades (list, optional): The trades executed by the event. Defaults to no trades.
+        """
+        self.trade_state = trade_state
+        self.trades = trades
+
+    def __str__(self):
+        return "ExecutionResult: %s, Trades: %s" % (self.trade_state, len(self.trades))
+
+    def __repr__(self):
+        return str(self)
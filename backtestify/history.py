@@ -0,0 +1,52 @@
+class History:
+    """
+    The History class is the window of past bars passed to Strategy.on_tick. Columns are read as
+    attributes or items and return zero-copy views of the BarData arrays up to the current bar,
+    e.g. `history.close[-1]` or `history["rsi"][-20:]`.
+
+    The same instance is moved forward on every bar, so keep copies of the arrays (not the history)
+    when values must outlive the current call to on_tick.
+
+    Attributes:
+        bars (BarData or BarWindow): The columnar view of the market info.
+        start (int): The position of the first bar of the window.
+        end (int): The position after the last bar of the window, the last bar is the current one.
+    """
+
+    def __init__(self, bars, start=0, end=0):
+        self.bars = bars
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, column):
+        return self.bars.columns[column][self.start:self.end]
+
+    def __getattr__(self, name):
+        # Only called for missing attributes, the columns of the market info
+        if name == "bars":
+            raise AttributeError(name)
+
+        try:
+            return self.bars.columns[name][self.start:self.end]
+        except KeyError:
+            raise AttributeError(f"'History' object has no attribute or column '{name}'") from None
+
+    def __contains__(self, column):
+        return column in self.bars.columns
+
+    @property
+    def columns(self):
+        return list(self.bars.columns)
+
+    @property
+    def timestamp(self):
+        if self.bars.timestamp_values is None:
+            raise ValueError("The market info must have a 'timestamp' column or index.")
+
+        return self.bars.timestamp_values[self.start:self.end]
+
+    def to_frame(self):
+        return self.bars.to_frame(self.start, self.end)
@@ -0,0 +1,9 @@
+from backtestify.indicators.atr import ATR
+from backtestify.indicators.bollinger_bands import BollingerBands
+from backtestify.indicators.ema import EMA
+from backtestify.indicators.indicator import Indicator
+from backtestify.indicators.rolling_max import RollingMax
+from backtestify.indicators.rolling_min import RollingMin
+from backtestify.indicators.rolling_std import RollingStd
+from backtestify.indicators.rsi import RSI
+from backtestify.indicators.sma import SMA
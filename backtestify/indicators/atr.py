@@ -0,0 +1,42 @@
+from backtestify.indicators.indicator import Indicator
+
+
+class ATR(Indicator):
+    """
+    The ATR class is the average true range with Wilder's smoothing, seeded with the simple average of the first
+    `period` true ranges. The true range of a bar needs the previous close, so the first value is on the bar
+    `period` + 1.
+
+    Attributes:
+        period (int): The period of the average.
+    """
+
+    inputs = ("high", "low", "close")
+
+    def __init__(self, period=14):
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.previous_close = None
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, high, low, close):
+        previous_close, self.previous_close = self.previous_close, close
+
+        if previous_close is None:
+            return self.value
+
+        true_range = max(high - low, abs(high - previous_close), abs(low - previous_close))
+        self.count += 1
+
+        if self.count < self.period:
+            self.total += true_range
+        elif self.count == self.period:
+            self.value = (self.total + true_range) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + true_range) / self.period
+
+        return self.value
@@ -0,0 +1,53 @@
+import numpy as np
+
+from backtestify.indicators.indicator import Indicator
+from backtestify.indicators.rolling_std import RollingStd
+from backtestify.indicators.sma import SMA
+
+
+class BollingerBands(Indicator):
+    """
+    The BollingerBands class is the simple moving average of the last `period` values and the bands `num_std`
+    population standard deviations above and below it. The value is the middle band, the bands are read from
+    `upper` and `lower`, and batch returns the three bands.
+
+    Attributes:
+        period (int): The number of values of the average.
+        num_std (float): The number of standard deviations between the middle band and the other bands.
+        upper (float): The upper band after the last bar.
+        lower (float): The lower band after the last bar.
+    """
+
+    def __init__(self, period=20, num_std=2.0, input="close"):
+        self.period = period
+        self.num_std = num_std
+        self.inputs = (input,)
+        self.std = RollingStd(period, input)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.std.reset()
+        self.upper = np.nan
+        self.lower = np.nan
+
+    def update(self, value):
+        std = self.std.update(value)
+
+        # The bands are NaN while a non-finite value is in the window, as the standard deviation
+        if len(self.std.window) == self.period:
+            self.value = self.std.mean if self.std.is_ready else np.nan
+            self.upper = self.value + self.num_std * std
+            self.lower = self.value - self.num_std * std
+
+        return self.value
+
+    def batch(self, values):
+        """
+        Returns the middle, upper and lower bands of every value.
+        """
+        values = np.asarray(values, dtype=float)
+        std = self.std.batch(values)
+        middle = SMA(self.period).batch(values)
+
+        return middle, middle + self.num_std * std, middle - self.num_std * std
@@ -0,0 +1,34 @@
+from backtestify.indicators.indicator import Indicator
+
+
+class EMA(Indicator):
+    """
+    The EMA class is the exponential moving average with a smoothing of 2 / (period + 1), seeded with the simple
+    average of the first `period` values.
+
+    Attributes:
+        period (int): The period of the average.
+    """
+
+    def __init__(self, period, input="close"):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.inputs = (input,)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, value):
+        self.count += 1
+
+        if self.count < self.period:
+            self.total += value
+        elif self.count == self.period:
+            self.value = (self.total + value) / self.period
+        else:
+            self.value += self.alpha * (value - self.value)
+
+        return self.value
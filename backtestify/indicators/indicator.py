@@ -0,0 +1,52 @@
+import copy
+
+import numpy as np
+
+
+class Indicator:
+    """
+    The Indicator class is the base of the stateful indicators. An indicator is fed one bar at a time with
+    update, keeping only the state it needs to compute its next value in O(1), so it works on streamed bars as
+    well as on a whole DataFrame. The value is NaN until the indicator has seen enough bars.
+
+    The batch path, compute or batch, fills the values of all the bars at once, with array operations when the
+    indicator allows it. Indicators added to a Strategy with add_indicator are fed automatically before every
+    call to on_tick.
+
+    Attributes:
+        inputs (tuple): The columns of the market info passed to update, in order.
+        value (float): The value after the last bar, NaN until the indicator is ready.
+    """
+
+    inputs = ("close",)
+
+    def reset(self):
+        self.value = np.nan
+
+    @property
+    def is_ready(self):
+        return not np.isnan(self.value)
+
+    def get_state(self):
+        return copy.deepcopy(self.__dict__)
+
+    def set_state(self, state):
+        self.__dict__.update(copy.deepcopy(state))
+
+    def update(self, *values):
+        raise NotImplementedError("update() method must be implemented by subclass.")
+
+    def batch(self, *arrays):
+        """
+        Returns the values of the indicator for whole arrays of the inputs, without changing its state.
+        """
+        indicator = copy.deepcopy(self)
+        indicator.reset()
+
+        return np.array([indicator.update(*values) for values in zip(*arrays)], dtype=float)
+
+    def compute(self, prices_info):
+        """
+        Returns the values of the indicator for every bar of the market info.
+        """
+        return self.batch(*[np.asarray(prices_info[column], dtype=float) for column in self.inputs])
@@ -0,0 +1,20 @@
+from backtestify.indicators.rolling_min import RollingMin
+
+
+class RollingMax(RollingMin):
+    """
+    The RollingMax class is the maximum of the last `period` values, kept with a monotonic deque in decreasing
+    order.
+
+    Attributes:
+        period (int): The number of values of the window.
+    """
+
+    def __init__(self, period, input="high"):
+        super().__init__(period, input)
+
+    def precedes(self, first, second):
+        return first >= second
+
+    def reduce(self, windows):
+        return windows.max(axis=1)
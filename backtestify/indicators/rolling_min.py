@@ -0,0 +1,59 @@
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backtestify.indicators.indicator import Indicator
+
+
+class RollingMin(Indicator):
+    """
+    The RollingMin class is the minimum of the last `period` values. A monotonic deque keeps the values that can
+    still be the minimum of a later window, in increasing order, so every value is added and removed once.
+
+    Attributes:
+        period (int): The number of values of the window.
+    """
+
+    def __init__(self, period, input="low"):
+        self.period = period
+        self.inputs = (input,)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.candidates = deque()
+        self.count = 0
+
+    def precedes(self, first, second):
+        # Whether first makes second useless as a candidate
+        return first <= second
+
+    def update(self, value):
+        candidates = self.candidates
+
+        while candidates and self.precedes(value, candidates[-1][1]):
+            candidates.pop()
+
+        candidates.append((self.count, value))
+        self.count += 1
+
+        if candidates[0][0] <= self.count - 1 - self.period:
+            candidates.popleft()
+
+        if self.count >= self.period:
+            self.value = candidates[0][1]
+
+        return self.value
+
+    def reduce(self, windows):
+        return windows.min(axis=1)
+
+    def batch(self, values):
+        values = np.asarray(values, dtype=float)
+        result = np.full(len(values), np.nan)
+
+        if len(values) >= self.period:
+            result[self.period - 1:] = self.reduce(sliding_window_view(values, self.period))
+
+        return result
@@ -0,0 +1,76 @@
+import math
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backtestify.indicators.indicator import Indicator
+
+
+class RollingStd(Indicator):
+    """
+    The RollingStd class is the standard deviation of the last `period` values. The mean and the sum of squared
+    deviations are updated with Welford's method, adding the new value and removing the one leaving the window,
+    which doesn't lose precision like a running sum of squares. The value is NaN while a NaN or infinite value
+    is in the window, the mean and deviations are computed again from the window once it leaves.
+
+    Attributes:
+        period (int): The number of values of the window.
+        ddof (int): The delta degrees of freedom, 0 for the population standard deviation. Defaults to 0.
+        mean (float): The mean of the window.
+    """
+
+    def __init__(self, period, input="close", ddof=0):
+        self.period = period
+        self.ddof = ddof
+        self.inputs = (input,)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.window = deque()
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        # The number of non-finite values in the window
+        self.invalid = 0
+
+    def update(self, value):
+        self.window.append(value)
+        removed = self.window.popleft() if len(self.window) > self.period else None
+
+        if not math.isfinite(value):
+            self.invalid += 1
+
+        if removed is not None and not math.isfinite(removed):
+            self.invalid -= 1
+
+            if self.invalid == 0:
+                self.mean = math.fsum(self.window) / self.period
+                self.squared_deviations = math.fsum((window_value - self.mean) ** 2 for window_value in self.window)
+        elif self.invalid == 0:
+            if removed is not None:
+                previous_mean = self.mean
+                self.mean += (value - removed) / self.period
+                self.squared_deviations += (value - removed) * (value - self.mean + removed - previous_mean)
+            else:
+                delta = value - self.mean
+                self.mean += delta / len(self.window)
+                self.squared_deviations += delta * (value - self.mean)
+
+        if len(self.window) == self.period and self.invalid == 0:
+            self.value = np.sqrt(max(self.squared_deviations, 0.0) / (self.period - self.ddof))
+        elif len(self.window) == self.period:
+            self.value = np.nan
+
+        return self.value
+
+    def batch(self, values):
+        values = np.asarray(values, dtype=float)
+        result = np.full(len(values), np.nan)
+
+        if len(values) >= self.period:
+            # A window with an infinite value is NaN, as with update
+            with np.errstate(invalid="ignore"):
+                result[self.period - 1:] = sliding_window_view(values, self.period).std(axis=1, ddof=self.ddof)
+
+        return result
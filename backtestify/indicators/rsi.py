@@ -0,0 +1,48 @@
+from backtestify.indicators.indicator import Indicator
+
+
+class RSI(Indicator):
+    """
+    The RSI class is the relative strength index with Wilder's smoothing of the average gain and loss, seeded with
+    the simple average of the first `period` changes. The first value is on the bar `period` + 1.
+
+    Attributes:
+        period (int): The period of the averages.
+    """
+
+    def __init__(self, period=14, input="close"):
+        self.period = period
+        self.inputs = (input,)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.previous = None
+        self.count = 0
+        self.average_gain = 0.0
+        self.average_loss = 0.0
+
+    def update(self, value):
+        previous, self.previous = self.previous, value
+
+        if previous is None:
+            return self.value
+
+        change = value - previous
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        self.count += 1
+
+        if self.count <= self.period:
+            self.average_gain += gain / self.period
+            self.average_loss += loss / self.period
+
+            if self.count < self.period:
+                return self.value
+        else:
+            self.average_gain = (self.average_gain * (self.period - 1) + gain) / self.period
+            self.average_loss = (self.average_loss * (self.period - 1) + loss) / self.period
+
+        total = self.average_gain + self.average_loss
+        self.value = 100 * self.average_gain / total if total > 0 else 50.0
+
+        return self.value
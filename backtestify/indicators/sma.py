@@ -0,0 +1,64 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from backtestify.indicators.indicator import Indicator
+
+
+class SMA(Indicator):
+    """
+    The SMA class is the simple moving average of the last `period` values, kept as a running sum. A NaN or
+    infinite value isn't added to the sum, the average is NaN while it is in the window, as with pandas rolling.
+
+    Attributes:
+        period (int): The number of values of the average.
+    """
+
+    def __init__(self, period, input="close"):
+        self.period = period
+        self.inputs = (input,)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.window = deque()
+        self.total = 0.0
+        # The number of non-finite values in the window
+        self.invalid = 0
+
+    def update(self, value):
+        self.window.append(value)
+
+        if math.isfinite(value):
+            self.total += value
+        else:
+            self.invalid += 1
+
+        if len(self.window) > self.period:
+            removed = self.window.popleft()
+
+            if math.isfinite(removed):
+                self.total -= removed
+            else:
+                self.invalid -= 1
+
+        if len(self.window) == self.period:
+            self.value = self.total / self.period if self.invalid == 0 else np.nan
+
+        return self.value
+
+    def batch(self, values):
+        values = np.asarray(values, dtype=float)
+        result = np.full(len(values), np.nan)
+
+        if len(values) >= self.period:
+            finite = np.isfinite(values)
+            totals = np.cumsum(np.where(finite, values, 0.0))
+            totals[self.period:] = totals[self.period:] - totals[:-self.period]
+            invalid = np.cumsum(~finite)
+            invalid[self.period:] = invalid[self.period:] - invalid[:-self.period]
+            averages = totals[self.period - 1:] / self.period
+            result[self.period - 1:] = np.where(invalid[self.period - 1:] == 0, averages, np.nan)
+
+        return result
@@ -0,0 +1,137 @@
+import heapq
+import time
+
+
+class Instrumentation:
+    """
+    The Instrumentation class collects the timings of the stages of a backtest and calls the hooks of the run.
+    It is passed to a Backtester, which only takes the instrumented code paths when one is set, so a run without
+    instrumentation pays nothing for it.
+
+    The stages timed are 'on_tick' and 'set_information' for every bar of the strategy, and 'execute'
+    (SignalEvent.execute) and 'handle_response' (Backtester.handle_execution_result) for every
+    event. Other code can add its own timers and counters with add_time and count.
+
+    Attributes:
+        slow_bar_threshold (float, optional): The time in seconds of the signal generation of a bar above which
+            the bar is sampled as slow. Defaults to None, no sampling.
+        max_slow_bars (int): The number of slow bars kept, the slowest ones.
+        on_bar_start (callable, optional): Called as on_bar_start(bar, timestamp) before on_tick.
+        on_fill (callable, optional): Called as on_fill(trade) for every trade.
+        on_run_end (callable, optional): Called as on_run_end(report) at the end of every run.
+        times (dict): The total time in nanoseconds of every stage.
+        counts (dict): The number of times every stage was timed, and the counters.
+        report (dict): The report of the last run.
+    """
+
+    clock = staticmethod(time.perf_counter_ns)
+
+    def __init__(self, slow_bar_threshold=None, max_slow_bars=100, on_bar_start=None, on_fill=None, on_run_end=None):
+        """
+        Initializes a new instance of the Instrumentation class.
+
+        Args:
+            slow_bar_threshold (float, optional): The time in seconds above which a bar is sampled as slow.
+                Defaults to None.
+            max_slow_bars (int, optional): The number of slow bars kept. Defaults to 100.
+            on_bar_start (callable, optional): Called as on_bar_start(bar, timestamp). Defaults to None.
+            on_fill (callable, optional): Called as on_fill(trade). Defaults to None.
+            on_run_end (callable, optional): Called as on_run_end(report). Defaults to None.
+        """
+        self.slow_bar_threshold = slow_bar_threshold
+        self.max_slow_bars = max_slow_bars
+        self.on_bar_start = on_bar_start
+        self.on_fill = on_fill
+        self.on_run_end = on_run_end
+        self.report = None
+        self.reset()
+
+    def reset(self):
+        self.times = {}
+        self.counts = {}
+        self.slow_bars = []
+        self.run_start = None
+        self.slow_bar_threshold_ns = None if self.slow_bar_threshold is None else self.slow_bar_threshold * 1e9
+
+    def add_time(self, stage, elapsed):
+        self.times[stage] = self.times.get(stage, 0) + elapsed
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    def count(self, counter, value=1):
+        self.counts[counter] = self.counts.get(counter, 0) + value
+
+    def start_run(self):
+        self.reset()
+        self.run_start = self.clock()
+
+    def start_bar(self, bar, timestamp):
+        if self.on_bar_start is not None:
+            self.on_bar_start(bar, timestamp)
+
+    def end_bar(self, bar, timestamp, elapsed):
+        self.count("bars")
+
+        if self.slow_bar_threshold_ns is None or elapsed <= self.slow_bar_threshold_ns:
+            return
+
+        # Min-heap of the slowest bars, the bar is the tie breaker so timestamps are never compared
+        sample = (elapsed, bar, timestamp)
+
+        if len(self.slow_bars) < self.max_slow_bars:
+            heapq.heappush(self.slow_bars, sample)
+        else:
+            heapq.heappushpop(self.slow_bars, sample)
+
+    def fill(self, trade):
+        self.count("fills")
+
+        if self.on_fill is not None:
+            self.on_fill(trade)
+
+    def end_run(self):
+        wall_time = (self.clock() - self.run_start) / 1e9 if self.run_start is not None else None
+        self.report = {
+            "wall_time": wall_time,
+            "counts": dict(self.counts),
+            "stages": {
+                stage: {
+                    "count": self.counts[stage],
+                    "total_time": total / 1e9,
+                    "mean_time": total / 1e9 / self.counts[stage],
+                }
+                for stage, total in self.times.items()
+            },
+            "slow_bars": [
+                {"bar": bar, "timestamp": timestamp, "time": elapsed / 1e9}
+                for elapsed, bar, timestamp in sorted(self.slow_bars, reverse=True)
+            ],
+        }
+
+        if self.on_run_end is not None:
+            self.on_run_end(self.report)
+
+        return self.report
+
+    def summary(self):
+        """
+        Returns the report of the last run as text, a line per stage with its share of the wall time.
+        """
+        if self.report is None:
+            return "No run has ended."
+
+        report = self.report
+        wall_time = report["wall_time"] or 0
+        lines = [f"Wall time: {wall_time:.3f}s"]
+        lines.extend(f"{counter}: {value}" for counter, value in report["counts"].items() if counter not in report["stages"])
+
+        for stage, timing in sorted(report["stages"].items(), key=lambda item: -item[1]["total_time"]):
+            share = timing["total_time"] / wall_time if wall_time > 0 else 0
+            lines.append(
+                f"{stage:<16} {timing['count']:>10} calls {timing['total_time']:>10.3f}s {share:>7.1%} "
+                f"{timing['mean_time'] * 1e6:>10.2f}us/call"
+            )
+
+        for slow_bar in report["slow_bars"]:
+            lines.append(f"Slow bar {slow_bar['bar']} ({slow_bar['timestamp']}): {slow_bar['time'] * 1e3:.3f}ms")
+
+        return "\n".join(lines)
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+from backtestify.signal_type import SignalType
+
+
+class IntrabarResolver:
+    """
+    The IntrabarResolver class decides which of the stop loss and take profit of a position is filled first using
+    a lower timeframe (ticks or sub-bars, e.g. 1 minute bars) of the traded instrument. A bar only tells that its
+    range touched both levels, the sub-bars inside the bar tell which one was touched first.
+
+    The sub-bars of a bar are found with a binary search on their timestamps, so only the bars that need it pay for
+    the extra fidelity. By default only the bars touching both levels are resolved; with `resolve_all_levels` every
+    bar touching a level is checked, and a level the sub-bars never touch is not filled.
+
+    Attributes:
+        timestamps (numpy.ndarray): The sorted timestamps of the sub-bars.
+        high (numpy.ndarray): The high price of every sub-bar, the price for ticks.
+        low (numpy.ndarray): The low price of every sub-bar, the price for ticks.
+        bar_duration (pandas.Timedelta or int): The duration of a bar of the backtest, the sub-bars of a bar are the
+            ones in [timestamp, timestamp + bar_duration).
+        resolve_all_levels (bool): Resolve every bar touching a level, not only the ones touching both.
+    """
+
+    def __init__(self, sub_bars, bar_duration, resolve_all_levels=False):
+        """
+        Initializes a new instance of the IntrabarResolver class.
+
+        Args:
+            sub_bars (pandas.DataFrame): The lower timeframe, indexed or with a column by 'timestamp', with 'high'
+                and 'low' columns or a 'price' column for ticks.
+            bar_duration (pandas.Timedelta or int): The duration of a bar of the backtest, an int when the
+                timestamps are numbers (e.g. seconds since the epoch).
+            resolve_all_levels (bool, optional): Resolve every bar touching a level. Defaults to False.
+        """
+        if sub_bars.index.name == "timestamp":
+            timestamps = sub_bars.index
+        elif "timestamp" in sub_bars.columns:
+            timestamps = pd.Index(sub_bars["timestamp"])
+        else:
+            raise ValueError("The sub-bars must have a 'timestamp' column or index.")
+
+        if "high" in sub_bars.columns and "low" in sub_bars.columns:
+            high, low = sub_bars["high"], sub_bars["low"]
+        elif "price" in sub_bars.columns:
+            high = low = sub_bars["price"]
+        else:
+            raise ValueError("The sub-bars must have 'high' and 'low' columns or a 'price' column.")
+
+        if not timestamps.is_monotonic_increasing:
+            raise ValueError("The sub-bars must be sorted by timestamp.")
+
+        self.timestamps = self.to_key(timestamps)
+        self.high = high.to_numpy(dtype=float)
+        self.low = low.to_numpy(dtype=float)
+        self.bar_duration = bar_duration
+        self.resolve_all_levels = resolve_all_levels
+
+    @staticmethod
+    def to_key(timestamps):
+        # Timezone aware timestamps are compared in UTC
+        if isinstance(timestamps, pd.DatetimeIndex):
+            if timestamps.tz is not None:
+                timestamps = timestamps.tz_convert("UTC").tz_localize(None)
+            return timestamps.to_numpy(dtype="datetime64[ns]")
+
+        if isinstance(timestamps, pd.Timestamp):
+            if timestamps.tz is not None:
+                timestamps = timestamps.tz_convert("UTC").tz_localize(None)
+            return timestamps.to_datetime64().astype("datetime64[ns]")
+
+        if isinstance(timestamps, np.datetime64):
+            return timestamps.astype("datetime64[ns]")
+
+        return np.asarray(timestamps)
+
+    def get_sub_bars(self, timestamp):
+        start = self.to_key(timestamp)
+        end = self.to_key(timestamp + self.bar_duration)
+
+        return slice(
+            np.searchsorted(self.timestamps, start, side="left"),
+            np.searchsorted(self.timestamps, end, side="left"),
+        )
+
+    @staticmethod
+    def get_hits(trade_state_signal, stop_loss, take_profit, use_stop_loss, use_take_profit, spread_points, high, low):
+        # Same conditions as TradeExecutor.execute_stop_loss and execute_take_profit
+        if trade_state_signal == SignalType.BUY:
+            stop_loss_hit = use_stop_loss & (low <= stop_loss)
+            take_profit_hit = use_take_profit & (high >= take_profit)
+        else:
+            stop_loss_hit = use_stop_loss & (high + spread_points >= stop_loss)
+            take_profit_hit = use_take_profit & (low <= take_profit)
+
+        return stop_loss_hit, take_profit_hit
+
+    def resolve(self, timestamp, trade_state_signal, stop_loss, take_profit, use_stop_loss, use_take_profit, spread_points, high_price, low_price):
+        """
+        Returns which levels must be checked on a bar, as (check_stop_loss, check_take_profit), with at most one of
+        them set. Returns None when the bar doesn't need to be resolved or there are no sub-bars for it, the bar
+        is then filled as usual (the stop loss first).
+        """
+        stop_loss_hit, take_profit_hit = self.get_hits(
+            trade_state_signal, stop_loss, take_profit, use_stop_loss, use_take_profit, spread_points, high_price, low_price
+        )
+
+        if not (stop_loss_hit and take_profit_hit) and not (self.resolve_all_levels and (stop_loss_hit or take_profit_hit)):
+            return None
+
+        sub_bars = self.get_sub_bars(timestamp)
+
+        if sub_bars.start == sub_bars.stop:
+            return None
+
+        stop_loss_hits, take_profit_hits = self.get_hits(
+            trade_state_signal,
+            stop_loss,
+            take_profit,
+            stop_loss_hit,
+            take_profit_hit,
+            spread_points,
+            self.high[sub_bars],
+            self.low[sub_bars],
+        )
+        hits = stop_loss_hits | take_profit_hits
+
+        if not hits.any():
+            return False, False
+
+        # A sub-bar touching both levels is still ambiguous, the stop loss is filled first
+        first_hit = np.argmax(hits)
+
+        return bool(stop_loss_hits[first_hit]), not stop_loss_hits[first_hit]
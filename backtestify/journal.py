@@ -0,0 +1,295 @@
+import os
+import queue
+import shutil
+import threading
+
+import pandas as pd
+
+from backtestify.trade_state_store import TradeStateStore
+from backtestify.trade_store import TradeStore
+
+
+class Journal:
+    """
+    The Journal class writes the trades and the trade state after every event of a backtest to disk while it runs.
+    The rows are buffered and handed to a background writer thread every flush_size rows, so the event loop
+    only appends tuples to a list and never waits on the disk, unless the writer falls max_pending batches behind.
+
+    A journal is a directory with a `trades` and a `states` table. With the "csv" format every table is a file
+    appended batch by batch, with "parquet" and "arrow" (Arrow IPC, the feather format) a directory of part
+    files, one per batch, renamed into place once written. A JournalReader reads the rows as they are written.
+
+    The journal also keeps counters of the run (events, trades, balance, equity, peak equity, max drawdown as a
+    fraction of the peak equity), so a Backtester with keep_results=False holds no per-event or per-trade data in
+    memory.
+
+    Attributes:
+        path (str): The directory of the journal.
+        format (str): "csv", "parquet" or "arrow".
+        flush_size (int): The number of rows of a batch.
+        max_pending (int): The number of batches waiting for the writer before the event loop waits.
+        counters (dict): The counters of the run.
+    """
+
+    formats = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+    trade_fields = TradeStore.fields
+    state_fields = ["event", "bar", "timestamp", *TradeStateStore.fields]
+
+    def __init__(self, path, format="csv", flush_size=10000, max_pending=64):
+        """
+        Initializes a new instance of the Journal class.
+
+        Args:
+            path (str): The directory of the journal, its tables are replaced when a run starts and
+                continued when a run resumes from a checkpoint.
+            format (str, optional): "csv", "parquet" or "arrow". Defaults to "csv".
+            flush_size (int, optional): The number of rows of a batch. Defaults to 10000.
+            max_pending (int, optional): The number of batches waiting for the writer before the event loop
+                waits. Defaults to 64.
+        """
+        if format not in self.formats:
+            raise ValueError(f"Unknown journal format '{format}', expected one of {list(self.formats)}.")
+
+        if flush_size <= 0:
+            raise ValueError("The flush size must be positive.")
+
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.format = format
+        self.flush_size = flush_size
+        self.max_pending = max_pending
+        self.counters = {}
+        self.buffers = {"trades": [], "states": []}
+        self.parts = {"trades": 0, "states": 0}
+        self.pending = None
+        self.writer = None
+        self.error = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def is_open(self):
+        return self.writer is not None
+
+    def open(self, state=None):
+        """
+        Starts a new journal, replacing the tables of the previous one, and its writer thread.
+
+        Args:
+            state (dict, optional): The state of a journal returned by get_state. The journal continues from it,
+                keeping the rows and counters it covers and dropping the rows written after it. Defaults to None.
+        """
+        if self.is_open:
+            self.close()
+
+        os.makedirs(self.path, exist_ok=True)
+
+        for name in self.buffers:
+            table_path = self.get_table_path(name)
+
+            if state is not None:
+                self.truncate_table(table_path, state["sizes"][name], state["parts"][name])
+            elif os.path.isdir(table_path):
+                shutil.rmtree(table_path)
+            elif os.path.exists(table_path):
+                os.remove(table_path)
+
+            self.buffers[name] = []
+            self.parts[name] = 0 if state is None else state["parts"][name]
+
+        if state is not None:
+            self.counters = dict(state["counters"])
+        else:
+            self.counters = {
+                "events": 0,
+                "trades": 0,
+                "balance": None,
+                "equity": None,
+                "peak_equity": None,
+                "max_drawdown": 0,
+            }
+
+        self.error = None
+        self.pending = queue.Queue(maxsize=self.max_pending)
+        self.writer = threading.Thread(target=self.write_batches, name="backtestify-journal", daemon=True)
+        self.writer.start()
+
+    def close(self):
+        """
+        Writes the buffered rows and waits for the writer thread, raising the error it stopped on if any.
+        """
+        if not self.is_open:
+            return None
+
+        self.flush()
+        self.pending.put(None)
+        self.writer.join()
+        self.writer = None
+        self.raise_error()
+
+    def sync(self):
+        """
+        Writes the buffered rows and waits until the writer thread has written every batch.
+        """
+        if not self.is_open:
+            return None
+
+        self.flush()
+        self.pending.join()
+        self.raise_error()
+
+    def get_state(self):
+        """
+        Returns the state of the journal once every row written so far is on disk: its counters, the number of
+        part files and the size of the CSV file of every table. A journal opened with it continues from there.
+        """
+        self.sync()
+        sizes = {}
+
+        for name in self.buffers:
+            table_path = self.get_table_path(name)
+            sizes[name] = os.path.getsize(table_path) if os.path.isfile(table_path) else 0
+
+        return {"counters": dict(self.counters), "parts": dict(self.parts), "sizes": sizes}
+
+    def truncate_table(self, table_path, size, parts):
+        # Drops the rows written after a state, a CSV file is cut at its size and the later part files removed
+        if os.path.isfile(table_path):
+            if size == 0:
+                os.remove(table_path)
+            else:
+                with open(table_path, "r+b") as file:
+                    file.truncate(size)
+
+            return None
+
+        if not os.path.isdir(table_path):
+            return None
+
+        for file_name in os.listdir(table_path):
+            if file_name.startswith(".part-") or (file_name.startswith("part-") and int(file_name[5:11]) >= parts):
+                os.remove(os.path.join(table_path, file_name))
+
+    def flush(self):
+        for name, rows in self.buffers.items():
+            if rows:
+                self.hand_off(name, rows)
+                self.buffers[name] = []
+
+    def write_trade(self, trade):
+        rows = self.buffers["trades"]
+        rows.append((
+            trade.timestamp,
+            trade.bar,
+            trade.signal.name if trade.signal is not None else None,
+            trade.size,
+            trade.price,
+            trade.profit,
+            trade.balance,
+            trade.stop_loss,
+            trade.take_profit,
+        ))
+        self.counters["trades"] += 1
+
+        if len(rows) >= self.flush_size:
+            self.hand_off("trades", rows)
+            self.buffers["trades"] = []
+
+    def write_state(self, event_index, event, trade_state):
+        rows = self.buffers["states"]
+        rows.append((
+            event_index,
+            event.bar,
+            event.timestamp,
+            trade_state.signal.name if trade_state.signal is not None else None,
+            trade_state.balance,
+            trade_state.equity,
+            trade_state.size,
+            trade_state.adjusted_price,
+            trade_state.stop_loss,
+            trade_state.take_profit,
+            trade_state.unrealized_profit,
+            trade_state.realized_profit,
+        ))
+
+        counters = self.counters
+        equity = trade_state.equity
+        counters["events"] += 1
+        counters["balance"] = trade_state.balance
+        counters["equity"] = equity
+
+        peak_equity = counters["peak_equity"]
+
+        if peak_equity is None or equity > peak_equity:
+            counters["peak_equity"] = equity
+        elif peak_equity > 0 and (peak_equity - equity) / peak_equity > counters["max_drawdown"]:
+            # A fraction of the peak equity, as the max drawdown of the analytics
+            counters["max_drawdown"] = (peak_equity - equity) / peak_equity
+
+        if len(rows) >= self.flush_size:
+            self.hand_off("states", rows)
+            self.buffers["states"] = []
+
+    def hand_off(self, name, rows):
+        self.raise_error()
+        self.pending.put((name, rows))
+
+    def raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("The journal writer failed.") from error
+
+    def write_batches(self):
+        while True:
+            batch = self.pending.get()
+
+            if batch is None:
+                self.pending.task_done()
+                return
+
+            # After an error the batches are dropped so the event loop never waits on a dead writer
+            try:
+                if self.error is None:
+                    self.write_batch(*batch)
+            except BaseException as error:
+                self.error = error
+            finally:
+                self.pending.task_done()
+
+    def write_batch(self, name, rows):
+        columns = self.trade_fields if name == "trades" else self.state_fields
+        frame = pd.DataFrame.from_records(rows, columns=columns)
+        table_path = self.get_table_path(name)
+
+        if self.format == "csv":
+            # A batch is a single write, a reader only parses up to the last complete line
+            text = frame.to_csv(index=False, header=not os.path.exists(table_path))
+
+            with open(table_path, "a", newline="") as file:
+                file.write(text)
+
+            return None
+
+        os.makedirs(table_path, exist_ok=True)
+        part_path = os.path.join(table_path, f"part-{self.parts[name]:06d}{self.formats[self.format]}")
+        temporary_path = os.path.join(table_path, f".part-{self.parts[name]:06d}.tmp")
+        self.parts[name] += 1
+
+        if self.format == "parquet":
+            frame.to_parquet(temporary_path, index=False)
+        else:
+            frame.to_feather(temporary_path)
+
+        os.replace(temporary_path, part_path)
+
+    def get_table_path(self, name):
+        return Journal.get_table_file(self.path, name, self.format)
+
+    @staticmethod
+    def get_table_file(path, name, format):
+        # The CSV tables are files, the others directories of part files
+        return os.path.join(path, f"{name}.csv" if format == "csv" else name)
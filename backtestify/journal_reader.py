@@ -0,0 +1,111 @@
+import io
+import os
+
+import pandas as pd
+
+from backtestify.journal import Journal
+
+
+class JournalReader:
+    """
+    The JournalReader class reads a table of a Journal while the run is still writing it. Every call to read_new
+    returns the rows written since the previous call: the complete lines appended to a CSV table, or the part
+    files renamed into place since then.
+
+    Attributes:
+        path (str): The directory of the journal.
+        name (str): The table, "trades" or "states".
+        format (str): The format of the journal, "csv", "parquet" or "arrow".
+        offset (int): The position in the CSV file after the rows read.
+        next_part (int): The number of the next part file to read.
+    """
+
+    readers = {".parquet": pd.read_parquet, ".arrow": pd.read_feather}
+
+    def __init__(self, path, name="trades", format="csv"):
+        """
+        Initializes a new instance of the JournalReader class.
+
+        Args:
+            path (str): The directory of the journal.
+            name (str, optional): The table, "trades" or "states". Defaults to "trades".
+            format (str, optional): The format of the journal. Defaults to "csv".
+        """
+        if name not in ("trades", "states"):
+            raise ValueError(f"Unknown journal table '{name}', expected 'trades' or 'states'.")
+
+        if format not in Journal.formats:
+            raise ValueError(f"Unknown journal format '{format}', expected one of {list(Journal.formats)}.")
+
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.name = name
+        self.format = format
+        self.columns = Journal.trade_fields if name == "trades" else Journal.state_fields
+        self.offset = 0
+        self.header = None
+        self.next_part = 0
+
+    def read(self):
+        """
+        Returns every row written so far, from the start of the table.
+        """
+        self.offset = 0
+        self.header = None
+        self.next_part = 0
+
+        return self.read_new()
+
+    def read_new(self):
+        table_path = Journal.get_table_file(self.path, self.name, self.format)
+
+        if self.format == "csv":
+            return self.read_csv(table_path)
+
+        return self.read_parts(table_path)
+
+    def read_csv(self, table_path):
+        try:
+            with open(table_path, "rb") as file:
+                file.seek(self.offset)
+                data = file.read()
+        except FileNotFoundError:
+            return self.get_empty_frame()
+
+        # The last line may still be being written
+        end = data.rfind(b"\n") + 1
+        data = data[:end]
+        self.offset += end
+
+        if self.header is None:
+            header_end = data.find(b"\n") + 1
+            self.header, data = data[:header_end], data[header_end:]
+
+            if not self.header:
+                self.header = None
+                return self.get_empty_frame()
+
+        if not data:
+            return self.get_empty_frame()
+
+        return pd.read_csv(io.BytesIO(self.header + data), parse_dates=["timestamp"])
+
+    def read_parts(self, table_path):
+        frames = []
+        extension = Journal.formats[self.format]
+
+        while True:
+            part_path = os.path.join(table_path, f"part-{self.next_part:06d}{extension}")
+
+            if not os.path.exists(part_path):
+                break
+
+            frames.append(self.readers[extension](part_path))
+            self.next_part += 1
+
+        if not frames:
+            return self.get_empty_frame()
+
+        return pd.concat(frames, ignore_index=True)
+
+    def get_empty_frame(self):
+        return pd.DataFrame(columns=self.columns)
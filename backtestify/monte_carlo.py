@@ -0,0 +1,226 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backtestify.monte_carlo_result import MonteCarloResult
+
+
+class MonteCarlo:
+    """
+    The MonteCarlo class resamples a finished backtest many times to get the distributions of its terminal
+    equity and maximum drawdown: reshuffled or bootstrapped trade sequences, block-bootstrapped bar returns, and
+    trades with a randomized spread and slippage.
+
+    The paths are generated in batches, every batch is a single matrix of paths built with array operations, and
+    the batches run on a pool of threads (NumPy releases the GIL in the array operations). Every batch has its
+    own random generator spawned from the seed, so the result only depends on the seed and the batch size, not
+    on the number of threads.
+
+    Attributes:
+        trade_profits (numpy.ndarray): The profit of every closed position.
+        initial_balance (float): The balance of the account before the backtest.
+        returns (numpy.ndarray, optional): The return of the equity between consecutive bars.
+        trade_sizes (numpy.ndarray, optional): The size of every closed position, used to price the costs.
+        instrument (FinancialInstrument, optional): The instrument traded, used to price the costs.
+        paths (int): The number of paths of every resampling.
+        batch_size (int): The number of paths of a batch.
+        seed (int, optional): The seed of the random generators.
+        n_jobs (int): The number of threads. Defaults to the CPU count.
+    """
+
+    def __init__(
+        self,
+        trade_profits,
+        initial_balance,
+        returns=None,
+        trade_sizes=None,
+        instrument=None,
+        paths=1000,
+        batch_size=1000,
+        seed=None,
+        n_jobs=None,
+    ):
+        """
+        Initializes a new instance of the MonteCarlo class.
+
+        Args:
+            trade_profits (array-like): The profit of every closed position.
+            initial_balance (float): The balance of the account before the backtest.
+            returns (array-like, optional): The return of the equity between consecutive bars. Defaults to None.
+            trade_sizes (array-like, optional): The size of every closed position. Defaults to None.
+            instrument (FinancialInstrument, optional): The instrument traded. Defaults to None.
+            paths (int, optional): The number of paths of every resampling. Defaults to 1000.
+            batch_size (int, optional): The number of paths of a batch. Defaults to 1000.
+            seed (int, optional): The seed of the random generators. Defaults to None.
+            n_jobs (int, optional): The number of threads. Defaults to the CPU count.
+        """
+        if paths <= 0 or batch_size <= 0:
+            raise ValueError("The number of paths and the batch size must be positive.")
+
+        self.trade_profits = np.asarray(trade_profits, dtype=float)
+        self.initial_balance = initial_balance
+        self.returns = None if returns is None else np.asarray(returns, dtype=float)
+        self.trade_sizes = None if trade_sizes is None else np.abs(np.asarray(trade_sizes, dtype=float))
+        self.instrument = instrument
+        self.paths = paths
+        self.batch_size = batch_size
+        self.seed = seed
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+
+    @classmethod
+    def from_backtester(cls, backtester, **kwargs):
+        """
+        Creates a MonteCarlo from the trades and the equity of the last run of a Backtester or a
+        VectorizedBacktester.
+
+        Args:
+            backtester (Backtester or VectorizedBacktester): The backtester of the finished run.
+            **kwargs: The other arguments of the MonteCarlo.
+        """
+        analytics = backtester.get_analytics()
+        trades = backtester.trade_store.view()
+        # The change of the balance between two closes is the profit of a position with its commission and swap
+        closing_trades = backtester.get_closing_trades()
+        closes = trades["balance"][closing_trades]
+        kwargs.setdefault("instrument", backtester.instrument)
+
+        return cls(
+            trade_profits=np.diff(closes, prepend=analytics.initial_balance),
+            initial_balance=analytics.initial_balance,
+            returns=analytics.returns,
+            trade_sizes=trades["size"][closing_trades],
+            **kwargs,
+        )
+
+    def shuffle_trades(self):
+        """
+        Resamples the order of the trades, every path has the same trades in a random order. The terminal equity
+        is the same for every path, the drawdowns are not.
+        """
+        return self.run("shuffle", profits=self.trade_profits)
+
+    def bootstrap_trades(self):
+        """
+        Resamples the trades with replacement, every path has as many trades as the run.
+        """
+        return self.run("bootstrap", profits=self.trade_profits)
+
+    def bootstrap_returns(self, block_size=20):
+        """
+        Resamples the bar returns of the equity in blocks of consecutive bars with replacement, keeping the
+        autocorrelation within a block, every path has as many bars as the run.
+
+        Args:
+            block_size (int, optional): The number of bars of a block. Defaults to 20.
+        """
+        if self.returns is None:
+            raise ValueError("The returns of the run are needed to bootstrap them.")
+
+        if block_size <= 0:
+            raise ValueError("The block size must be positive.")
+
+        return self.run("returns", returns=self.returns, block_size=min(block_size, max(len(self.returns), 1)))
+
+    def randomize_costs(self, spread=None, slippage=0, shuffle=False):
+        """
+        Resamples the costs of the trades: every position pays a spread drawn uniformly from a range instead of
+        the spread of the instrument, and a slippage drawn uniformly from 0 to a maximum on its entry and on its
+        exit. Both are in points of the instrument.
+
+        Args:
+            spread (tuple, optional): The lowest and highest spread. Defaults to None, the spread of the instrument.
+            slippage (float, optional): The highest slippage of a fill. Defaults to 0.
+            shuffle (bool, optional): Also shuffle the order of the trades. Defaults to False.
+        """
+        if self.instrument is None or self.trade_sizes is None:
+            raise ValueError("The instrument and the trade sizes are needed to price the costs.")
+
+        instrument = self.instrument
+        spread = spread or (instrument.spread, instrument.spread)
+        # The profit of a position per point of cost
+        point_costs = self.trade_sizes * instrument.point * instrument.point_value * instrument.currency_ratio
+
+        return self.run(
+            "costs",
+            profits=self.trade_profits,
+            point_costs=point_costs,
+            spread=(spread[0] - instrument.spread, spread[1] - instrument.spread),
+            slippage=slippage,
+            shuffle=shuffle,
+        )
+
+    def run(self, method, **data):
+        batch_sizes = [min(self.batch_size, self.paths - start) for start in range(0, self.paths, self.batch_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(batch_sizes))
+        tasks = [(method, size, seed, data, self.initial_balance) for size, seed in zip(batch_sizes, seeds)]
+        n_jobs = min(self.n_jobs, len(tasks))
+
+        if n_jobs <= 1:
+            batches = list(map(MonteCarlo.run_batch, tasks))
+        else:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                batches = list(executor.map(MonteCarlo.run_batch, tasks))
+
+        return MonteCarloResult(
+            equity=np.concatenate([equity for equity, _ in batches]),
+            max_drawdowns=np.concatenate([max_drawdowns for _, max_drawdowns in batches]),
+            initial_balance=self.initial_balance,
+        )
+
+    @staticmethod
+    def run_batch(task):
+        method, size, seed, data, initial_balance = task
+        rng = np.random.default_rng(seed)
+
+        if method == "returns":
+            growth = MonteCarlo.sample_returns(rng, size, data["returns"], data["block_size"])
+            equity = initial_balance * np.cumprod(1 + growth, axis=1)
+        else:
+            equity = initial_balance + np.cumsum(getattr(MonteCarlo, f"sample_{method}")(rng, size, **data), axis=1)
+
+        equity = np.hstack([np.full((size, 1), float(initial_balance)), equity])
+
+        return equity, MonteCarlo.get_max_drawdowns(equity)
+
+    @staticmethod
+    def sample_shuffle(rng, size, profits):
+        return rng.permuted(np.tile(profits, (size, 1)), axis=1)
+
+    @staticmethod
+    def sample_bootstrap(rng, size, profits):
+        if not len(profits):
+            return np.zeros((size, 0))
+
+        return profits[rng.integers(0, len(profits), size=(size, len(profits)))]
+
+    @staticmethod
+    def sample_returns(rng, size, returns, block_size):
+        if not len(returns):
+            return np.zeros((size, 0))
+
+        # The bars of a path are the bars of random blocks laid end to end, cut to the length of the run
+        blocks = -(-len(returns) // block_size)
+        starts = rng.integers(0, len(returns) - block_size + 1, size=(size, blocks))
+        positions = (starts[:, :, None] + np.arange(block_size)).reshape(size, -1)[:, :len(returns)]
+
+        return returns[positions]
+
+    @staticmethod
+    def sample_costs(rng, size, profits, point_costs, spread, slippage, shuffle):
+        trades = len(profits)
+        points = rng.uniform(spread[0], spread[1], size=(size, trades))
+
+        if slippage:
+            points += rng.uniform(0, slippage, size=(size, trades)) + rng.uniform(0, slippage, size=(size, trades))
+
+        resampled_profits = profits - points * point_costs
+
+        return rng.permuted(resampled_profits, axis=1) if shuffle else resampled_profits
+
+    @staticmethod
+    def get_max_drawdowns(equity):
+        running_max = np.maximum.accumulate(equity, axis=1)
+        drawdown = np.divide(running_max - equity, running_max, out=np.zeros_like(equity), where=running_max > 0)
+
+        return drawdown.max(axis=1)
@@ -0,0 +1,75 @@
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+class MonteCarloResult:
+    """
+    The MonteCarloResult class holds the equity paths of a Monte Carlo resampling and the distributions
+    computed from them. Every distribution is computed the first time it is accessed and memoized.
+
+    Attributes:
+        equity (numpy.ndarray): The equity of every path, a row per path starting at the initial balance.
+        max_drawdowns (numpy.ndarray): The maximum drawdown of every path, as a fraction of the running maximum.
+        initial_balance (float): The balance of the account before the resampled run.
+    """
+
+    def __init__(self, equity, max_drawdowns, initial_balance):
+        """
+        Initializes a new instance of the MonteCarloResult class.
+
+        Args:
+            equity (numpy.ndarray): The equity of every path, a row per path.
+            max_drawdowns (numpy.ndarray): The maximum drawdown of every path.
+            initial_balance (float): The balance of the account before the resampled run.
+        """
+        self.equity = equity
+        self.max_drawdowns = max_drawdowns
+        self.initial_balance = initial_balance
+
+    @property
+    def paths(self):
+        return len(self.equity)
+
+    @cached_property
+    def terminal_equity(self):
+        return self.equity[:, -1]
+
+    @cached_property
+    def terminal_returns(self):
+        return self.terminal_equity / self.initial_balance - 1
+
+    def get_probability_of_loss(self):
+        return np.mean(self.terminal_equity < self.initial_balance) if self.paths else np.nan
+
+    def get_percentile_bands(self, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Returns the percentiles of the equity across the paths at every step, a column per percentile.
+
+        Args:
+            percentiles (iterable, optional): The percentiles of the bands. Defaults to (5, 25, 50, 75, 95).
+        """
+        percentiles = list(percentiles)
+        bands = np.percentile(self.equity, percentiles, axis=0).T
+
+        return pd.DataFrame(bands, columns=percentiles).rename_axis(index="step", columns="percentile")
+
+    def summary(self, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Returns the percentiles of the terminal equity, the terminal return and the maximum drawdown of the paths.
+
+        Args:
+            percentiles (iterable, optional): The percentiles of the distributions. Defaults to (5, 25, 50, 75, 95).
+        """
+        percentiles = list(percentiles)
+        distributions = {
+            "terminal_equity": self.terminal_equity,
+            "terminal_return": self.terminal_returns,
+            "max_drawdown": self.max_drawdowns,
+        }
+
+        return pd.DataFrame(
+            {name: np.percentile(values, percentiles) for name, values in distributions.items()},
+            index=pd.Index(percentiles, name="percentile"),
+        )
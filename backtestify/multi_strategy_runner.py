@@ -0,0 +1,256 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from backtestify.account import Account
+from backtestify.backtester import Backtester
+from backtestify.bar_data import BarData
+from backtestify.event_type import EventType
+from backtestify.history import History
+from backtestify.shared_frame import SharedFrame
+
+# State of a worker process, set once by MultiStrategyRunner.init_worker
+_worker = {}
+
+
+class MultiStrategyRunner:
+    """
+    The MultiStrategyRunner class backtests many independent strategies on the same market info in a single pass
+    over the bars. The market info is converted once to a BarData shared by the strategies, and every bar is
+    dispatched to each strategy in turn: its information (OHLCV, timestamp, swap, symbol, previous close) is read
+    once and set on the signal events of every strategy, and the events are executed by the Backtester of the
+    strategy, each with its own account and trade state.
+
+    Many strategies are split into shards run by worker processes, the market info is shared with them through
+    shared memory and every shard makes its own single pass.
+
+    The strategies read the columns of the market info of the runner, the columns they need (e.g. indicators
+    computed upfront) must be in it, the stateful indicators added to the strategies are fed as usual.
+
+    Attributes:
+        strategies (dict): The strategies, by name.
+        prices_info (pandas.DataFrame): The market info of the strategies.
+        instrument (FinancialInstrument): The instrument being traded.
+        account (Account): The account whose initial balance is used by every strategy.
+        n_jobs (int): The maximum number of worker processes, 1 runs in this process.
+        min_shard_size (int): The minimum number of strategies of a worker process.
+        record_store (bool): Record the events and trade states of the backtesters in stores.
+        periods_per_year (int): The number of bars per year of the metrics.
+        backtesters (dict): The backtester of every strategy after the run, by name.
+    """
+
+    def __init__(
+        self,
+        strategies,
+        prices_info,
+        instrument,
+        account,
+        n_jobs=None,
+        min_shard_size=8,
+        record_store=True,
+        periods_per_year=252,
+    ):
+        """
+        Initializes a new instance of the MultiStrategyRunner class.
+
+        Args:
+            strategies (dict): The strategies, by name.
+            prices_info (pandas.DataFrame): The market info of the strategies.
+            instrument (FinancialInstrument): The instrument being traded.
+            account (Account): The account whose initial balance is used by every strategy.
+            n_jobs (int, optional): The maximum number of worker processes. Defaults to the CPU count.
+            min_shard_size (int, optional): The minimum number of strategies of a worker process. Defaults to 8.
+            record_store (bool, optional): Record the events and trade states in stores, much cheaper to send back
+                from the workers than the event and trade state objects. Defaults to True.
+            periods_per_year (int, optional): The number of bars per year of the metrics. Defaults to 252.
+        """
+        for name, strategy in strategies.items():
+            if strategy.prices_info is not None and strategy.prices_info is not prices_info:
+                raise ValueError(f"The strategy '{name}' must use the market info of the runner.")
+
+        self.strategies = strategies
+        self.prices_info = prices_info
+        self.instrument = instrument
+        self.account = account
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.min_shard_size = min_shard_size
+        self.record_store = record_store
+        self.periods_per_year = periods_per_year
+        self.backtesters = {}
+
+    def get_shards(self):
+        names = list(self.strategies)
+        n_jobs = max(1, min(self.n_jobs, math.ceil(len(names) / self.min_shard_size)))
+
+        return [names[shard::n_jobs] for shard in range(n_jobs)]
+
+    def run(self):
+        """
+        Runs every strategy and returns a DataFrame with the Analytics metrics of every strategy, by name.
+        """
+        shards = self.get_shards()
+        worker_args = (self.instrument, self.account.balance, self.record_store)
+
+        if len(shards) <= 1:
+            MultiStrategyRunner.init_worker(None, *worker_args, prices_info=self.prices_info)
+            self.backtesters = MultiStrategyRunner.run_shard(self.strategies)
+        else:
+            # The strategies travel without the market info, the workers attach it from the shared memory
+            for strategy in self.strategies.values():
+                strategy.prices_info = None
+
+            try:
+                with SharedFrame(self.prices_info) as shared_frame:
+                    with ProcessPoolExecutor(
+                        max_workers=len(shards),
+                        initializer=MultiStrategyRunner.init_worker,
+                        initargs=(shared_frame.descriptor, *worker_args),
+                    ) as executor:
+                        shard_strategies = [{name: self.strategies[name] for name in shard} for shard in shards]
+                        results = list(executor.map(MultiStrategyRunner.run_shard, shard_strategies))
+            finally:
+                for strategy in self.strategies.values():
+                    strategy.prices_info = self.prices_info
+
+            backtesters = {}
+
+            for shard_backtesters in results:
+                for backtester in shard_backtesters.values():
+                    backtester.strategy.prices_info = self.prices_info
+
+                backtesters.update(shard_backtesters)
+
+            # The backtesters come back with copies of the strategies, in the order of the strategies
+            self.backtesters = {name: backtesters[name] for name in self.strategies}
+
+        return self.get_summary()
+
+    def get_summary(self):
+        summary = pd.DataFrame.from_dict(
+            {
+                name: backtester.get_analytics(periods_per_year=self.periods_per_year).metrics
+                for name, backtester in self.backtesters.items()
+            },
+            orient="index",
+        )
+        summary.index.name = "strategy"
+
+        return summary
+
+    @staticmethod
+    def init_worker(descriptor, instrument, initial_balance, record_store, prices_info=None):
+        _worker.clear()
+
+        if descriptor is not None:
+            _worker["memory"], prices_info = SharedFrame.attach(descriptor)
+
+        _worker["prices_info"] = prices_info
+        _worker["instrument"] = instrument
+        _worker["initial_balance"] = initial_balance
+        _worker["record_store"] = record_store
+
+    @staticmethod
+    def run_shard(strategies):
+        prices_info = _worker["prices_info"]
+        bars = BarData(prices_info)
+        history = History(bars)
+        backtesters = {}
+
+        for name, strategy in strategies.items():
+            if not hasattr(strategy, "on_tick"):
+                raise NotImplementedError("Subclasses should implement a on_tick method.")
+
+            strategy.prices_info = prices_info
+            strategy.bars = bars
+            strategy.reset_indicators()
+            strategy.align_timeframes()
+            backtester = Backtester(
+                strategy, _worker["instrument"], Account(_worker["initial_balance"]), record_store=_worker["record_store"]
+            )
+            backtester.start_bars()
+            backtesters[name] = backtester
+
+        runs = [(backtester.strategy, backtester, backtester.get_event_executor()) for backtester in backtesters.values()]
+        MultiStrategyRunner.check_columns(bars)
+        last_bar = len(bars) - 1
+
+        for index in range(len(bars)):
+            history.end = index + 1
+            information = MultiStrategyRunner.get_bar_information(bars, index)
+
+            for strategy, backtester, execute_event in runs:
+                strategy.current_index = index
+                strategy.bar_position = index
+                strategy.update_indicators()
+                strategy.update_timeframes()
+                events = strategy.to_event_list(
+                    strategy.on_tick(history.to_frame() if strategy.dataframe_history else history),
+                    is_last_bar=index == last_bar,
+                )
+                MultiStrategyRunner.set_information(events, information, bars, index)
+                backtester.execute_bar(events, execute_event)
+
+        for backtester in backtesters.values():
+            backtester.end_run()
+
+            # Only the results go back from a worker, not the market info
+            if "memory" in _worker:
+                backtester.strategy.prices_info = None
+                backtester.strategy.bars = None
+
+                for timeframe in backtester.strategy.timeframes.values():
+                    timeframe.aligned_info = None
+
+        return backtesters
+
+    @staticmethod
+    def check_columns(bars):
+        for column in ["open", "high", "low", "close"]:
+            if column not in bars:
+                raise ValueError(f"The market info must have a '{column}' column.")
+
+    @staticmethod
+    def get_bar_information(bars, index):
+        # The values Strategy.set_information reads for every event, read once for all the strategies
+        return {
+            "open_price": bars["open"][index],
+            "high_price": bars["high"][index],
+            "low_price": bars["low"][index],
+            "close_price": bars["close"][index],
+            "volume": bars["volume"][index] if "volume" in bars else None,
+            "timestamp": bars.timestamps[index] if bars.timestamps is not None else None,
+            "swap_long": bars["swap_long"][index] if "swap_long" in bars else 0,
+            "swap_short": bars["swap_short"][index] if "swap_short" in bars else 0,
+            "symbol": bars["symbol"][index] if "symbol" in bars else None,
+            "previous_close_price": bars["close"][index - 1] if index > 0 else None,
+            "bar": index + 1,
+        }
+
+    @staticmethod
+    def set_information(events, information, bars, index):
+        for event in events:
+            if event.event_type == EventType.SIGNAL:
+                event.open_price = information["open_price"]
+                event.high_price = information["high_price"]
+                event.low_price = information["low_price"]
+                event.close_price = information["close_price"]
+
+                if information["volume"] is not None:
+                    event.volume = information["volume"]
+
+                if event.swap_long is None or event.swap_short is None:
+                    event.swap_long = information["swap_long"]
+                    event.swap_short = information["swap_short"]
+
+                event.previous_close_price = information["previous_close_price"]
+
+            if event.timestamp is None:
+                # Raises like the strategy when the market info has no timestamps
+                event.timestamp = information["timestamp"] if information["timestamp"] is not None else bars.get_timestamp(index)
+
+            if event.symbol is None and information["symbol"] is not None:
+                event.symbol = information["symbol"]
+
+            event.bar = information["bar"]
@@ -0,0 +1,127 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from backtestify.account import Account
+from backtestify.backtester import Backtester
+from backtestify.shared_frame import SharedFrame
+
+# State of a worker process, set once by Optimizer.init_worker
+_worker = {}
+
+
+class Optimizer:
+    """
+    The Optimizer class backtests a Strategy subclass for every combination of a parameter grid, fanning the
+    runs out over worker processes. The market info is shared with the workers through shared memory, so it is
+    not pickled per run, and every run gets a shallow copy of it to add its own columns (e.g. indicators).
+
+    Attributes:
+        strategy_cls (type): The Strategy subclass, created as strategy_cls(prices_info, **params).
+        param_grid (dict or list): A dict of lists of values by parameter name, or a list of dicts of parameters.
+        prices_info (pandas.DataFrame): The market info of the backtests.
+        instrument (FinancialInstrument): The instrument being traded.
+        account (Account): The account whose initial balance is used by every run.
+        n_jobs (int, optional): The number of worker processes, 1 runs in this process. Defaults to the CPU count.
+        sort_by (str, optional): The column the summary is ranked by, descending. Defaults to "net_profit".
+        periods_per_year (int, optional): The number of bars per year, used to annualize the Sharpe and Sortino ratios.
+            Defaults to 252.
+    """
+
+    def __init__(
+        self,
+        strategy_cls,
+        param_grid,
+        prices_info,
+        instrument,
+        account,
+        n_jobs=None,
+        sort_by="net_profit",
+        periods_per_year=252,
+    ):
+        self.strategy_cls = strategy_cls
+        self.param_grid = param_grid
+        self.prices_info = prices_info
+        self.instrument = instrument
+        self.account = account
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.sort_by = sort_by
+        self.periods_per_year = periods_per_year
+
+    def get_param_sets(self):
+        return Optimizer.expand_param_grid(self.param_grid)
+
+    @staticmethod
+    def expand_param_grid(param_grid):
+        if isinstance(param_grid, dict):
+            names = list(param_grid)
+            return [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+
+        return [dict(params) for params in param_grid]
+
+    def run(self):
+        param_sets = self.get_param_sets()
+        n_jobs = min(self.n_jobs, len(param_sets))
+        worker_args = (self.strategy_cls, self.instrument, self.account.balance, self.periods_per_year)
+
+        if n_jobs <= 1:
+            Optimizer.init_worker(None, *worker_args, prices_info=self.prices_info)
+            results = [Optimizer.run_backtest(params) for params in param_sets]
+        else:
+            with SharedFrame(self.prices_info) as shared_frame:
+                with ProcessPoolExecutor(
+                    max_workers=n_jobs,
+                    initializer=Optimizer.init_worker,
+                    initargs=(shared_frame.descriptor, *worker_args),
+                ) as executor:
+                    chunksize = max(1, len(param_sets) // (n_jobs * 4))
+                    results = list(executor.map(Optimizer.run_backtest, param_sets, chunksize=chunksize))
+
+        summary = pd.DataFrame(results)
+
+        if summary.empty:
+            return summary
+
+        return summary.sort_values(self.sort_by, ascending=False, ignore_index=True)
+
+    @staticmethod
+    def init_worker(descriptor, strategy_cls, instrument, initial_balance, periods_per_year, prices_info=None):
+        _worker.clear()
+
+        if descriptor is not None:
+            _worker["memory"], prices_info = SharedFrame.attach(descriptor)
+
+        _worker["prices_info"] = prices_info
+        _worker["strategy_cls"] = strategy_cls
+        _worker["instrument"] = instrument
+        _worker["initial_balance"] = initial_balance
+        _worker["periods_per_year"] = periods_per_year
+
+    @staticmethod
+    def run_backtest(params):
+        prices_info = _worker["prices_info"].copy(deep=False)
+        strategy = _worker["strategy_cls"](prices_info, **params)
+        backtester = Backtester(strategy, _worker["instrument"], Account(_worker["initial_balance"]), record_store=True)
+        backtester.run()
+
+        return {**params, **backtester.get_analytics(periods_per_year=_worker["periods_per_year"]).metrics}
+
+
+def optimize(strategy_cls, param_grid, prices_info, instrument, account, n_jobs=None, sort_by="net_profit", periods_per_year=252):
+    """
+    Backtests strategy_cls for every combination of param_grid in parallel and returns a DataFrame with the
+    parameters and the Analytics metrics (net profit, max drawdown, Sharpe ratio, number of trades, ...) of every
+    run, ranked by sort_by.
+    """
+    return Optimizer(
+        strategy_cls=strategy_cls,
+        param_grid=param_grid,
+        prices_info=prices_info,
+        instrument=instrument,
+        account=account,
+        n_jobs=n_jobs,
+        sort_by=sort_by,
+        periods_per_year=periods_per_year,
+    ).run()
@@ -0,0 +1,88 @@
+from backtestify.signal_type import SignalType
+
+
+class Order:
+    """
+    The Order class represents a pending limit or stop order, filled when the price of a bar reaches its price.
+    Limit orders are placed below (buy) or above (sell) the market and fill at their price or better, stop orders
+    are placed above (buy) or below (sell) the market and fill at their price or worse.
+
+    Attributes:
+        order_id: The identifier of the order, given by the strategy or a sequence number of the order book.
+        signal (SignalType): BUY_LIMIT, SELL_LIMIT, BUY_STOP or SELL_STOP.
+        price (float): The price that triggers the order.
+        stop_loss (float, optional): The stop loss in pips of the position opened by the order.
+        take_profit (float, optional): The take profit in pips of the position opened by the order.
+        trailing_stop (float, optional): The distance in pips of the trailing stop of the position.
+        oco_group (optional): The group of the order, the other orders of the group are cancelled when it fills.
+        bar (int): The bar the order was placed in.
+        status (str): 'pending', 'triggered', 'filled', 'cancelled' or 'rejected'.
+    """
+
+    __slots__ = (
+        "order_id",
+        "signal",
+        "price",
+        "stop_loss",
+        "take_profit",
+        "trailing_stop",
+        "oco_group",
+        "bar",
+        "status",
+    )
+
+    sides = {
+        SignalType.BUY_LIMIT: SignalType.BUY,
+        SignalType.BUY_STOP: SignalType.BUY,
+        SignalType.SELL_LIMIT: SignalType.SELL,
+        SignalType.SELL_STOP: SignalType.SELL,
+    }
+
+    def __init__(self, order_id, signal, price, stop_loss=None, take_profit=None, trailing_stop=None, oco_group=None, bar=None):
+        """
+        Initializes a new instance of the Order class.
+
+        Args:
+            order_id: The identifier of the order.
+            signal (SignalType): BUY_LIMIT, SELL_LIMIT, BUY_STOP or SELL_STOP.
+            price (float): The price that triggers the order.
+            stop_loss (float, optional): The stop loss in pips. Defaults to None.
+            take_profit (float, optional): The take profit in pips. Defaults to None.
+            trailing_stop (float, optional): The distance in pips of the trailing stop. Defaults to None.
+            oco_group (optional): The group of the order. Defaults to None.
+            bar (int, optional): The bar the order was placed in. Defaults to None.
+        """
+        if signal not in self.sides:
+            raise ValueError(f"{signal} is not a pending order.")
+
+        if price is None:
+            raise ValueError("A pending order needs a price.")
+
+        self.order_id = order_id
+        self.signal = signal
+        self.price = price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trailing_stop = trailing_stop
+        self.oco_group = oco_group
+        self.bar = bar
+        self.status = "pending"
+
+    @property
+    def side(self):
+        return self.sides[self.signal]
+
+    @property
+    def is_rising(self):
+        # Sell limits and buy stops are above the market, they trigger when the price rises to them
+        return self.signal in (SignalType.SELL_LIMIT, SignalType.BUY_STOP)
+
+    def get_fill_price(self, open_price):
+        # A bar opening beyond the price fills at the open
+        return max(self.price, open_price) if self.is_rising else min(self.price, open_price)
+
+    def __str__(self):
+        return "Order: %s, Signal: %s, Price: %s, Status: %s" % (self.order_id, self.signal, self.price, self.status)
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,149 @@
+import heapq
+
+from backtestify.order import Order
+from backtestify.signal_type import SignalType
+
+
+class OrderBook:
+    """
+    The OrderBook class keeps the pending orders of a symbol indexed by price. The orders triggered by a rising
+    price (sell limits, buy stops) are in a min-heap of their prices and the ones triggered by a falling price
+    (buy limits, sell stops) in a max-heap, so a bar only pops the orders inside its [low, high] range instead
+    of checking every pending order. Cancelled orders are left in the heaps and skipped when they are popped.
+
+    The orders of a bar are checked once, on its first event, so an order placed in a bar can only be triggered
+    from the next bar on. The triggered orders wait to be filled by an event of the bar, the ones left unfilled
+    are rejected when the next bar is checked.
+
+    Attributes:
+        orders (dict): The pending and triggered orders, by order id.
+        oco_groups (dict): The ids of the orders of every OCO group, by group.
+        triggered (list): The orders triggered by the last bar checked, in the order the price reached them.
+        filled (list): The filled orders.
+        last_bar (int): The last bar checked.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the OrderBook class.
+        """
+        self.rising = []
+        self.falling = []
+        self.orders = {}
+        self.oco_groups = {}
+        self.triggered = []
+        self.filled = []
+        self.last_bar = None
+        # Breaks the ties between orders with the same price, the orders are never compared
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.orders)
+
+    def place(self, order):
+        self.sequence += 1
+
+        if order.order_id is None:
+            order.order_id = self.sequence
+
+        if order.order_id in self.orders:
+            raise ValueError(f"An order with id {order.order_id} is already pending.")
+
+        self.orders[order.order_id] = order
+
+        if order.is_rising:
+            heapq.heappush(self.rising, (order.price, self.sequence, order))
+        else:
+            heapq.heappush(self.falling, (-order.price, self.sequence, order))
+
+        if order.oco_group is not None:
+            self.oco_groups.setdefault(order.oco_group, set()).add(order.order_id)
+
+        return order
+
+    def place_event(self, event):
+        """
+        Places the pending order of a signal event, or cancels the order (order_id) or the OCO group (oco_group)
+        of a CANCEL event.
+        """
+        if event.signal == SignalType.CANCEL:
+            if event.order_id is not None:
+                self.cancel(event.order_id)
+
+            if event.oco_group is not None:
+                self.cancel_group(event.oco_group)
+
+            return None
+
+        return self.place(Order(
+            order_id=event.order_id,
+            signal=event.signal,
+            price=event.price,
+            stop_loss=event.stop_loss,
+            take_profit=event.take_profit,
+            trailing_stop=event.trailing_stop,
+            oco_group=event.oco_group,
+            bar=event.bar,
+        ))
+
+    def cancel(self, order_id, status="cancelled"):
+        order = self.orders.pop(order_id, None)
+
+        if order is None:
+            return None
+
+        order.status = status
+
+        if order.oco_group is not None:
+            group = self.oco_groups.get(order.oco_group)
+            group.discard(order_id)
+
+            if not group:
+                del self.oco_groups[order.oco_group]
+
+        return order
+
+    def cancel_group(self, oco_group):
+        for order_id in list(self.oco_groups.get(oco_group, ())):
+            self.cancel(order_id)
+
+    def trigger(self, bar, open_price, high_price, low_price):
+        """
+        Returns the orders triggered by a bar, sorted by the distance of their price to the open of the bar.
+        A bar already checked returns the orders it triggered that are still unfilled.
+        """
+        if bar == self.last_bar:
+            self.triggered = [order for order in self.triggered if order.status == "triggered"]
+            return self.triggered
+
+        # The orders of the previous bar nothing filled
+        for order in self.triggered:
+            if order.status == "triggered":
+                self.cancel(order.order_id, status="rejected")
+
+        self.last_bar = bar
+        triggered = []
+
+        while self.rising and self.rising[0][0] <= high_price:
+            triggered.append(heapq.heappop(self.rising)[2])
+
+        while self.falling and -self.falling[0][0] >= low_price:
+            triggered.append(heapq.heappop(self.falling)[2])
+
+        triggered = [order for order in triggered if order.status == "pending"]
+        triggered.sort(key=lambda order: abs(order.price - open_price))
+
+        for order in triggered:
+            order.status = "triggered"
+
+        self.triggered = triggered
+
+        return triggered
+
+    def fill(self, order):
+        # The other orders of its OCO group are cancelled
+        self.cancel(order.order_id, status="filled")
+        self.filled.append(order)
+
+        if order.oco_group is not None:
+            self.cancel_group(order.oco_group)
@@ -0,0 +1,179 @@
+import asyncio
+from collections import deque
+
+import pandas as pd
+
+from backtestify.backtester import Backtester
+
+
+class PaperTrader:
+    """
+    The PaperTrader class runs a strategy on a live feed of bars in an asyncio event loop, with the same on_tick
+    and SignalEvent execution as a backtest. It paper trades: the fills are simulated by the execution of the
+    events and pushed to a sink, no order reaches a broker.
+
+    The bars are read from an async source into a bounded queue, so a source faster than the strategy waits for
+    room in the queue instead of buffering without limit. The signals of a bar (on_tick and the indicators) are
+    generated in an executor so a slow strategy doesn't block the I/O of the loop, and the events are executed
+    in the loop once they are generated. The bars are processed one at a time, in order.
+
+    Attributes:
+        strategy (Strategy): The strategy generating the events.
+        instrument (FinancialInstrument): The instrument being traded.
+        account (Account): The paper account.
+        source (async iterable): The bars, single bars (dict, pandas.Series) or chunks (pandas.DataFrame).
+        sink (async callable, optional): Awaited as sink(trade) for every fill.
+        lookback (int): The number of bars in the history passed to on_tick.
+        queue_size (int): The number of bars read ahead of the strategy.
+        executor (concurrent.futures.Executor, optional): The executor of the signal generation, the default
+            executor of the loop when None.
+        offload_ticks (bool): Generate the signals in the executor, otherwise in the loop.
+        backtester (Backtester): The backtester executing the events, with the trades and the account state.
+    """
+
+    def __init__(
+        self,
+        strategy,
+        instrument,
+        account,
+        source,
+        sink=None,
+        lookback=1000,
+        queue_size=100,
+        executor=None,
+        offload_ticks=True,
+        record_store=False,
+    ):
+        """
+        Initializes a new instance of the PaperTrader class.
+
+        Args:
+            strategy (Strategy): The strategy generating the events.
+            instrument (FinancialInstrument): The instrument being traded.
+            account (Account): The paper account.
+            source (async iterable): The bars of the feed.
+            sink (async callable, optional): Awaited as sink(trade) for every fill. Defaults to None.
+            lookback (int, optional): The number of bars in the history passed to on_tick. Defaults to 1000.
+            queue_size (int, optional): The number of bars read ahead of the strategy. Defaults to 100.
+            executor (concurrent.futures.Executor, optional): The executor of the signal generation. Defaults to
+                None, the default executor of the loop.
+            offload_ticks (bool, optional): Generate the signals in the executor. Defaults to True.
+            record_store (bool, optional): Record the events and trade states in stores. Defaults to False.
+        """
+        if queue_size <= 0:
+            raise ValueError("The queue size must be positive.")
+
+        self.strategy = strategy
+        self.instrument = instrument
+        self.account = account
+        self.source = source
+        self.sink = sink
+        self.lookback = lookback
+        self.queue_size = queue_size
+        self.executor = executor
+        self.offload_ticks = offload_ticks
+        self.backtester = Backtester(strategy, instrument, account, record_store=record_store)
+        self.stopping = False
+
+    async def run(self):
+        """
+        Runs the strategy until the source ends or stop is called, then closes the open position. Returns the
+        backtester with the trades of the session.
+        """
+        loop = asyncio.get_running_loop()
+        backtester = self.backtester
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        # The bars handed to the signal generator, one at a time
+        feed = deque()
+        signals = self.strategy.stream_signals(self.iter_feed(feed), self.lookback)
+        reader = asyncio.create_task(self.read_source(queue))
+
+        backtester.event_offset = 0
+        backtester.trade_store = None
+        backtester.trading_state = None
+        backtester.initial_balance = self.account.balance
+        backtester.start_run()
+        execute_event = backtester.get_event_executor()
+        current_bar = 0
+
+        try:
+            while not self.stopping:
+                bar = await queue.get()
+
+                if bar is None:
+                    break
+
+                feed.append(bar)
+
+                # The generator yields the events of every bar of a chunk before it takes the next one
+                for _ in range(len(bar) if isinstance(bar, pd.DataFrame) else 1):
+                    events = await self.generate(loop, signals)
+                    current_bar = await self.execute(events, execute_event, current_bar)
+        except BaseException:
+            backtester.abort_run()
+            raise
+        finally:
+            reader.cancel()
+
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+
+        # Without bars left the generator closes the last position
+        self.stopping = True
+        feed.clear()
+
+        for events in signals:
+            current_bar = await self.execute(events, execute_event, current_bar)
+
+        backtester.end_run()
+
+        return backtester
+
+    def stop(self):
+        """
+        Stops the run after the bar being processed, the open position is closed on that bar.
+        """
+        self.stopping = True
+
+    async def read_source(self, queue):
+        try:
+            async for bar in self.source:
+                await queue.put(bar)
+        except Exception:
+            # The bars read are processed before the error of the source is raised
+            await queue.put(None)
+            raise
+
+        await queue.put(None)
+
+    @staticmethod
+    def iter_feed(feed):
+        # The generator only asks for a bar once the previous ones are processed, the feed is empty at the end
+        while feed:
+            yield feed.popleft()
+
+    async def generate(self, loop, signals):
+        if self.offload_ticks:
+            return await loop.run_in_executor(self.executor, next, signals)
+
+        return next(signals)
+
+    async def execute(self, events, execute_event, current_bar):
+        backtester = self.backtester
+
+        if backtester.trade_store is None:
+            backtester.create_stores()
+
+        trades = len(backtester.trades)
+
+        for event in events:
+            execute_event(event, current_bar)
+            current_bar += 1
+
+        if self.sink is not None:
+            for trade in backtester.trades[trades:]:
+                await self.sink(trade)
+
+        return current_bar
@@ -0,0 +1,207 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from backtestify.event_execution_context import EventExecutionContext
+from backtestify.order_book import OrderBook
+from backtestify.event_execution_strategy import SignalEventExecutionStrategy
+from backtestify.event_registry import EventRegistry
+from backtestify.event_type import EventType
+from backtestify.record_store import RecordStore
+from backtestify.signal_type import SignalType
+from backtestify.trade_store import TradeStore
+
+
+class PortfolioBacktester:
+    """
+    The PortfolioBacktester class backtests many instruments against a shared account. The bars of every strategy
+    are merged into a single time-ordered stream with a heap-based k-way merge, generating the events of a bar only
+    when it is its turn, and every symbol keeps its own trade state.
+
+    The balance is shared by all the positions. The account equity (balance plus the unrealized profit of every
+    position) and the used margin are kept as running sums updated with the change of the symbol of each event,
+    so the cost of an event doesn't depend on the number of symbols. A position can only be opened with the equity
+    left after reserving the margin of the other open positions.
+
+    Attributes:
+        strategies (dict): The strategy of every symbol, by symbol.
+        instruments (dict): The instrument of every symbol, by symbol.
+        account (Account): The shared account.
+        current_trade_states (dict): The current trade state of every symbol, by symbol.
+        trades (list): The trades of all the symbols, in execution order.
+        trade_symbols (list): The symbol of every trade.
+        account_history (RecordStore): The timestamp, balance, equity and used margin after every merged bar.
+    """
+
+    def __init__(self, strategies, instruments, account, intrabar_resolvers=None, cost_models=None, event_registry=None):
+        """
+        Initializes a new instance of the PortfolioBacktester class.
+
+        Args:
+            strategies (dict): The strategy of every symbol, by symbol.
+            instruments (dict): The instrument of every symbol, by symbol.
+            account (Account): The shared account.
+            intrabar_resolvers (dict, optional): The IntrabarResolver of the symbols whose stop loss and take
+                profit fills are resolved with a lower timeframe, by symbol. Defaults to None.
+            cost_models (dict, optional): The CostModel of the symbols whose costs change bar by bar, by symbol.
+                Defaults to None.
+            event_registry (EventRegistry, optional): The execution strategy of every event type, shared by the
+                symbols. Defaults to None, the signal events only.
+        """
+        if strategies.keys() != instruments.keys():
+            raise ValueError("Every symbol must have a strategy and an instrument.")
+
+        self.strategies = strategies
+        self.instruments = instruments
+        self.account = account
+        self.intrabar_resolvers = intrabar_resolvers or {}
+        self.cost_models = cost_models or {}
+        self.event_registry = EventRegistry(event_registry.execution_strategies if event_registry is not None else None)
+
+        if EventType.SIGNAL not in self.event_registry:
+            self.event_registry.register(EventType.SIGNAL, SignalEventExecutionStrategy())
+
+        self.symbols = list(strategies)
+        self.reset()
+
+    def reset(self):
+        # Per symbol state as lists by position in self.symbols
+        size = len(self.symbols)
+        self.instrument_list = [self.instruments[symbol] for symbol in self.symbols]
+        self.intrabar_resolver_list = [self.intrabar_resolvers.get(symbol) for symbol in self.symbols]
+        self.bar_costs_list = [
+            self.cost_models[symbol].compute(self.strategies[symbol].prices_info, self.instruments[symbol])
+            if symbol in self.cost_models else None
+            for symbol in self.symbols
+        ]
+        self.order_books = [OrderBook() for _ in range(size)]
+        # The execution context of every symbol, only the fields that change are set before each event
+        self.contexts = [
+            EventExecutionContext(
+                instrument=self.instrument_list[position],
+                intrabar_resolver=self.intrabar_resolver_list[position],
+                bar_costs=self.bar_costs_list[position],
+                order_book=self.order_books[position],
+            )
+            for position in range(size)
+        ]
+        self.trade_states = [None] * size
+        self.event_counts = [0] * size
+        self.is_open = [False] * size
+        self.margins = [0] * size
+        self.unrealized_profits = [0] * size
+        self.current_trade_states = {}
+        self.open_positions = 0
+        self.used_margin = 0
+        self.unrealized_profit = 0
+        self.trades = []
+        self.trade_symbols = []
+        self.trade_store = None
+        self.account_history = None
+
+    def iter_symbol_bars(self, position):
+        strategy = self.strategies[self.symbols[position]]
+
+        if not hasattr(strategy, "on_tick"):
+            raise NotImplementedError("Subclasses should implement a on_tick method.")
+
+        for events in strategy.iter_bar_events(strategy.on_tick):
+            # The position breaks the ties between symbols, the events are never compared
+            yield events[0].timestamp, position, events
+
+    def run(self):
+        self.reset()
+        merged_bars = heapq.merge(*[self.iter_symbol_bars(position) for position in range(len(self.symbols))])
+
+        for timestamp, position, events in merged_bars:
+            if self.trade_store is None:
+                self.create_stores()
+
+            for event in events:
+                self.execute_event(position, event)
+
+            self.account_history.append((
+                RecordStore.encode_timestamp(timestamp),
+                self.account.balance,
+                self.account.equity,
+                self.used_margin,
+            ))
+
+        self.current_trade_states = dict(zip(self.symbols, self.trade_states))
+
+    def create_stores(self):
+        bars = self.strategies[self.symbols[0]].bars
+        timestamp_dtype = RecordStore.get_timestamp_dtype(bars.timestamp_values)
+        self.trade_store = TradeStore(timestamp_dtype=timestamp_dtype)
+        self.account_history = RecordStore(np.dtype([
+            ("timestamp", timestamp_dtype),
+            ("balance", np.float64),
+            ("equity", np.float64),
+            ("used_margin", np.float64),
+        ]))
+
+    def execute_event(self, position, event):
+        execution_strategy = self.event_registry.get_execution_strategy(event.event_type)
+        trade_state = self.trade_states[position]
+
+        # The balance of every symbol is the balance of the shared account
+        if trade_state is not None:
+            trade_state.balance = self.account.balance
+
+        context = self.contexts[position]
+        context.balance = self.account.balance
+        context.current_trade_state = trade_state
+        context.current_bar = self.event_counts[position]
+        # The equity of a symbol is its balance plus its own unrealized profit, the unrealized profit of the
+        # other positions is taken from their reserved margin so the account equity is checked
+        context.reserved_margin = (
+            self.used_margin - self.margins[position] - (self.unrealized_profit - self.unrealized_profits[position])
+        )
+        result = execution_strategy.execute(event, context)
+        self.event_counts[position] += 1
+
+        if result.trade_state is not None:
+            self.update_trade_state(position, result.trade_state)
+
+        for trade in result.trades:
+            self.trades.append(trade)
+            self.trade_symbols.append(self.symbols[position])
+            self.trade_store.append_trade(trade)
+
+    def update_trade_state(self, position, trade_state):
+        is_open = trade_state.signal in [SignalType.BUY, SignalType.SELL]
+        margin = self.instrument_list[position].required_margin if is_open else 0
+        unrealized_profit = trade_state.unrealized_profit if is_open else 0
+
+        self.open_positions += is_open - self.is_open[position]
+        self.used_margin += margin - self.margins[position]
+        self.unrealized_profit += unrealized_profit - self.unrealized_profits[position]
+
+        # Drop the rounding errors of the running sums when the account is flat
+        if self.open_positions == 0:
+            self.used_margin = 0
+            self.unrealized_profit = 0
+
+        self.is_open[position] = is_open
+        self.margins[position] = margin
+        self.unrealized_profits[position] = unrealized_profit
+        self.trade_states[position] = trade_state
+
+        self.account.set_balance(trade_state.balance)
+        self.account.set_equity(trade_state.balance + self.unrealized_profit)
+
+    @property
+    def equity(self):
+        records = self.account_history.view()
+        return pd.DataFrame(
+            {column: records[column] for column in ["balance", "equity", "used_margin"]},
+            index=pd.Index(records["timestamp"], name="timestamp"),
+        )
+
+    @property
+    def results(self):
+        df_trades = self.trade_store.to_frame()
+        df_trades.insert(0, "symbol", np.array(self.trade_symbols, dtype=object))
+
+        return df_trades
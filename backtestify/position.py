@@ -0,0 +1,66 @@
+from backtestify.signal_type import SignalType
+
+
+class Position:
+    """
+    The Position class represents one of the open positions of a PositionBook, with its own stop loss, take profit
+    and trailing stop.
+
+    Attributes:
+        position_id: The identifier of the position, given by the strategy or a sequence number of the book.
+        signal (SignalType): BUY for a long position, SELL for a short one.
+        size (float): The size of the position.
+        entry_price (float): The entry price, spread included, without the swap accrued since the opening. The
+            entry price with the swap is PositionBook.get_entry_price(position).
+        stop_loss (float): The stop loss price, 0 without a stop loss.
+        take_profit (float): The take profit price, 0 without a take profit.
+        trailing_stop (float): The distance of the trailing stop to the close in price units, 0 without one.
+        bar (int): The event the position was opened in.
+        timestamp (datetime.datetime): The timestamp of the opening.
+    """
+
+    __slots__ = (
+        "position_id",
+        "signal",
+        "size",
+        "entry_price",
+        "stop_loss",
+        "take_profit",
+        "trailing_stop",
+        "bar",
+        "timestamp",
+    )
+
+    def __init__(self, position_id, signal, size, entry_price, stop_loss=0, take_profit=0, trailing_stop=0, bar=None, timestamp=None):
+        """
+        Initializes a new instance of the Position class.
+
+        Args:
+            position_id: The identifier of the position.
+            signal (SignalType): BUY or SELL.
+            size (float): The size of the position.
+            entry_price (float): The entry price without the accrued swap.
+            stop_loss (float, optional): The stop loss price. Defaults to 0.
+            take_profit (float, optional): The take profit price. Defaults to 0.
+            trailing_stop (float, optional): The distance of the trailing stop in price units. Defaults to 0.
+            bar (int, optional): The event the position was opened in. Defaults to None.
+            timestamp (datetime.datetime, optional): The timestamp of the opening. Defaults to None.
+        """
+        if signal not in (SignalType.BUY, SignalType.SELL):
+            raise ValueError(f"A position is a BUY or a SELL, not {signal}.")
+
+        self.position_id = position_id
+        self.signal = signal
+        self.size = size
+        self.entry_price = entry_price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trailing_stop = trailing_stop
+        self.bar = bar
+        self.timestamp = timestamp
+
+    def __str__(self):
+        return "Position: %s, Signal: %s, Size: %s, Stop Loss: %s, Take Profit: %s" % (self.position_id, self.signal, self.size, self.stop_loss, self.take_profit)
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,209 @@
+import heapq
+
+from backtestify.position import Position
+from backtestify.signal_type import SignalType
+
+
+class PositionBook:
+    """
+    The PositionBook class keeps any number of open positions of a symbol, long and short at the same time.
+
+    The aggregates of every side are running sums updated when a position opens or closes: the total size and the
+    total size times the entry price, so the unrealized profit of the whole book is computed in constant time.
+    The swap moves the entry price of every position of a side by the same amount, it is accrued in an offset per
+    side instead of updating every position. The stop losses and take profits are in heaps by price, so a bar
+    only pops the levels inside its range, and the levels moved by a trailing stop are pushed again and the old
+    entries skipped.
+
+    Attributes:
+        positions (dict): The open positions, by position id.
+        sizes (dict): The total size of the open positions of every side, by signal.
+        used_margin (float): The margin of the open positions.
+    """
+
+    def __init__(self):
+        """
+        Initializes a new instance of the PositionBook class.
+        """
+        self.positions = {}
+        self.sizes = {SignalType.BUY: 0, SignalType.SELL: 0}
+        self.entry_values = {SignalType.BUY: 0, SignalType.SELL: 0}
+        self.swap_offsets = {SignalType.BUY: 0, SignalType.SELL: 0}
+        self.margins = {}
+        self.used_margin = 0
+        # Long stop losses and short take profits are hit by a falling price (max-heaps of negated prices),
+        # long take profits and short stop losses by a rising price (min-heaps)
+        self.stop_levels = {
+            (SignalType.BUY, "stop_loss"): [],
+            (SignalType.BUY, "take_profit"): [],
+            (SignalType.SELL, "stop_loss"): [],
+            (SignalType.SELL, "take_profit"): [],
+        }
+        self.trailing_positions = set()
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        return iter(self.positions.values())
+
+    @property
+    def net_size(self):
+        return self.sizes[SignalType.BUY] - self.sizes[SignalType.SELL]
+
+    def get_entry_price(self, position):
+        return position.entry_price + self.swap_offsets[position.signal]
+
+    def open(self, signal, size, entry_price, margin, stop_loss=0, take_profit=0, trailing_stop=0, position_id=None, bar=None, timestamp=None):
+        self.sequence += 1
+        position_id = self.sequence if position_id is None else position_id
+
+        if position_id in self.positions:
+            raise ValueError(f"A position with id {position_id} is already open.")
+
+        position = Position(
+            position_id=position_id,
+            signal=signal,
+            size=size,
+            entry_price=entry_price - self.swap_offsets[signal],
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            trailing_stop=trailing_stop,
+            bar=bar,
+            timestamp=timestamp,
+        )
+        self.positions[position_id] = position
+        self.sizes[signal] += size
+        self.entry_values[signal] += size * position.entry_price
+        self.margins[position_id] = margin
+        self.used_margin += margin
+        self.push_levels(position)
+
+        if trailing_stop:
+            self.trailing_positions.add(position_id)
+
+        return position
+
+    def close(self, position_id):
+        position = self.positions.pop(position_id)
+        self.sizes[position.signal] -= position.size
+        self.entry_values[position.signal] -= position.size * position.entry_price
+        self.used_margin -= self.margins.pop(position_id)
+        self.trailing_positions.discard(position_id)
+
+        # Drop the rounding errors of the running sums when a side is flat
+        if self.sizes[position.signal] == 0:
+            self.entry_values[position.signal] = 0
+
+        if not self.positions:
+            self.used_margin = 0
+
+        return position
+
+    def push_levels(self, position):
+        self.sequence += 1
+
+        if position.stop_loss:
+            key = -position.stop_loss if position.signal == SignalType.BUY else position.stop_loss
+            heapq.heappush(self.stop_levels[position.signal, "stop_loss"], (key, self.sequence, position.position_id, position.stop_loss))
+
+        if position.take_profit:
+            key = position.take_profit if position.signal == SignalType.BUY else -position.take_profit
+            heapq.heappush(self.stop_levels[position.signal, "take_profit"], (key, self.sequence, position.position_id, position.take_profit))
+
+    def apply_swap(self, swap_long, swap_short, point, days_per_year):
+        self.swap_offsets[SignalType.BUY] += -swap_long / days_per_year * point
+        self.swap_offsets[SignalType.SELL] += swap_short / days_per_year * point
+
+    def get_unrealized_profit(self, close_price, spread_points, point_value, currency_ratio):
+        long_size, short_size = self.sizes[SignalType.BUY], self.sizes[SignalType.SELL]
+        long_entry = self.entry_values[SignalType.BUY] + self.swap_offsets[SignalType.BUY] * long_size
+        short_entry = self.entry_values[SignalType.SELL] + self.swap_offsets[SignalType.SELL] * short_size
+
+        return (close_price * long_size - long_entry + short_entry - (close_price + spread_points) * short_size) * point_value * currency_ratio
+
+    def pop_stops(self, open_price, high_price, low_price, spread_points, resolve_levels=None):
+        """
+        Returns the positions whose stop loss or take profit is reached by a bar, as (position, signal, price)
+        with the fill price. The levels the bar opens beyond are filled first, at the open, then the stop losses
+        and the take profits inside the range of the bar at their price.
+
+        Args:
+            open_price (float): The open price of the bar.
+            high_price (float): The high price of the bar.
+            low_price (float): The low price of the bar.
+            spread_points (float): The spread of the bar in price units.
+            resolve_levels (callable, optional): Returns which level of a position reached inside the range of the
+                bar is filled, as (stop_loss, take_profit) like IntrabarResolver.resolve, or None to fill the stop
+                loss first. Defaults to None.
+        """
+        hits = {}
+        # Positions whose levels the resolver found untouched, their levels are pushed back after the bar
+        kept = {}
+        ask_open = open_price + spread_points
+        ask_high = high_price + spread_points
+        checks = [
+            # The level is reached at the open, or inside the range of the bar
+            (SignalType.BUY, "stop_loss", SignalType.STOP_LOSS, open_price, lambda level: open_price <= level, lambda level: low_price <= level),
+            (SignalType.SELL, "stop_loss", SignalType.STOP_LOSS, ask_open, lambda level: ask_open >= level, lambda level: ask_high >= level),
+            (SignalType.BUY, "take_profit", SignalType.TAKE_PROFIT, open_price, lambda level: open_price >= level, lambda level: high_price >= level),
+            (SignalType.SELL, "take_profit", SignalType.TAKE_PROFIT, ask_open, lambda level: ask_open <= level, lambda level: low_price <= level),
+        ]
+
+        for at_open in (True, False):
+            for side, kind, signal, open_fill_price, is_open_hit, is_range_hit in checks:
+                levels = self.stop_levels[side, kind]
+                is_hit = is_open_hit if at_open else is_range_hit
+
+                while levels and is_hit(levels[0][3]):
+                    _, _, position_id, level = heapq.heappop(levels)
+
+                    # Entries of closed positions or of levels moved by a trailing stop
+                    if position_id in hits or position_id in kept or not self.is_live(position_id, level, kind):
+                        continue
+
+                    position = self.positions[position_id]
+                    resolved_levels = resolve_levels(position) if resolve_levels is not None and not at_open else None
+
+                    if resolved_levels is None:
+                        hits[position_id] = (position, signal, open_fill_price if at_open else level)
+                    elif resolved_levels[0]:
+                        hits[position_id] = (position, SignalType.STOP_LOSS, position.stop_loss)
+                    elif resolved_levels[1]:
+                        hits[position_id] = (position, SignalType.TAKE_PROFIT, position.take_profit)
+                    else:
+                        kept[position_id] = position
+
+        for position in kept.values():
+            self.push_levels(position)
+
+        return list(hits.values())
+
+    def trail(self, close_price, spread_points):
+        # The stop losses follow the close of the bar, so a bar never trails into its own range
+        for position_id in self.trailing_positions:
+            position = self.positions[position_id]
+
+            if position.signal == SignalType.BUY:
+                stop_loss = close_price - position.trailing_stop
+                moved = stop_loss > position.stop_loss
+            else:
+                stop_loss = close_price + spread_points + position.trailing_stop
+                moved = position.stop_loss == 0 or stop_loss < position.stop_loss
+
+            if moved:
+                position.stop_loss = stop_loss
+                self.sequence += 1
+                key = -stop_loss if position.signal == SignalType.BUY else stop_loss
+                levels = self.stop_levels[position.signal, "stop_loss"]
+                heapq.heappush(levels, (key, self.sequence, position_id, stop_loss))
+
+                # Rebuild the heap without the moved levels once they outnumber the live ones
+                if len(levels) > 2 * len(self.positions) + 64:
+                    levels[:] = [entry for entry in levels if self.is_live(entry[2], entry[3], "stop_loss")]
+                    heapq.heapify(levels)
+
+    def is_live(self, position_id, level, kind):
+        position = self.positions.get(position_id)
+        return position is not None and getattr(position, kind) == level
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+class PriceStore:
+    """
+    The PriceStore class converts price files once into an on-disk columnar format, a `.npy` file per column
+    and a `metadata.json` sidecar, and opens them as DataFrames backed by read-only memory maps. Concurrent
+    backtests on the same symbol then share the page cache instead of parsing and holding a private copy.
+
+    Converted files are keyed by the SHA-256 of the source content and the reader arguments, so a source is only
+    imported again when it changes. The hash of a file is remembered with its size and modification time to avoid
+    reading unchanged files.
+
+    Columns that are not numeric or datetime (e.g. 'symbol') are stored as categorical codes.
+
+    Attributes:
+        root (str): The directory of the store.
+    """
+
+    version = 1
+    metadata_file = "metadata.json"
+    hashes_file = "hashes.json"
+    readers = {".csv": pd.read_csv, ".parquet": pd.read_parquet}
+
+    def __init__(self, root):
+        """
+        Initializes a new instance of the PriceStore class.
+
+        Args:
+            root (str): The directory of the store, created if it doesn't exist.
+        """
+        self.root = os.path.abspath(os.path.expanduser(root))
+        os.makedirs(self.root, exist_ok=True)
+
+    def load(self, path, reader=None, **kwargs):
+        """
+        Returns the market info of a price file, importing it into the store the first time or when it changed.
+
+        Args:
+            path (str): The price file.
+            reader (callable, optional): The function reading the file into a DataFrame, called as
+                reader(path, **kwargs). Defaults to pandas.read_csv or pandas.read_parquet by extension.
+            **kwargs: The arguments of the reader, e.g. index_col="timestamp", parse_dates=True.
+        """
+        if reader is None:
+            extension = os.path.splitext(path)[1].lower()
+
+            if extension not in self.readers:
+                raise ValueError(f"No reader for '{extension}' files, pass one with the 'reader' argument.")
+
+            reader = self.readers[extension]
+
+        reader_key = f"{getattr(reader, '__module__', '')}.{getattr(reader, '__qualname__', repr(reader))}:{sorted(kwargs.items())!r}"
+        key = hashlib.sha256(f"{self.get_file_hash(path)}:{reader_key}".encode()).hexdigest()[:32]
+
+        if not self.exists(key):
+            self.save(reader(path, **kwargs), key)
+
+        return self.open(key)
+
+    def get_file_hash(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        hashes = self.read_json(os.path.join(self.root, self.hashes_file), default={})
+        cached = hashes.get(path)
+
+        if cached is not None and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["hash"]
+
+        digest = hashlib.sha256()
+
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+
+        hashes[path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest.hexdigest()}
+        self.write_json(os.path.join(self.root, self.hashes_file), hashes)
+
+        return digest.hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        return os.path.isfile(os.path.join(self.get_path(key), self.metadata_file))
+
+    def save(self, prices_info, key):
+        """
+        Writes a DataFrame into the store under a key. The files are written to a temporary directory that is
+        renamed at the end, so readers never see a partial conversion.
+        """
+        directory = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+
+        try:
+            columns = [
+                self.save_values(directory, f"column_{position}", column, prices_info[column])
+                for position, column in enumerate(prices_info.columns)
+            ]
+            metadata = {
+                "version": self.version,
+                "rows": len(prices_info),
+                "columns": columns,
+                "index": self.save_values(directory, "index", prices_info.index.name, prices_info.index),
+            }
+            self.write_json(os.path.join(directory, self.metadata_file), metadata)
+
+            try:
+                os.rename(directory, self.get_path(key))
+            except OSError:
+                # Another process stored the same key first
+                if not self.exists(key):
+                    raise
+                shutil.rmtree(directory)
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+    def save_values(self, directory, file_name, name, values):
+        metadata = {"name": name, "file": f"{file_name}.npy"}
+        dtype = values.dtype
+
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            metadata["tz"] = str(dtype.tz)
+            array = values.tz_convert("UTC").tz_localize(None) if isinstance(values, pd.Index) else values.dt.tz_convert("UTC").dt.tz_localize(None)
+            array = array.to_numpy()
+        elif isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+            array = values.to_numpy()
+        else:
+            codes, categories = pd.factorize(values, use_na_sentinel=True)
+            metadata["categories"] = categories.tolist()
+            array = codes
+
+        np.save(os.path.join(directory, metadata["file"]), np.ascontiguousarray(array), allow_pickle=False)
+
+        return metadata
+
+    def open(self, key):
+        """
+        Opens the market info stored under a key as a DataFrame whose numeric and datetime columns are read-only
+        memory maps of the store files.
+        """
+        path = self.get_path(key)
+        metadata = self.read_json(os.path.join(path, self.metadata_file))
+
+        if metadata is None:
+            raise KeyError(f"There are no prices stored under '{key}'.")
+
+        index = pd.Index(self.open_values(path, metadata["index"]), name=metadata["index"]["name"])
+        columns = {column["name"]: self.open_values(path, column) for column in metadata["columns"]}
+
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def open_values(self, path, metadata):
+        values = np.load(os.path.join(path, metadata["file"]), mmap_mode="r", allow_pickle=False)
+
+        if "categories" in metadata:
+            categories = np.array(metadata["categories"] + [None], dtype=object)
+            return categories[values]
+
+        if "tz" in metadata:
+            return pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(metadata["tz"])
+
+        return values
+
+    @staticmethod
+    def read_json(path, default=None):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return default
+
+    @staticmethod
+    def write_json(path, data):
+        # Written next to the target and renamed so concurrent readers never see a partial file
+        descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(data, file)
+
+        os.replace(temporary_path, path)
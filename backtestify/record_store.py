@@ -0,0 +1,81 @@
+import numpy as np
+
+from backtestify.signal_type import SignalType
+
+
+class RecordStore:
+    """
+    The RecordStore class keeps a history of records in a preallocated NumPy record array, one row per record,
+    instead of one Python object per record. The array doubles its capacity when it is full, so reserving the
+    expected number of rows upfront keeps the memory of a run fixed.
+
+    Signals are stored as the value of their SignalType, 0 for None.
+
+    Attributes:
+        records (numpy.ndarray): The preallocated record array, only the first `size` rows are in use.
+        size (int): The number of records stored.
+    """
+
+    # SignalType values start at 1, the position of every signal is its value
+    signals = np.array([None, *sorted(SignalType, key=lambda signal: signal.value)], dtype=object)
+
+    def __init__(self, dtype, capacity=1024):
+        """
+        Initializes a new instance of the RecordStore class.
+
+        Args:
+            dtype (numpy.dtype): The dtype of the records.
+            capacity (int, optional): The number of rows to preallocate. Defaults to 1024.
+        """
+        self.records = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, capacity):
+        if capacity <= len(self.records):
+            return
+
+        records = np.zeros(capacity, dtype=self.records.dtype)
+        records[:self.size] = self.records[:self.size]
+        self.records = records
+
+    def append(self, values):
+        if self.size == len(self.records):
+            self.reserve(max(1, 2 * len(self.records)))
+
+        self.records[self.size] = values
+        self.size += 1
+
+    def view(self):
+        return self.records[:self.size]
+
+    def clear(self):
+        self.size = 0
+
+    @staticmethod
+    def encode_signal(signal):
+        return 0 if signal is None else signal.value
+
+    @classmethod
+    def decode_signals(cls, codes):
+        return cls.signals[codes]
+
+    @staticmethod
+    def encode_timestamp(timestamp):
+        # pandas timestamps lose the nanoseconds when numpy converts them as datetimes
+        to_datetime64 = getattr(timestamp, "to_datetime64", None)
+        return to_datetime64() if to_datetime64 is not None else timestamp
+
+    @staticmethod
+    def encode_float(value):
+        return np.nan if value is None else value
+
+    @staticmethod
+    def get_timestamp_dtype(timestamps):
+        if timestamps is None:
+            return np.dtype(object)
+
+        dtype = np.asarray(timestamps).dtype
+        return dtype if dtype.kind in "Mif" else np.dtype(object)
@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pandas as pd
+
+
+class ReplayFeed:
+    """
+    The ReplayFeed class is the client of a ReplayServer, an async iterator of the bars it sends, usable as the
+    source of a PaperTrader. Its send_fill method sends the fills back to the server and is usable as the sink.
+
+    Attributes:
+        host (str): The host of the server.
+        port (int): The port of the server.
+    """
+
+    def __init__(self, host, port):
+        """
+        Initializes a new instance of the ReplayFeed class.
+
+        Args:
+            host (str): The host of the server.
+            port (int): The port of the server.
+        """
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        if self.reader is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.reader = self.writer = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __aiter__(self):
+        return self.iter_bars()
+
+    async def iter_bars(self):
+        await self.connect()
+
+        async for line in self.reader:
+            if not line.strip():
+                continue
+
+            bar = json.loads(line)
+            bar["timestamp"] = pd.Timestamp(bar["timestamp"])
+
+            yield bar
+
+    async def send_fill(self, trade):
+        fill = {
+            "timestamp": pd.Timestamp(trade.timestamp).isoformat() if trade.timestamp is not None else None,
+            "bar": trade.bar,
+            "signal": trade.signal.name if trade.signal is not None else None,
+            "size": trade.size,
+            "price": trade.price,
+            "profit": trade.profit,
+            "balance": trade.balance,
+        }
+        self.writer.write((json.dumps(fill, default=self.to_json_value) + "\n").encode())
+        await self.writer.drain()
+
+    @staticmethod
+    def to_json_value(value):
+        # NumPy scalars aren't serializable
+        if hasattr(value, "item"):
+            return value.item()
+
+        raise TypeError(f"{type(value).__name__} is not JSON serializable.")
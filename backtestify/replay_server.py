@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import pandas as pd
+
+
+class ReplayServer:
+    """
+    The ReplayServer class replays the bars of a price file over a local TCP socket, to run a PaperTrader on
+    historical data at a chosen speed. Every client receives the bars as newline-delimited JSON objects, with the
+    timestamp in ISO format, and can send its fills back on the same connection as JSON lines.
+
+    The delay between two bars is a fixed interval or the time between their timestamps divided by the speed
+    (e.g. 60 replays one minute in one second). A client reading slower than the server is sending makes the
+    server wait for the socket buffer to drain.
+
+    Attributes:
+        prices_info (pandas.DataFrame): The bars replayed, indexed by timestamp.
+        speed (float, optional): The replay speed relative to the timestamps.
+        interval (float): The fixed delay between two bars in seconds, used without a speed.
+        host (str): The host of the server.
+        port (int): The port of the server, the one assigned by the system once started when 0.
+        fills (list): The fills sent back by the clients, as dicts.
+    """
+
+    def __init__(self, prices_info, speed=None, interval=0, host="127.0.0.1", port=0, **kwargs):
+        """
+        Initializes a new instance of the ReplayServer class.
+
+        Args:
+            prices_info (pandas.DataFrame or str): The bars, or the path of a CSV file with a 'timestamp' column.
+            speed (float, optional): The replay speed relative to the timestamps. Defaults to None, a fixed
+                interval.
+            interval (float, optional): The fixed delay between two bars in seconds. Defaults to 0.
+            host (str, optional): The host of the server. Defaults to "127.0.0.1".
+            port (int, optional): The port of the server. Defaults to 0, any free port.
+            **kwargs: The arguments of pandas.read_csv when prices_info is a path.
+        """
+        if isinstance(prices_info, str):
+            kwargs.setdefault("index_col", "timestamp")
+            kwargs.setdefault("parse_dates", True)
+            prices_info = pd.read_csv(prices_info, **kwargs)
+
+        if speed is not None and speed <= 0:
+            raise ValueError("The replay speed must be positive.")
+
+        self.prices_info = prices_info
+        self.speed = speed
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self.fills = []
+        self.server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def handle_client(self, reader, writer):
+        fills = asyncio.create_task(self.read_fills(reader))
+
+        try:
+            previous = None
+
+            for line, timestamp in self.iter_lines():
+                await asyncio.sleep(self.get_delay(previous, timestamp))
+                previous = timestamp
+                writer.write(line)
+                await writer.drain()
+
+            # The end of the replay, the client closes the connection once its fills are sent
+            writer.write_eof()
+            await fills
+        except (ConnectionError, asyncio.CancelledError):
+            fills.cancel()
+        finally:
+            writer.close()
+
+    async def read_fills(self, reader):
+        async for line in reader:
+            if line.strip():
+                self.fills.append(json.loads(line))
+
+    def iter_lines(self):
+        columns = list(self.prices_info.columns)
+
+        for row in self.prices_info.itertuples(name=None):
+            timestamp = pd.Timestamp(row[0])
+            bar = {"timestamp": timestamp.isoformat()}
+            bar.update(zip(columns, (self.to_json_value(value) for value in row[1:])))
+
+            yield (json.dumps(bar) + "\n").encode(), timestamp
+
+    def get_delay(self, previous, timestamp):
+        if previous is None:
+            return 0
+
+        if self.speed is None:
+            return self.interval
+
+        return max((timestamp - previous).total_seconds() / self.speed, 0)
+
+    @staticmethod
+    def to_json_value(value):
+        # NumPy scalars aren't serializable
+        return value.item() if hasattr(value, "item") else value
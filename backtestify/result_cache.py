@@ -0,0 +1,372 @@
+import enum
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+import types
+
+import numpy as np
+import pandas as pd
+
+from backtestify.price_store import PriceStore
+from backtestify.trade_store import TradeStore
+
+
+class ResultCache:
+    """
+    The ResultCache class keeps the results of backtests on disk so an identical backtest is not run again. A
+    result is keyed by a hash of the code of the strategy class, the arguments the strategy was created with
+    (Strategy.get_params), the instrument, the initial balance, the backtester settings (cost model, intrabar
+    resolver, hedging, event registry), the range of bars of the strategy, its higher timeframes, the market info and
+    the source of the package itself, so changing any of them is a miss.
+
+    Every entry is a directory with the trades and the equity at the end of every bar in the columnar format of
+    the PriceStore, and a `metadata.json` with the account. Entries are written to a temporary directory renamed
+    at the end. A hit updates the modification time of the entry, and once the cache exceeds max_entries or
+    max_bytes the least recently used entries are deleted.
+
+    Attributes:
+        root (str): The directory of the cache.
+        max_entries (int, optional): The maximum number of entries.
+        max_bytes (int, optional): The maximum size of the entries in bytes.
+    """
+
+    metadata_file = "metadata.json"
+    # Attributes every class has, they are not part of its code
+    class_attributes = {"__dict__", "__weakref__", "__module__", "__doc__", "__qualname__"}
+
+    def __init__(self, root, max_entries=None, max_bytes=None):
+        """
+        Initializes a new instance of the ResultCache class.
+
+        Args:
+            root (str): The directory of the cache, created if it doesn't exist.
+            max_entries (int, optional): The maximum number of entries. Defaults to None, no limit.
+            max_bytes (int, optional): The maximum size of the entries in bytes. Defaults to None, no limit.
+        """
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def get_key(self, backtester):
+        strategy = backtester.strategy
+        digest = hashlib.sha256()
+        # The hashes of the DataFrames already hashed (the market info is usually an argument of the strategy too)
+        # and the objects already visited
+        memo = {}
+
+        digest.update(ResultCache.get_package_hash().encode())
+
+        # The code of the user classes shaping the results, the strategy and the custom execution strategies
+        execution_strategies = backtester.event_registry.execution_strategies.values()
+
+        for cls in [*type(strategy).__mro__, *(type(execution_strategy) for execution_strategy in execution_strategies)]:
+            if cls.__module__.startswith("backtestify") or cls is object:
+                continue
+
+            digest.update(ResultCache.get_class_hash(cls))
+
+        for name, value in [
+            ("params", strategy.get_params()),
+            ("dataframe_history", strategy.dataframe_history),
+            ("start_bar", strategy.start_bar),
+            ("end_bar", strategy.end_bar),
+            ("resumed", strategy.resumed),
+            ("timeframes", ResultCache.get_timeframe_params(strategy.timeframes)),
+            ("prices_info", strategy.prices_info),
+            ("instrument", backtester.instrument),
+            ("initial_balance", backtester.account.balance),
+            ("cost_model", backtester.cost_model),
+            ("intrabar_resolver", backtester.intrabar_resolver),
+            ("hedging", backtester.hedging),
+            ("event_registry", backtester.event_registry.execution_strategies),
+        ]:
+            digest.update(name.encode())
+            ResultCache.update_digest(digest, value, memo)
+
+        return digest.hexdigest()[:32]
+
+    @staticmethod
+    def get_timeframe_params(timeframes):
+        # The settings of the timeframes, not their bars and alignment computed by the previous run
+        return {
+            name: (
+                timeframe.rule,
+                timeframe.prices_info if timeframe.rule is None else None,
+                timeframe.period,
+                timeframe.base_period,
+                timeframe.aggregation,
+            )
+            for name, timeframe in timeframes.items()
+        }
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_package_hash():
+        # The results change with the code of the engine, hashed once per process
+        digest = hashlib.sha256()
+        package = os.path.dirname(os.path.abspath(__file__))
+
+        for directory, _, files in sorted(os.walk(package)):
+            for file_name in sorted(files):
+                if file_name.endswith(".py"):
+                    with open(os.path.join(directory, file_name), "rb") as file:
+                        digest.update(file_name.encode())
+                        digest.update(file.read())
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_class_hash(cls):
+        digest = hashlib.sha256(cls.__qualname__.encode())
+
+        # The bytecode of the methods, not the source: classes defined in a notebook cell have no source file and
+        # comments or formatting don't change the results
+        for name, value in sorted(vars(cls).items()):
+            if name in ResultCache.class_attributes:
+                continue
+
+            digest.update(name.encode())
+            ResultCache.update_digest(digest, value, {})
+
+        return digest.digest()
+
+    @staticmethod
+    def update_digest(digest, value, memo):
+        update = ResultCache.update_digest
+
+        if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+            digest.update(f"{type(value).__name__}:{value!r};".encode())
+        elif isinstance(value, enum.Enum):
+            digest.update(f"{type(value).__qualname__}.{value.name};".encode())
+        elif isinstance(value, np.ndarray):
+            digest.update(f"ndarray:{value.dtype}:{value.shape};".encode())
+
+            if value.dtype.hasobject:
+                update(digest, value.tolist(), memo)
+            else:
+                digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+            if id(value) not in memo:
+                memo[id(value)] = ResultCache.get_frame_hash(value)
+
+            digest.update(memo[id(value)])
+        elif isinstance(value, dict):
+            digest.update(f"dict:{len(value)};".encode())
+
+            for key, item in value.items():
+                update(digest, key, memo)
+                update(digest, item, memo)
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            items = sorted(value, key=repr) if isinstance(value, (set, frozenset)) else value
+            digest.update(f"{type(value).__name__}:{len(value)};".encode())
+
+            for item in items:
+                update(digest, item, memo)
+        elif isinstance(value, (staticmethod, classmethod)):
+            update(digest, value.__func__, memo)
+        elif isinstance(value, property):
+            update(digest, (value.fget, value.fset, value.fdel), memo)
+        elif isinstance(value, types.FunctionType):
+            update(digest, value.__code__, memo)
+            update(digest, value.__defaults__, memo)
+        elif isinstance(value, types.CodeType):
+            digest.update(value.co_code)
+            update(digest, value.co_consts, memo)
+            update(digest, value.co_names, memo)
+        elif isinstance(value, type):
+            digest.update(f"type:{value.__module__}.{value.__qualname__};".encode())
+        elif hasattr(value, "__dict__") or hasattr(type(value), "__slots__"):
+            # Any other object is hashed by its class and its attributes, once
+            if id(value) in memo:
+                digest.update(f"visited:{type(value).__qualname__};".encode())
+                return None
+
+            memo[id(value)] = value
+            attributes = dict(getattr(value, "__dict__", {}))
+
+            for slot in getattr(type(value), "__slots__", ()):
+                if hasattr(value, slot):
+                    attributes[slot] = getattr(value, slot)
+
+            digest.update(f"object:{type(value).__module__}.{type(value).__qualname__};".encode())
+            update(digest, dict(sorted(attributes.items())), memo)
+        else:
+            digest.update(f"{type(value).__qualname__}:{value!r};".encode())
+
+    @staticmethod
+    def get_frame_hash(frame):
+        digest = hashlib.sha256(f"{type(frame).__name__}:{len(frame)};".encode())
+
+        if isinstance(frame, pd.DataFrame):
+            digest.update(repr([(column, str(dtype)) for column, dtype in frame.dtypes.items()]).encode())
+        else:
+            digest.update(f"{frame.name!r}:{frame.dtype};".encode())
+
+        if isinstance(frame, pd.Index):
+            frame = frame.to_series(index=pd.RangeIndex(len(frame)))
+
+        digest.update(f"{frame.index.name!r}:{frame.index.dtype};".encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+
+        return digest.digest()
+
+    def get_path(self, key):
+        return os.path.join(self.root, key)
+
+    def exists(self, key):
+        return os.path.isfile(os.path.join(self.get_path(key), self.metadata_file))
+
+    def load(self, key, backtester):
+        """
+        Restores the result stored under a key into a backtester: the trades, the equity at the end of every bar
+        and the account. Returns False on a miss. The events and trade states of the run are not stored.
+        """
+        path = self.get_path(key)
+        metadata = PriceStore.read_json(os.path.join(path, self.metadata_file))
+
+        if metadata is None:
+            return False
+
+        try:
+            store = PriceStore(path)
+            trades = store.open("trades")
+            bar_states = store.open("bar_states")
+        except (FileNotFoundError, KeyError):
+            # The entry was evicted while it was read
+            return False
+
+        trade_store = TradeStore(timestamp_dtype=np.dtype(metadata["timestamp_dtype"]), capacity=max(1, len(trades)))
+        records = trade_store.records[:len(trades)]
+        records["timestamp"] = ResultCache.to_timestamp_values(trades.index, records.dtype["timestamp"])
+
+        for field in TradeStore.fields[1:]:
+            records[field] = trades[field].to_numpy()
+
+        trade_store.size = len(trades)
+        timestamps = ResultCache.to_timestamp_values(bar_states.index, np.dtype(metadata["bar_timestamp_dtype"]))
+
+        backtester.events = []
+        backtester.trading_state = None
+        backtester.event_store = None
+        backtester.current_trade_state = None
+        backtester.trade_store = trade_store
+        backtester.trades = [trade_store[index] for index in range(len(trade_store))]
+        backtester.initial_balance = metadata["initial_balance"]
+        backtester.account.set_balance(metadata["balance"])
+        backtester.account.set_equity(metadata["equity"])
+        backtester.cached_bar_states = (
+            backtester.get_run_key(),
+            (timestamps, bar_states["equity"].to_numpy().copy(), bar_states["position"].to_numpy().copy()),
+        )
+
+        # The last access of the entry, for the eviction
+        os.utime(os.path.join(path, self.metadata_file))
+
+        return True
+
+    def save(self, key, backtester):
+        """
+        Stores the result of the last run of a backtester under a key, then evicts the least recently used
+        entries over the limits.
+        """
+        if self.exists(key):
+            return None
+
+        timestamps, equity, positions = backtester.get_bar_states()
+        records = backtester.trade_store.view()
+        trades = pd.DataFrame(
+            {field: records[field] for field in TradeStore.fields[1:]},
+            index=pd.Index(records["timestamp"], name="timestamp"),
+        )
+        bar_states = pd.DataFrame(
+            {"equity": np.asarray(equity, dtype=float), "position": np.asarray(positions, dtype=bool)},
+            index=pd.Index(timestamps, name="timestamp"),
+        )
+        metadata = {
+            "timestamp_dtype": records.dtype["timestamp"].str,
+            "bar_timestamp_dtype": np.asarray(timestamps).dtype.str,
+            "initial_balance": backtester.initial_balance,
+            "balance": backtester.account.balance,
+            "equity": backtester.account.equity,
+        }
+        directory = tempfile.mkdtemp(prefix=f".{key}-", dir=self.root)
+
+        try:
+            store = PriceStore(directory)
+            store.save(trades, "trades")
+            store.save(bar_states, "bar_states")
+            PriceStore.write_json(os.path.join(directory, self.metadata_file), metadata)
+
+            try:
+                os.rename(directory, self.get_path(key))
+            except OSError:
+                # Another process stored the same key first
+                if not self.exists(key):
+                    raise
+                shutil.rmtree(directory)
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        self.evict()
+
+    def get_entries(self):
+        """
+        Returns the key, last access time and size in bytes of every entry, the least recently used first.
+        """
+        entries = []
+
+        for key in os.listdir(self.root):
+            path = self.get_path(key)
+
+            # Temporary directories of entries being written start with a dot
+            if key.startswith(".") or not self.exists(key):
+                continue
+
+            try:
+                last_access = os.stat(os.path.join(path, self.metadata_file)).st_mtime_ns
+                size = sum(
+                    os.path.getsize(os.path.join(directory, file_name))
+                    for directory, _, files in os.walk(path)
+                    for file_name in files
+                )
+            except FileNotFoundError:
+                continue
+
+            entries.append((key, last_access, size))
+
+        entries.sort(key=lambda entry: entry[1])
+
+        return entries
+
+    def evict(self):
+        if self.max_entries is None and self.max_bytes is None:
+            return None
+
+        entries = self.get_entries()
+        total_bytes = sum(size for _, _, size in entries)
+
+        for key, _, size in entries:
+            over_entries = self.max_entries is not None and len(entries) > self.max_entries
+            over_bytes = self.max_bytes is not None and total_bytes > self.max_bytes
+
+            if not over_entries and not over_bytes:
+                break
+
+            shutil.rmtree(self.get_path(key), ignore_errors=True)
+            entries = entries[1:]
+            total_bytes -= size
+
+    def clear(self):
+        for key, _, _ in self.get_entries():
+            shutil.rmtree(self.get_path(key), ignore_errors=True)
+
+    @staticmethod
+    def to_timestamp_values(index, dtype):
+        if dtype.kind == "M":
+            return index.to_numpy(dtype=dtype)
+
+        return np.asarray(index, dtype=object)
@@ -0,0 +1,96 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+
+class SharedFrame:
+    """
+    The SharedFrame class copies the market info once into a shared memory block so worker processes can
+    rebuild it as a DataFrame over the same memory instead of receiving a pickled copy per task.
+
+    Numeric and datetime columns (and index) live in the shared block, any other column (e.g. a 'symbol'
+    column of strings) is sent with the descriptor. The arrays attached by the workers are read-only.
+
+    Attributes:
+        memory (multiprocessing.shared_memory.SharedMemory): The shared memory block owned by this instance.
+        descriptor (dict): The picklable description of the block used by the workers to attach to it.
+    """
+
+    alignment = 64
+
+    def __init__(self, prices_info):
+        """
+        Initializes a new instance of the SharedFrame class.
+
+        Args:
+            prices_info (pandas.DataFrame): The market info to share.
+        """
+        arrays = {}
+        objects = {}
+
+        for column in prices_info.columns:
+            self.split_values(column, prices_info[column], arrays, objects)
+
+        self.split_values("__index__", prices_info.index, arrays, objects)
+
+        layout = []
+        offset = 0
+
+        for name, values in arrays.items():
+            layout.append((name, values.dtype.str, offset, len(values)))
+            offset += -(-values.nbytes // self.alignment) * self.alignment
+
+        self.memory = SharedMemory(create=True, size=max(offset, 1))
+
+        for (name, dtype, offset, size), values in zip(layout, arrays.values()):
+            np.ndarray(size, dtype=dtype, buffer=self.memory.buf, offset=offset)[:] = values
+
+        self.descriptor = {
+            "name": self.memory.name,
+            "columns": list(prices_info.columns),
+            "index_name": prices_info.index.name,
+            "layout": layout,
+            "objects": objects,
+        }
+
+    @staticmethod
+    def split_values(name, values, arrays, objects):
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+            arrays[name] = np.ascontiguousarray(values.to_numpy())
+        else:
+            objects[name] = values.array
+
+    @staticmethod
+    def attach(descriptor):
+        """
+        Attaches to the shared memory block of a descriptor and returns the block, that must be kept alive
+        while the DataFrame is used, and the DataFrame.
+        """
+        # Worker processes share the resource tracker of the process that owns the block, it is unlinked once
+        memory = SharedMemory(name=descriptor["name"])
+        values = dict(descriptor["objects"])
+
+        for name, dtype, offset, size in descriptor["layout"]:
+            array = np.ndarray(size, dtype=dtype, buffer=memory.buf, offset=offset)
+            array.flags.writeable = False
+            values[name] = array
+
+        index = pd.Index(values.pop("__index__"), name=descriptor["index_name"])
+        prices_info = pd.DataFrame(
+            {column: values[column] for column in descriptor["columns"]},
+            index=index,
+            copy=False,
+        )
+
+        return memory, prices_info
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
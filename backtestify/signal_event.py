@@ -1,5 +1,6 @@
 from backtestify.event import Event
 from backtestify.event_type import EventType
+from backtestify.execution_result import ExecutionResult
 from backtestify.signal_type import SignalType
 from backtestify.trade_executor import TradeExecutor
 from backtestify.trade_state import TradeState
@@ -22,9 +23,52 @@ class SignalEvent(Event):
         close_price (float, optional): The close price of the security at the time of the signal. Defaults to None.
         volume (int, optional): The trading volume of the security at the time of the signal. Defaults to None.
         swap (float, optional): The swap value for the trade. Defaults to None.
+        previous_close_price (float, optional): The close price of the previous bar, used for the gaps of the stop loss. Defaults to None.
+        bar (int, optional): The number of the bar of the signal, starting at 1. Defaults to None.
+        price (float, optional): The price of a pending order (BUY_LIMIT, SELL_LIMIT, BUY_STOP, SELL_STOP). Defaults to None.
+        order_id (optional): The id of a pending order, or of the order to cancel with CANCEL. Defaults to None.
+        oco_group (optional): The OCO group of a pending order, or the group to cancel with CANCEL. Defaults to None.
+        trailing_stop (float, optional): The distance in pips of the trailing stop of the position. Defaults to None.
+        position_id (optional): With a position book, the id of the position opened by a BUY or SELL, or of the
+            position closed by an EXIT instead of all of them. Defaults to None.
     """
 
-    def __init__(self, signal, symbol=None, timestamp=None, take_profit=None, stop_loss=None, previous_event=None):
+    __slots__ = (
+        "signal",
+        "take_profit",
+        "stop_loss",
+        "previous_event",
+        "previous_close_price",
+        "open_price",
+        "high_price",
+        "low_price",
+        "close_price",
+        "volume",
+        "swap_long",
+        "swap_short",
+        "price",
+        "order_id",
+        "oco_group",
+        "trailing_stop",
+        "position_id",
+    )
+
+    order_signals = (SignalType.BUY_LIMIT, SignalType.SELL_LIMIT, SignalType.BUY_STOP, SignalType.SELL_STOP, SignalType.CANCEL)
+
+    def __init__(
+        self,
+        signal,
+        symbol=None,
+        timestamp=None,
+        take_profit=None,
+        stop_loss=None,
+        previous_event=None,
+        price=None,
+        order_id=None,
+        oco_group=None,
+        trailing_stop=None,
+        position_id=None,
+    ):
         """
         Initializes a new instance of the SignalEvent class.
 
@@ -34,6 +78,11 @@ class SignalEvent(Event):
             timestamp (datetime.datetime, optional): A datetime object representing the time at which the event occurred. Defaults to None.
             take_profit (float, optional): The price at which to take profit for the trade. Defaults to None.
             stop_loss (float, optional): The price at which to stop loss for the trade. Defaults to None.
+            price (float, optional): The price of a pending order. Defaults to None.
+            order_id (optional): The id of a pending order, or of the order to cancel. Defaults to None.
+            oco_group (optional): The OCO group of a pending order, or the group to cancel. Defaults to None.
+            trailing_stop (float, optional): The distance in pips of the trailing stop. Defaults to None.
+            position_id (optional): The id of the position opened or closed with a position book. Defaults to None.
         """
         super().__init__(event_type=EventType.SIGNAL, timestamp=timestamp, symbol=symbol)
         self.signal = signal
@@ -46,20 +95,39 @@ class SignalEvent(Event):
         self.close_price = None
         self.volume = None
         self.swap_long = None
-        self.swap_short = None,
+        self.swap_short = None
+        self.previous_close_price = None
+        self.price = price
+        self.order_id = order_id
+        self.oco_group = oco_group
+        self.trailing_stop = trailing_stop
+        self.position_id = position_id
 
-    def execute(self, instrument, current_trade_state, balance, current_bar):
+    def execute(
+        self,
+        instrument,
+        current_trade_state,
+        balance,
+        current_bar,
+        reserved_margin=0,
+        intrabar_resolver=None,
+        bar_costs=None,
+        order_book=None,
+    ):
         if current_bar == 0:
-            return TradeState(balance)
+            return ExecutionResult(TradeState(balance))
     
-        trade = None
+        trades = []
         is_trade_open = False
 
+        spread_points, commission, swap_long, swap_short, days_per_year = self.get_costs(instrument, bar_costs)
+
         trade_state = TradeState.copy_and_update(
             current_trade_state=current_trade_state,
-            swap_long=self.swap_long,
-            swap_short=self.swap_short,
+            swap_long=swap_long,
+            swap_short=swap_short,
             point=instrument.point,
+            days_per_year=days_per_year,
         )
 
         stop_loss, use_stop_loss = self.get_stop_loss(trade_state.stop_loss)
@@ -67,32 +135,68 @@ class SignalEvent(Event):
         stop_loss_pips = self.calculate_stop_loss(use_stop_loss, stop_loss, instrument.pips)
         take_profit_pips = self.calculate_take_profit(use_take_profit, take_profit, instrument.pips)
         
+        # Equity left for this position once the margin of the other positions of the account is reserved
+        available_equity = trade_state.equity - reserved_margin
+
         trade_executor = TradeExecutor(
             timestamp=self.timestamp,
             current_bar=current_bar,
-            equity=trade_state.equity,
+            equity=available_equity,
             margin=instrument.margin,
             currency_ratio=instrument.currency_ratio,
         )
 
+        open_price = self.open_price
+        entry_signal = self.signal
+        trailing_stop = self.trailing_stop
+        # A position opened by a triggered order checks its stop loss and take profit from the next bar, the high
+        # and low of the fill bar may have been printed before the fill
+        is_order_fill = False
+        # The pending orders reached by the bar, before the orders of this event are placed
+        triggered_orders = order_book.trigger(self.bar, self.open_price, self.high_price, self.low_price) if order_book is not None else ()
+
+        if self.signal in self.order_signals:
+            if order_book is None:
+                raise ValueError("Pending orders need an order book in the execution context.")
+
+            order_book.place_event(self)
+
         if trade_state.signal is None:
-            if trade_state.equity <= instrument.required_margin or (self.signal != SignalType.BUY and self.signal != SignalType.SELL):
-                return trade_state
+            # A triggered order opens the position when the event doesn't trade at market
+            if triggered_orders and entry_signal not in [SignalType.BUY, SignalType.SELL, SignalType.EXIT] and available_equity > instrument.required_margin:
+                order = triggered_orders[0]
+                order_book.fill(order)
+                entry_signal, open_price, trailing_stop = order.side, order.get_fill_price(self.open_price), order.trailing_stop
+                use_stop_loss, use_take_profit = order.stop_loss is not None, order.take_profit is not None
+                stop_loss_pips = self.calculate_stop_loss(use_stop_loss, order.stop_loss, instrument.pips)
+                take_profit_pips = self.calculate_take_profit(use_take_profit, order.take_profit, instrument.pips)
+                is_order_fill = True
+
+            if available_equity <= instrument.required_margin or (entry_signal != SignalType.BUY and entry_signal != SignalType.SELL):
+                return ExecutionResult(trade_state)
             
-            trade = trade_executor.open_trade(
+            trades.append(trade_executor.open_trade(
                 trade_state=trade_state,
-                commission=instrument.commission,
+                commission=commission,
                 position_size=instrument.position_size,
-                event_signal=self.signal,
+                event_signal=entry_signal,
                 use_stop_loss=use_stop_loss,
                 stop_loss_pips=stop_loss_pips,
                 use_take_profit=use_take_profit,
                 take_profit_pips=take_profit_pips,
-                open_price=self.open_price,
-                spread_points=instrument.spread_points
-            )
+                open_price=open_price,
+                spread_points=spread_points
+            ))
+            trade_state.trailing_stop = trailing_stop * instrument.pips if trailing_stop else 0
+            is_trade_open = True
 
         if trade_state.signal in [SignalType.BUY, SignalType.SELL, SignalType.EXIT]:
+            # Once a position is open its levels are prices stored in the trade state,
+            # the stop loss and take profit of the event are pips only used to open it
+            stop_loss, use_stop_loss = trade_state.stop_loss, trade_state.stop_loss > 0
+            take_profit, use_take_profit = trade_state.take_profit, trade_state.take_profit > 0
+            previous_close_price = self.get_previous_close_price()
+
             close_buy_position, close_sell_position = trade_executor.should_close_position(
                 trade_state_signal=trade_state.signal,
                 event_signal=self.signal,
@@ -100,22 +204,41 @@ class SignalEvent(Event):
                 stop_loss=stop_loss,
                 use_take_profit=use_take_profit,
                 take_profit=take_profit,
-                spread_points=instrument.spread_points,
-                open_price=self.open_price
+                spread_points=spread_points,
+                open_price=open_price
             )
 
             if (trade_state.signal == SignalType.BUY and close_buy_position) or (trade_state.signal == SignalType.SELL and close_sell_position):
-                trade = trade_executor.close_trade(
+                trades.append(trade_executor.close_trade(
                     trade_state=trade_state,
                     trade_state_signal=trade_state.signal,
                     open_price=self.open_price,
-                    spread_point=instrument.spread_points,
+                    spread_point=spread_points,
                     position_size=instrument.position_size,
                     trade_state_price=trade_state.adjusted_price,
                     event_signal=self.signal,
-                )
-            else:
-                if use_stop_loss:
+                ))
+            elif not is_order_fill:
+                trade = None
+                check_stop_loss, check_take_profit = use_stop_loss, use_take_profit
+
+                if intrabar_resolver is not None:
+                    resolved_levels = intrabar_resolver.resolve(
+                        timestamp=self.timestamp,
+                        trade_state_signal=trade_state.signal,
+                        stop_loss=stop_loss,
+                        take_profit=take_profit,
+                        use_stop_loss=use_stop_loss,
+                        use_take_profit=use_take_profit,
+                        spread_points=spread_points,
+                        high_price=self.high_price,
+                        low_price=self.low_price,
+                    )
+
+                    if resolved_levels is not None:
+                        check_stop_loss, check_take_profit = resolved_levels
+
+                if check_stop_loss:
                     trade = trade_executor.execute_stop_loss(
                         is_trade_open=is_trade_open,
                         trade_state_signal=trade_state.signal,
@@ -124,15 +247,15 @@ class SignalEvent(Event):
                         low_price=self.low_price,
                         high_price=self.high_price,
                         close_price=self.close_price,
-                        spread_points=instrument.spread_points,
-                        previous_close_price=self.previous_event.close_price,
-                        commission=instrument.commission,
+                        spread_points=spread_points,
+                        previous_close_price=previous_close_price,
+                        commission=commission,
                         position_size=instrument.position_size,
                         point_value=instrument.point_value,
                         event_signal=self.signal
                     )
 
-                if use_take_profit:
+                if check_take_profit and trade is None:
                     trade = trade_executor.execute_take_profit(
                         is_trade_open=is_trade_open,
                         trade_state_signal=trade_state.signal,
@@ -141,17 +264,57 @@ class SignalEvent(Event):
                         low_price=self.low_price,
                         high_price=self.high_price,
                         close_price=self.close_price,
-                        spread_points=instrument.spread_points,
-                        previous_close_price=self.previous_event.close_price,
-                        commission=instrument.commission,
+                        spread_points=spread_points,
+                        previous_close_price=previous_close_price,
+                        commission=commission,
                         position_size=instrument.position_size,
                         point_value=instrument.point_value,
                         event_signal=self.signal,
                     )
 
-            trade_state = self.update_unrealized_profit(trade_state, instrument, self.close_price)
+                if trade is not None:
+                    trades.append(trade)
+
+            if trade_state.trailing_stop and trade_state.signal in [SignalType.BUY, SignalType.SELL]:
+                self.trail_stop_loss(trade_state, spread_points)
 
-        return trade_state, trade
+            trade_state = self.update_unrealized_profit(trade_state, instrument, self.close_price, spread_points)
+
+        return ExecutionResult(trade_state, trades)
+
+    def get_costs(self, instrument, bar_costs=None):
+        if bar_costs is None:
+            return instrument.spread_points, instrument.commission, self.swap_long, self.swap_short, None
+
+        # The costs of the bar of the event, computed once per run by the cost model
+        index = self.bar - 1
+
+        return (
+            bar_costs.spread_points[index],
+            bar_costs.commission[index],
+            bar_costs.swap_long[index],
+            bar_costs.swap_short[index],
+            bar_costs.days_per_year,
+        )
+
+    def trail_stop_loss(self, trade_state, spread_points):
+        # The stop loss follows the close of the bar, so a bar never trails into its own range
+        if trade_state.signal == SignalType.BUY:
+            stop_loss = self.close_price - trade_state.trailing_stop
+
+            if stop_loss > trade_state.stop_loss:
+                trade_state.stop_loss = stop_loss
+        else:
+            stop_loss = self.close_price + spread_points + trade_state.trailing_stop
+
+            if trade_state.stop_loss == 0 or stop_loss < trade_state.stop_loss:
+                trade_state.stop_loss = stop_loss
+
+    def get_previous_close_price(self):
+        if self.previous_close_price is not None or self.previous_event is None:
+            return self.previous_close_price
+
+        return self.previous_event.close_price
 
     def get_stop_loss(self, stop_loss):
         use_stop_loss = False
@@ -185,11 +348,12 @@ class SignalEvent(Event):
     def calculate_stop_loss(self, use_stop_loss, stop_loss, pips):
         return stop_loss * pips if use_stop_loss else 0
 
-    def update_unrealized_profit(self, trade_state, instrument, close_price):
-        if trade_state.signal is None:
+    def update_unrealized_profit(self, trade_state, instrument, close_price, spread_points=None):
+        if trade_state.signal not in [SignalType.BUY, SignalType.SELL]:
             return trade_state
         
-        current_close_price = close_price + (instrument.spread_points if trade_state.signal == SignalType.SELL else 0)
+        spread_points = instrument.spread_points if spread_points is None else spread_points
+        current_close_price = close_price + (spread_points if trade_state.signal == SignalType.SELL else 0)
         unrealized_profit = (
             instrument.position_size
             * (current_close_price - trade_state.adjusted_price if trade_state.signal == SignalType.BUY else trade_state.adjusted_price - current_close_price)
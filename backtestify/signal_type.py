@@ -5,4 +5,10 @@ class SignalType(Enum):
     SELL = auto()
     EXIT = auto()
     TAKE_PROFIT = auto()
-    STOP_LOSS = auto()
\ No newline at end of file
+    STOP_LOSS = auto()
+    # Pending orders, kept in the order book until the price reaches them
+    BUY_LIMIT = auto()
+    SELL_LIMIT = auto()
+    BUY_STOP = auto()
+    SELL_STOP = auto()
+    CANCEL = auto()
@@ -1,13 +1,114 @@
+from backtestify.bar_data import BarData
+from backtestify.bar_window import BarWindow
 from backtestify.event_type import EventType
 from backtestify.event import Event
+from backtestify.history import History
 from backtestify.signal_event import SignalEvent
 from backtestify.signal_type import SignalType
 
 class Strategy:
-    def __init__(self, prices_info):
+    def __new__(cls, *args, **kwargs):
+        strategy = super().__new__(cls)
+        # The arguments the strategy is created with, its parameters for the ResultCache
+        strategy.init_args = (args, kwargs)
+
+        return strategy
+
+    def __init__(self, prices_info=None, dataframe_history=True):
         self.prices_info = prices_info
+
+        # The market info is hashed on its own, the parameters don't keep a reference to it
+        if prices_info is not None and hasattr(self, "init_args"):
+            args, kwargs = self.init_args
+            self.init_args = (
+                tuple("prices_info" if arg is prices_info else arg for arg in args),
+                {name: "prices_info" if arg is prices_info else arg for name, arg in kwargs.items()},
+            )
+
+        self.dataframe_history = dataframe_history
+        self.bars = None
         self.current_index = 0
+        # Row of the current bar in self.bars, it differs from current_index when the bars are streamed
+        self.bar_position = 0
         self.events = []
+        # Stateful indicators fed with every bar before on_tick, by name
+        self.indicators = {}
+        # Higher timeframes moved to the last bar closed before on_tick, by name
+        self.timeframes = {}
+        # Range of bars run by apply_strategy, the bars before start_bar are only history. A range starting
+        # after the first bar resumes the indicators from a checkpoint restored with set_state
+        self.start_bar = 0
+        self.end_bar = None
+        # Set when a Backtester resumes a run, the trade state then comes from the checkpoint, not an initial event
+        self.resumed = False
+        # Set by the Backtester when the run is instrumented
+        self.instrumentation = None
+
+    def add_indicator(self, name, indicator):
+        """
+        Adds an indicator fed with every bar before on_tick is called, its value is read in on_tick from
+        `self.indicators[name].value` or from the returned indicator.
+
+        Args:
+            name (str): The name of the indicator.
+            indicator (Indicator): The indicator, e.g. RSI(14).
+        """
+        self.indicators[name] = indicator
+
+        return indicator
+
+    def add_timeframe(self, name, timeframe):
+        """
+        Adds a higher timeframe aligned with the bars of the strategy, its closed bars are read in on_tick from
+        `self.timeframes[name].history` or from the returned timeframe, e.g. `daily.history.close[-1]` for the
+        close of the last closed day.
+
+        Args:
+            name (str): The name of the timeframe.
+            timeframe (Timeframe): The timeframe, e.g. Timeframe("1D") or Timeframe(prices_info=daily_bars).
+        """
+        self.timeframes[name] = timeframe
+
+        return timeframe
+
+    def get_params(self):
+        """
+        Returns the parameters of the strategy, the arguments it was created with. Strategies whose parameters
+        change after their creation extend it.
+        """
+        args, kwargs = getattr(self, "init_args", ((), {}))
+
+        return {"args": args, "kwargs": kwargs}
+
+    def get_state(self):
+        """
+        Returns a checkpoint of the state the strategy carries from bar to bar, the indicators. Strategies keeping
+        their own state between bars extend it.
+        """
+        return {"indicators": {name: indicator.get_state() for name, indicator in self.indicators.items()}}
+
+    def set_state(self, state):
+        """
+        Restores a checkpoint returned by get_state, into the same indicator objects.
+        """
+        for name, indicator_state in state["indicators"].items():
+            self.indicators[name].set_state(indicator_state)
+
+    def reset_indicators(self):
+        for indicator in self.indicators.values():
+            indicator.reset()
+
+    def update_indicators(self):
+        for indicator in self.indicators.values():
+            indicator.update(*[self.bars[column][self.bar_position] for column in indicator.inputs])
+
+    def align_timeframes(self):
+        for timeframe in self.timeframes.values():
+            timeframe.align(self.prices_info, self.bars.timestamp_values)
+
+    def update_timeframes(self):
+        for timeframe in self.timeframes.values():
+            timeframe.move_to(self.bar_position)
 
     def get_past_info(self, shift=1):
         return self.prices_info.iloc[:self.current_index + shift]
@@ -16,51 +117,35 @@ class Strategy:
         required_columns = ["open", "high", "low", "close"]
         optional_columns = ["volume"]
 
-        past_info = self.get_past_info()
-
         for column in required_columns:
-            if column not in past_info.columns:
+            if column not in self.bars:
                 raise ValueError(f"The market info must have a '{column}' column.")
-            setattr(signal, f"{column}_price", past_info[column].iloc[-1])
+            setattr(signal, f"{column}_price", self.bars[column][self.bar_position])
 
         for column in optional_columns:
-            if column in past_info.columns:
-                setattr(signal, column, past_info[column].iloc[-1])
+            if column in self.bars:
+                setattr(signal, column, self.bars[column][self.bar_position])
 
     def set_timestamp_if_none(self, signal):
         if signal.timestamp is not None:
             return None
 
-        past_info = self.get_past_info()
-
-        if past_info.index.name == "timestamp":
-            signal.timestamp = past_info.index[-1]
-        elif "timestamp" in past_info.columns:
-            signal.timestamp = past_info["timestamp"].iloc[-1]
-        else:
-            raise ValueError("The market info must have a 'timestam' column or index.")
+        signal.timestamp = self.bars.get_timestamp(self.bar_position)
 
         return None
         
     def set_swap_info_if_none(self, signal):
-        past_info = self.get_past_info()
-
         if signal.swap_long is not None and signal.swap_short is not None:
             return None
 
-        past_info = self.get_past_info()
-
         for attr in ["swap_long", "swap_short"]:
-            last_value = past_info.get(attr)
-            setattr(signal, attr, last_value.iloc[-1] if last_value is not None else 0)
+            setattr(signal, attr, self.bars[attr][self.bar_position] if attr in self.bars else 0)
 
     def set_symbol_if_none(self, signal):
-        past_info = self.get_past_info()
-
-        if signal.symbol is not None or "symbol" not in past_info.columns:
+        if signal.symbol is not None or "symbol" not in self.bars:
             return
         
-        signal.symbol = past_info["symbol"].iloc[-1]
+        signal.symbol = self.bars["symbol"][self.bar_position]
 
     def get_signal_events(self, events):
         return [event for event in events if event.event_type == EventType.SIGNAL]
@@ -73,54 +158,101 @@ class Strategy:
         
         return signal_events[0]
 
-    def set_previous_event(self, signal):
-        if len(self.events) == 0:
-            signal.previous_event = None
+    def set_previous_close_price(self, signal):
+        # Only the close price is kept, linking the previous event would keep every event alive
+        if self.current_index == 0:
+            signal.previous_close_price = None
             return None
 
-        signal.previous_event = self.events[-1]
+        signal.previous_close_price = self.bars["close"][self.bar_position - 1]
 
     def set_bar_index(self, signal):
         signal.bar = self.current_index + 1
 
-    def set_information(self, signals):
-        signals = self.get_signal_events(signals)
+    def set_information(self, events):
+        for event in events:
+            # Every event has the time, symbol and bar it was generated on, only the signals the prices of the bar
+            if event.event_type == EventType.SIGNAL:
+                self.set_ohlcv(event)
+                self.set_swap_info_if_none(event)
+                self.set_previous_close_price(event)
 
-        for signal in signals:
-            self.set_ohlcv(signal)
-            self.set_timestamp_if_none(signal)
-            self.set_swap_info_if_none(signal)
-            self.set_symbol_if_none(signal)
-            self.set_previous_event(signal)
-            self.set_bar_index(signal)
+            self.set_timestamp_if_none(event)
+            self.set_symbol_if_none(event)
+            self.set_bar_index(event)
 
-    def apply_strategy(self, on_tick):
+    def get_bar_events(self, on_tick, history, is_last_bar=False):
+        if self.instrumentation is not None:
+            return self.get_instrumented_bar_events(on_tick, history, is_last_bar)
+
+        result_events = self.to_event_list(on_tick(history.to_frame() if self.dataframe_history else history), is_last_bar)
+        self.set_information(result_events)
+
+        return result_events
+
+    def get_instrumented_bar_events(self, on_tick, history, is_last_bar=False):
+        instrumentation = self.instrumentation
+        timestamp = self.bars.get_timestamp(self.bar_position)
+        instrumentation.start_bar(self.current_index, timestamp)
+
+        start = instrumentation.clock()
+        result_events = on_tick(history.to_frame() if self.dataframe_history else history)
+        on_tick_end = instrumentation.clock()
+        result_events = self.to_event_list(result_events, is_last_bar)
+        self.set_information(result_events)
+        end = instrumentation.clock()
+
+        instrumentation.add_time("on_tick", on_tick_end - start)
+        instrumentation.add_time("set_information", end - on_tick_end)
+        instrumentation.end_bar(self.current_index, timestamp, end - start)
+
+        return result_events
+
+    def to_event_list(self, result_events, is_last_bar=False):
+        # Create initial event to open the first trade
+        initial_event = SignalEvent(signal=None) if self.current_index == self.start_bar and not self.resumed else None
+
+        # Create last event to close the last trade
+        last_event = SignalEvent(signal=SignalType.EXIT) if is_last_bar else None
+
+        if result_events is None or (isinstance(result_events, (list, tuple)) and not result_events):
+            result_events = [SignalEvent(signal=None)]
+        elif isinstance(result_events, Event):
+            result_events = [result_events]
+        else:
+            result_events = list(result_events)
+
+        if initial_event:
+            # The initial event is always none because is the way to create the trade state
+            result_events = [initial_event, *result_events]
+        if last_event:
+            result_events.append(last_event)
+
+        return result_events
+
+    def iter_bar_events(self, on_tick):
         # Save the amount of size of the prices_info
         prices_info_size = len(self.prices_info)
+        end_bar = prices_info_size if self.end_bar is None else min(self.end_bar, prices_info_size)
+        self.bars = BarData(self.prices_info)
+        history = History(self.bars)
 
-        for index, _ in enumerate(self.prices_info.itertuples()):
-            self.current_index = index
-            history = self.get_past_info(shift=1)
-            result_events = on_tick(history)
+        self.align_timeframes()
 
-            # Create initial event to open the first trade
-            initial_event = SignalEvent(signal=None) if index == 0 else None
+        if self.start_bar == 0:
+            self.reset_indicators()
 
-            # Create last event to close the last trade
-            last_event = SignalEvent(signal=SignalType.EXIT) if index == prices_info_size - 1 else None
-
-            if result_events is None or (isinstance(result_events, (list, tuple)) and not result_events):
-                result_events = [SignalEvent(signal=None)]
-            elif isinstance(result_events, Event):
-                result_events = [result_events]
+        for index in range(self.start_bar, end_bar):
+            self.current_index = index
+            self.bar_position = index
+            history.end = index + 1
+            self.update_indicators()
+            self.update_timeframes()
 
-            if initial_event:
-                # The initial event is always none because is the way to create the trade state
-                result_events = [initial_event, *result_events]
-            if last_event:
-                result_events.append(last_event)
+            yield self.get_bar_events(on_tick, history, is_last_bar=index == end_bar - 1)
 
-            self.set_information(result_events)
+    def apply_strategy(self, on_tick):
+        for result_events in self.iter_bar_events(on_tick):
             self.events.extend(result_events)
 
         return self.events
@@ -130,4 +262,52 @@ class Strategy:
             raise NotImplementedError("Subclasses should implement a on_tick method.")
         
         events = self.apply_strategy(self.on_tick)
-        return events
\ No newline at end of file
+        return events
+
+    def stream_signals(self, bars, lookback=1000):
+        """
+        Generates the events bar by bar from an iterable of bars, yielding the list of events of every bar
+        as soon as on_tick returns. Only the last `lookback` bars are kept in memory and the events are not
+        stored in self.events, so any number of bars can be processed with constant memory.
+
+        Args:
+            bars (iterable): Single bars (dict, pandas.Series) or chunks of bars (pandas.DataFrame), e.g. the
+                chunks of pandas.read_csv(..., chunksize=...). Timestamps come from the 'timestamp' index,
+                column or key.
+            lookback (int, optional): The number of bars in the history passed to on_tick. Defaults to 1000.
+        """
+        if not hasattr(self, "on_tick"):
+            raise NotImplementedError("Subclasses should implement a on_tick method.")
+
+        if self.timeframes:
+            raise ValueError("Timeframes are aligned with the whole market info, not with a stream.")
+
+        history = None
+        index = -1
+
+        for chunk in bars:
+            columns, timestamps = BarWindow.to_columns(chunk)
+
+            if history is None:
+                self.bars = BarWindow(lookback, columns, timestamps)
+                history = History(self.bars)
+                self.reset_indicators()
+
+            for position in self.bars.append(columns, timestamps):
+                index += 1
+                self.current_index = index
+                self.bar_position = position
+                history.start = self.bars.get_start(position)
+                history.end = position + 1
+                self.update_indicators()
+
+                yield self.get_bar_events(self.on_tick, history)
+
+        if history is None:
+            return
+
+        # The stream doesn't know its last bar upfront, close the last trade on it once it ends
+        last_events = [SignalEvent(signal=SignalType.EXIT)]
+        self.set_information(last_events)
+
+        yield last_events
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from backtestify.bar_data import BarData
+from backtestify.history import History
+
+
+class Timeframe:
+    """
+    The Timeframe class is a higher timeframe of a strategy, e.g. daily bars on top of hourly ones, resampled
+    from the market info of the strategy or given as a separate feed.
+
+    The timeframe is aligned once per run: for every bar of the strategy, the number of higher timeframe bars
+    closed when the bar closes is precomputed, so moving the window to the current bar is a lookup. A higher bar
+    is closed once a bar of the strategy ends at or after its end, the bar in progress is never visible, which
+    keeps its high, low and close from leaking the future into on_tick.
+
+    The whole higher timeframe is known upfront, so indicators computed on it as columns (e.g. a moving average of
+    the daily closes) only use the closed bars they are read at.
+
+    Attributes:
+        rule (str or pandas.DateOffset): The resampling rule, e.g. "1D", None for a separate feed.
+        prices_info (pandas.DataFrame): The bars of the timeframe, resampled once it is aligned.
+        period (pandas.Timedelta or pandas.DateOffset): The duration of a bar of the timeframe.
+        base_period (pandas.Timedelta): The duration of a bar of the strategy.
+        aggregation (dict): The aggregation of every column when resampling.
+        bars (BarData): The columnar view of the bars of the timeframe.
+        history (History): The closed bars of the timeframe at the current bar of the strategy.
+        positions (numpy.ndarray): The number of closed bars of the timeframe at every bar of the strategy.
+    """
+
+    default_aggregation = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+    def __init__(self, rule=None, prices_info=None, period=None, base_period=None, aggregation=None):
+        """
+        Initializes a new instance of the Timeframe class.
+
+        Args:
+            rule (str or pandas.DateOffset, optional): The resampling rule of the market info of the strategy.
+                Defaults to None, prices_info is then required.
+            prices_info (pandas.DataFrame, optional): The bars of a separate feed, with their opening
+                timestamps in a 'timestamp' index or column. Defaults to None.
+            period (str or pandas.Timedelta, optional): The duration of a bar of a separate feed. Defaults to
+                None, the shortest time between two bars.
+            base_period (str or pandas.Timedelta, optional): The duration of a bar of the strategy. Defaults to
+                None, the shortest time between two of its bars.
+            aggregation (dict, optional): The aggregation of the columns when resampling. Defaults to first open,
+                max high, min low, last close, summed volume and the last value of the other columns.
+        """
+        if (rule is None) == (prices_info is None):
+            raise ValueError("A timeframe is either resampled with a rule or given as prices_info.")
+
+        self.rule = rule
+        self.prices_info = prices_info
+        self.period = pd.tseries.frequencies.to_offset(rule) if rule is not None else period
+        self.base_period = pd.Timedelta(base_period) if base_period is not None else None
+        self.aggregation = aggregation
+        self.bars = None
+        self.history = None
+        self.positions = None
+        self.aligned_info = None
+
+    def __len__(self):
+        return len(self.history) if self.history is not None else 0
+
+    def align(self, prices_info, timestamps):
+        """
+        Resamples the timeframe and precomputes its alignment with the bars of a strategy. A timeframe already
+        aligned with the same market info is left as it is.
+
+        Args:
+            prices_info (pandas.DataFrame): The market info of the strategy.
+            timestamps (numpy.ndarray): The opening timestamps of the bars of the strategy.
+        """
+        if self.aligned_info is prices_info:
+            return None
+
+        if timestamps is None:
+            raise ValueError("The market info must have a 'timestamp' column or index to align timeframes.")
+
+        timestamps = pd.DatetimeIndex(timestamps)
+
+        if self.rule is not None:
+            self.prices_info, ends = self.resample(prices_info, timestamps)
+        else:
+            starts = pd.DatetimeIndex(BarData(self.prices_info).timestamp_values)
+            period = pd.Timedelta(self.period) if self.period is not None else self.get_min_period(starts)
+            ends = starts + period
+
+        base_period = self.base_period if self.base_period is not None else self.get_min_period(timestamps)
+        # The higher bars ending before the close of every bar, the ends are sorted like the bars
+        self.positions = np.searchsorted(self.to_values(ends), self.to_values(timestamps + base_period), side="right")
+        self.bars = BarData(self.prices_info)
+        self.history = History(self.bars)
+        self.aligned_info = prices_info
+
+        return None
+
+    def resample(self, prices_info, timestamps):
+        frame = prices_info.drop(columns="timestamp", errors="ignore").set_axis(timestamps.rename("timestamp"))
+        aggregation = {column: self.default_aggregation.get(column, "last") for column in frame.columns}
+        aggregation.update(self.aggregation or {})
+        resampler = frame.resample(self.rule, label="left", closed="left")
+        resampled = resampler.agg(aggregation)
+
+        # A bar ends where the next one starts, the empty bars (e.g. weekends) are dropped once their ends are taken
+        starts = resampled.index
+        ends = starts[1:].append(pd.DatetimeIndex([starts[-1] + self.period]))
+        has_bars = resampler.size().to_numpy() > 0
+
+        return resampled[has_bars], ends[has_bars]
+
+    @staticmethod
+    def get_min_period(timestamps):
+        periods = np.diff(Timeframe.to_values(timestamps))
+        periods = periods[periods > np.timedelta64(0)]
+
+        if len(periods) == 0:
+            raise ValueError("The duration of a bar can't be inferred from less than two timestamps, pass the period.")
+
+        return pd.Timedelta(periods.min())
+
+    @staticmethod
+    def to_values(timestamps):
+        # The same unit for every index, UTC for timezone aware ones
+        return timestamps.to_numpy(dtype="datetime64[ns]")
+
+    def move_to(self, bar_position):
+        self.history.end = self.positions[bar_position]
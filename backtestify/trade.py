@@ -1,4 +1,6 @@
 class Trade:
+    __slots__ = ("timestamp", "bar", "signal", "size", "price", "profit", "balance", "stop_loss", "take_profit")
+
     def __init__(
         self,
         timestamp,
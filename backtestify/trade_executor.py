@@ -139,7 +139,8 @@ class TradeExecutor:
             spread_point
         )
 
-        trade_state.signal = event_signal
+        # The position is flat after closing, the next state copy turns EXIT into None
+        trade_state.signal = SignalType.EXIT
         trade_state.size = 0
         trade_state.unrealized_profit = 0
         trade_state.realized_profit = profit
@@ -189,8 +190,10 @@ class TradeExecutor:
     
     def execute_stop_loss(self, is_trade_open, trade_state, trade_state_signal, open_price, low_price, high_price, close_price, spread_points, previous_close_price, commission, position_size, point_value, event_signal):        
         profit = 0
+        is_stop_loss_hit = False
         
         if trade_state_signal == SignalType.BUY and low_price <= trade_state.stop_loss:
+            is_stop_loss_hit = True
             if (trade_state_signal == SignalType.BUY) and (not is_trade_open and previous_close_price > trade_state.stop_loss and open_price < trade_state.stop_loss):
                 trade_state.stop_loss = open_price
 
@@ -203,7 +206,8 @@ class TradeExecutor:
             )
 
         if trade_state_signal == SignalType.SELL and high_price + spread_points >= trade_state.stop_loss:
-            if (trade_state_signal == SignalType.SELL) and (not is_trade_open and close_price < trade_state.stop_loss and trade_state.stop_loss <= self.open_price + spread_points):
+            is_stop_loss_hit = True
+            if (trade_state_signal == SignalType.SELL) and (not is_trade_open and close_price < trade_state.stop_loss and trade_state.stop_loss <= open_price + spread_points):
                 trade_state.stop_loss = open_price + spread_points
             
             profit = (
@@ -214,6 +218,9 @@ class TradeExecutor:
                 - commission
             )
 
+        if not is_stop_loss_hit:
+            return None
+
         trade_state.signal = None
         trade_state.size = 0
         trade_state.unrealized_profit = 0
@@ -237,17 +244,19 @@ class TradeExecutor:
 
     def execute_take_profit(self, is_trade_open, trade_state, trade_state_signal, open_price, low_price, high_price, close_price, spread_points, previous_close_price, commission, position_size, point_value, event_signal):
         profit = 0
+        is_take_profit_hit = False
         
         if trade_state_signal == SignalType.BUY:
-            if not is_trade_open and self.open_price >= trade_state.take_profit:
-                trade_state.take_profit = self.open_price
+            if not is_trade_open and open_price >= trade_state.take_profit:
+                trade_state.take_profit = open_price
 
             if high_price >= trade_state.take_profit:
+                is_take_profit_hit = True
                 profit = (
-                            self.instrument.position_size
+                            position_size
                             * (trade_state.take_profit - trade_state.adjusted_price)
-                            * self.instrument.point_value
-                            * self.instrument.currency_ratio
+                            * point_value
+                            * self.currency_ratio
                             - commission
                         )
                 
@@ -255,19 +264,23 @@ class TradeExecutor:
             if (
                 not is_trade_open and
                 close_price > trade_state.take_profit and
-                trade_state.take_profit >= self.open_price + spread_points
+                trade_state.take_profit >= open_price + spread_points
             ):
-                trade_state.take_profit = self.open_price + spread_points
+                trade_state.take_profit = open_price + spread_points
 
             if low_price <= trade_state.take_profit:
+                is_take_profit_hit = True
                 profit = (
-                    self.instrument.position_size
+                    position_size
                     * (trade_state.adjusted_price - trade_state.take_profit)
-                    * self.instrument.point_value
-                    * self.instrument.currency_ratio
+                    * point_value
+                    * self.currency_ratio
                     - commission
                 )
 
+        if not is_take_profit_hit:
+            return None
+
         trade_state.signal = None
         trade_state.size = 0
         trade_state.unrealized_profit = 0
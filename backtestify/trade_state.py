@@ -14,6 +14,23 @@ class TradeState:
         realized_profit (float): The realized profit for the trade. Defaults to 0.
     """
 
+    __slots__ = (
+        "initial_timestamp",
+        "adjusted_price",
+        "stop_loss",
+        "take_profit",
+        "balance",
+        "equity",
+        "signal",
+        "size",
+        "unrealized_profit",
+        "realized_profit",
+        "entry_price",
+        "trailing_stop",
+    )
+
+    days_per_year = 252
+
     def __init__(
         self, 
         balance,
@@ -24,6 +41,7 @@ class TradeState:
         take_profit=0, 
         adjusted_price=0,
         entry_price=0,
+        trailing_stop=0,
     ):
         """
         Initializes a new instance of the TradeState class.
@@ -43,15 +61,16 @@ class TradeState:
         self.unrealized_profit = 0
         self.realized_profit = 0
         self.entry_price = entry_price
+        # The distance of the trailing stop to the close in price units, 0 without a trailing stop
+        self.trailing_stop = trailing_stop
 
     @classmethod
-    def copy_and_update(cls, current_trade_state, swap_long, swap_short, point):
+    def copy_and_update(cls, current_trade_state, swap_long, swap_short, point, days_per_year=None):
         if current_trade_state.signal is None:
             return cls(balance=current_trade_state.balance)
 
         swap = -swap_long if current_trade_state.signal == SignalType.BUY else swap_short
-        days_per_year = 252
-        adjusted_price = current_trade_state.adjusted_price + swap / days_per_year * point
+        adjusted_price = current_trade_state.adjusted_price + swap / (days_per_year or cls.days_per_year) * point
 
         return cls(
             balance=current_trade_state.balance,
@@ -59,7 +78,8 @@ class TradeState:
             signal=current_trade_state.signal if current_trade_state.signal != SignalType.EXIT else None,
             stop_loss=current_trade_state.stop_loss,
             take_profit=current_trade_state.take_profit,
-            adjusted_price=adjusted_price
+            adjusted_price=adjusted_price,
+            trailing_stop=current_trade_state.trailing_stop,
         )
 
     def __str__(self):
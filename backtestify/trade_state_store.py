@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from backtestify.record_store import RecordStore
+from backtestify.trade_state import TradeState
+
+
+class TradeStateStore(RecordStore):
+    """
+    The TradeStateStore class keeps the trade state after every event of a backtest as a row of a record array,
+    the row of an event is its index. It replaces the list of TradeState objects of the Backtester when the
+    history is recorded in stores.
+    """
+
+    fields = [
+        "signal",
+        "balance",
+        "equity",
+        "size",
+        "adjusted_price",
+        "stop_loss",
+        "take_profit",
+        "unrealized_profit",
+        "realized_profit",
+    ]
+
+    def __init__(self, capacity=1024):
+        dtype = np.dtype([
+            ("signal", np.int8),
+            ("balance", np.float64),
+            ("equity", np.float64),
+            ("size", np.float64),
+            ("adjusted_price", np.float64),
+            ("stop_loss", np.float64),
+            ("take_profit", np.float64),
+            ("unrealized_profit", np.float64),
+            ("realized_profit", np.float64),
+        ])
+        super().__init__(dtype, capacity)
+
+    def append_trade_state(self, trade_state):
+        self.append((
+            self.encode_signal(trade_state.signal),
+            trade_state.balance,
+            trade_state.equity,
+            trade_state.size,
+            trade_state.adjusted_price,
+            trade_state.stop_loss,
+            trade_state.take_profit,
+            trade_state.unrealized_profit,
+            trade_state.realized_profit,
+        ))
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+
+        if not 0 <= index < self.size:
+            raise IndexError("trade state index out of range")
+
+        record = self.records[index]
+        trade_state = TradeState(
+            balance=record["balance"],
+            size=record["size"],
+            signal=self.signals[record["signal"]],
+            stop_loss=record["stop_loss"],
+            take_profit=record["take_profit"],
+            adjusted_price=record["adjusted_price"],
+        )
+        trade_state.equity = record["equity"]
+        trade_state.unrealized_profit = record["unrealized_profit"]
+        trade_state.realized_profit = record["realized_profit"]
+
+        return trade_state
+
+    def to_frame(self):
+        records = self.view()
+        columns = {field: records[field] for field in self.fields}
+        columns["signal"] = self.decode_signals(records["signal"])
+
+        return pd.DataFrame(columns)
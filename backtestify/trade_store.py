@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from backtestify.record_store import RecordStore
+from backtestify.trade import Trade
+
+
+class TradeStore(RecordStore):
+    """
+    The TradeStore class keeps the trades of a backtest as rows of a record array with the same fields as
+    the Trade class, so the results can be built as a DataFrame without going through the Trade objects.
+    """
+
+    fields = ["timestamp", "bar", "signal", "size", "price", "profit", "balance", "stop_loss", "take_profit"]
+
+    def __init__(self, timestamp_dtype=object, capacity=1024):
+        dtype = np.dtype([
+            ("timestamp", timestamp_dtype),
+            ("bar", np.int64),
+            ("signal", np.int8),
+            ("size", np.float64),
+            ("price", np.float64),
+            ("profit", np.float64),
+            ("balance", np.float64),
+            ("stop_loss", np.float64),
+            ("take_profit", np.float64),
+        ])
+        super().__init__(dtype, capacity)
+
+    def append_trade(self, trade):
+        self.append((
+            self.encode_timestamp(trade.timestamp),
+            trade.bar,
+            self.encode_signal(trade.signal),
+            trade.size,
+            trade.price,
+            trade.profit,
+            trade.balance,
+            trade.stop_loss,
+            trade.take_profit,
+        ))
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+
+        if not 0 <= index < self.size:
+            raise IndexError("trade index out of range")
+
+        record = self.records[index]
+        timestamp = record["timestamp"]
+
+        return Trade(
+            timestamp=pd.Timestamp(timestamp) if isinstance(timestamp, np.datetime64) else timestamp,
+            bar=int(record["bar"]),
+            signal=self.signals[record["signal"]],
+            size=record["size"],
+            price=record["price"],
+            profit=record["profit"],
+            balance=record["balance"],
+            stop_loss=record["stop_loss"],
+            take_profit=record["take_profit"],
+        )
+
+    def to_frame(self):
+        records = self.view()
+        columns = {field: records[field] for field in self.fields if field != "timestamp"}
+        columns["signal"] = self.decode_signals(records["signal"])
+
+        return pd.DataFrame(columns, index=pd.Index(records["timestamp"], name="timestamp"))
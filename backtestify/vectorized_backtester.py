@@ -0,0 +1,461 @@
+import numpy as np
+import pandas as pd
+
+from backtestify.analytics import Analytics
+from backtestify.record_store import RecordStore
+from backtestify.signal_type import SignalType
+from backtestify.trade import Trade
+from backtestify.trade_state import TradeState
+from backtestify.trade_store import TradeStore
+
+
+class VectorizedBacktester:
+    """
+    The VectorizedBacktester class runs a backtest from precomputed signal arrays instead of building
+    an event, a trade state and a trade executor per bar. Entries, exits, stop loss and take profit are
+    given per bar and the fills, costs and equity curve are computed with array operations.
+
+    The results are the same as running a Strategy whose on_tick returns, for every bar, an EXIT event
+    when `exits` is set followed by a BUY or SELL event when `long_entries` or `short_entries` is set,
+    through the Backtester. The trade `bar` is the index of the event that produced it, as in the
+    Backtester.
+
+    Attributes:
+        prices_info (pandas.DataFrame): The market info with 'open', 'high', 'low' and 'close' columns and
+            optional 'swap_long' and 'swap_short' columns, indexed or with a column by 'timestamp'.
+        instrument (FinancialInstrument): The instrument being traded.
+        account (Account): The account, its balance and equity are updated at the end of the run.
+        long_entries (array-like, optional): Booleans, open a BUY position on the bar. Defaults to None.
+        short_entries (array-like, optional): Booleans, open a SELL position on the bar. Defaults to None.
+        exits (array-like, optional): Booleans, close the open position on the bar. Defaults to None.
+        stop_loss (float or array-like, optional): The stop loss in pips of the positions opened on each bar,
+            NaN means no stop loss. Defaults to None.
+        take_profit (float or array-like, optional): The take profit in pips of the positions opened on each
+            bar, NaN means no take profit. Defaults to None.
+        intrabar_resolver (IntrabarResolver, optional): Resolves the fill order of the stop loss and take profit
+            touched in the same bar. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        prices_info,
+        instrument,
+        account,
+        long_entries=None,
+        short_entries=None,
+        exits=None,
+        stop_loss=None,
+        take_profit=None,
+        intrabar_resolver=None,
+    ):
+        self.prices_info = prices_info
+        self.instrument = instrument
+        self.account = account
+        self.long_entries = long_entries
+        self.short_entries = short_entries
+        self.exits = exits
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.intrabar_resolver = intrabar_resolver
+        self.trades = []
+        self.trade_store = None
+        self.positions = None
+        self.equity = None
+        self.balance = None
+        self.initial_balance = account.balance
+        self.analytics_cache = None
+
+    def get_column(self, column, default=None):
+        if column in self.prices_info.columns:
+            return self.prices_info[column].to_numpy(dtype=float)
+
+        if default is None:
+            raise ValueError(f"The market info must have a '{column}' column.")
+
+        return np.full(len(self.prices_info), default, dtype=float)
+
+    def get_timestamps(self):
+        if self.prices_info.index.name == "timestamp":
+            return self.prices_info.index.to_numpy()
+        elif "timestamp" in self.prices_info.columns:
+            return self.prices_info["timestamp"].to_numpy()
+        else:
+            raise ValueError("The market info must have a 'timestamp' column or index.")
+
+    def get_signal_array(self, signals, size):
+        if signals is None:
+            return np.zeros(size, dtype=bool)
+
+        signals = np.asarray(signals, dtype=bool)
+
+        if signals.shape != (size,):
+            raise ValueError(f"The signal arrays must have one value per bar ({size}).")
+
+        return signals
+
+    def get_level_array(self, levels, size):
+        if levels is None:
+            return np.full(size, np.nan)
+
+        levels = np.asarray(levels, dtype=float)
+
+        if levels.ndim == 0:
+            return np.full(size, float(levels))
+
+        if levels.shape != (size,):
+            raise ValueError(f"The stop loss and take profit arrays must have one value per bar ({size}).")
+
+        return levels
+
+    def run(self):
+        size = len(self.prices_info)
+        instrument = self.instrument
+
+        if size == 0:
+            raise ValueError("The market info is empty.")
+
+        open_price = self.get_column("open")
+        high_price = self.get_column("high")
+        low_price = self.get_column("low")
+        close_price = self.get_column("close")
+        swap_long = self.get_column("swap_long", default=0)
+        swap_short = self.get_column("swap_short", default=0)
+        timestamps = self.get_timestamps()
+
+        long_entries = self.get_signal_array(self.long_entries, size)
+        short_entries = self.get_signal_array(self.short_entries, size)
+        exits = self.get_signal_array(self.exits, size)
+        entries = long_entries | short_entries
+
+        if np.any(long_entries & short_entries):
+            raise ValueError("A bar can't have a long and a short entry at the same time.")
+
+        # Stop loss and take profit levels of a position opened on each bar, 0 means not used
+        stop_loss_pips = self.get_level_array(self.stop_loss, size) * instrument.pips
+        take_profit_pips = self.get_level_array(self.take_profit, size) * instrument.pips
+        buy_open_price = open_price + instrument.spread_points
+        long_stop_loss = np.where(np.isnan(stop_loss_pips), 0, open_price - stop_loss_pips)
+        long_take_profit = np.where(np.isnan(take_profit_pips), 0, open_price + take_profit_pips)
+        short_stop_loss = np.where(np.isnan(stop_loss_pips), 0, buy_open_price + stop_loss_pips)
+        short_take_profit = np.where(np.isnan(take_profit_pips), 0, buy_open_price - take_profit_pips)
+
+        # Event layout of Strategy.apply_strategy: an initial event on the first bar, an EXIT and/or an
+        # entry (or an empty event) on every bar and a closing EXIT on the last bar
+        events_per_bar = np.maximum(exits.astype(int) + entries, 1)
+        events_per_bar[0] += 1
+        events_per_bar[-1] += 1
+        last_event = np.cumsum(events_per_bar) - 1
+        first_event = last_event - events_per_bar + 1
+        first_event[0] += 1
+        entry_event = first_event + exits
+        event_bar = np.repeat(np.arange(size), events_per_bar)
+
+        # Swap accrued by a position on every event it is carried into, as in TradeState.copy_and_update
+        long_swap = -swap_long[event_bar] / TradeState.days_per_year * instrument.point
+        short_swap = swap_short[event_bar] / TradeState.days_per_year * instrument.point
+
+        # Signal of the first event of every bar, the one that checks the open position
+        first_signal = np.full(size, None, dtype=object)
+        first_signal[long_entries] = SignalType.BUY
+        first_signal[short_entries] = SignalType.SELL
+        first_signal[exits] = SignalType.EXIT
+
+        # Next bar with an entry for every bar, size if there is none
+        next_entry = np.where(entries, np.arange(size), size)
+        next_entry = np.minimum.accumulate(next_entry[::-1])[::-1]
+        # Next bar with an exit for every bar, size if there is none
+        next_exit = np.where(exits, np.arange(size), size)
+        next_exit = np.minimum.accumulate(next_exit[::-1])[::-1]
+
+        balance = self.initial_balance = self.account.balance
+        balance_changes = np.full(size, np.nan)
+        positions = np.zeros(size, dtype=np.int8)
+        equity = np.full(size, np.nan)
+        trades = []
+        bar = 0
+
+        while bar < size:
+            entry_bar = next_entry[bar]
+
+            if entry_bar >= size or balance <= instrument.required_margin:
+                break
+
+            position_trades, balance, close_bar, reopen = self.run_trade(
+                entry_bar=entry_bar,
+                balance=balance,
+                timestamps=timestamps,
+                open_price=open_price,
+                high_price=high_price,
+                low_price=low_price,
+                close_price=close_price,
+                long_entries=long_entries,
+                exits=exits,
+                next_exit=next_exit,
+                stop_loss=long_stop_loss if long_entries[entry_bar] else short_stop_loss,
+                take_profit=long_take_profit if long_entries[entry_bar] else short_take_profit,
+                swap=long_swap if long_entries[entry_bar] else short_swap,
+                first_signal=first_signal,
+                first_event=first_event,
+                last_event=last_event,
+                entry_event=entry_event,
+                positions=positions,
+                equity=equity,
+            )
+            trades.extend(position_trades)
+            balance_changes[entry_bar] = position_trades[0].balance
+            balance_changes[close_bar] = balance
+            bar = close_bar if reopen else close_bar + 1
+
+        balance_changes[0] = self.account.balance if np.isnan(balance_changes[0]) else balance_changes[0]
+        balance_curve = pd.Series(balance_changes).ffill().to_numpy()
+        equity = np.where(np.isnan(equity), balance_curve, equity)
+
+        self.trades = trades
+        self.trade_store = TradeStore(timestamp_dtype=RecordStore.get_timestamp_dtype(timestamps), capacity=len(trades))
+        for trade in trades:
+            self.trade_store.append_trade(trade)
+        self.positions = pd.Series(positions, index=self.prices_info.index, name="position")
+        self.balance = pd.Series(balance_curve, index=self.prices_info.index, name="balance")
+        self.equity = pd.Series(equity, index=self.prices_info.index, name="equity")
+        self.account.set_balance(balance_curve[-1])
+        self.account.set_equity(equity[-1])
+
+    def run_trade(
+        self,
+        entry_bar,
+        balance,
+        timestamps,
+        open_price,
+        high_price,
+        low_price,
+        close_price,
+        long_entries,
+        exits,
+        next_exit,
+        stop_loss,
+        take_profit,
+        swap,
+        first_signal,
+        first_event,
+        last_event,
+        entry_event,
+        positions,
+        equity,
+    ):
+        instrument = self.instrument
+        size = len(open_price)
+        position_size = instrument.position_size
+        spread_points = instrument.spread_points
+        is_buy = bool(long_entries[entry_bar])
+        signal = SignalType.BUY if is_buy else SignalType.SELL
+        stop_loss = stop_loss[entry_bar]
+        take_profit = take_profit[entry_bar]
+        open_event = entry_event[entry_bar]
+
+        # Open the position (TradeExecutor.open_trade)
+        entry_price = open_price[entry_bar] + (spread_points if is_buy else 0)
+        balance -= instrument.commission
+        open_trade = Trade(
+            timestamp=timestamps[entry_bar],
+            bar=open_event,
+            signal=signal,
+            size=position_size * (1 if is_buy else -1),
+            price=entry_price,
+            profit=0,
+            balance=balance,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+        )
+
+        # The position is closed at the latest by the next EXIT after the entry bar, or on the next bar when the
+        # commission leaves the balance without the required margin
+        end = size if entry_bar + 1 >= size else min(size, next_exit[entry_bar + 1] + 1)
+
+        if balance <= instrument.required_margin:
+            end = min(end, entry_bar + 2)
+
+        # Find the bar where the position is closed in chunks growing from the entry bar, so the search stops
+        # near the close instead of going through every bar to the end of the data
+        start = entry_bar
+        chunk_size = 64
+        close_bar = None
+
+        while start < end:
+            stop = min(end, start + chunk_size)
+            close_at_open, stop_loss_hit, take_profit_hit = self.get_closes(
+                start, stop, entry_bar, is_buy, stop_loss, take_profit, open_price, high_price, low_price, exits
+            )
+
+            if balance <= instrument.required_margin:
+                close_at_open[max(entry_bar + 1 - start, 0):] = True
+
+            if self.intrabar_resolver is not None:
+                self.resolve_intrabar(start, timestamps, high_price, low_price, signal, stop_loss, take_profit, close_at_open, stop_loss_hit, take_profit_hit)
+
+            is_closed = close_at_open | stop_loss_hit | take_profit_hit
+
+            if is_closed.any():
+                close_index = int(np.argmax(is_closed))
+                close_bar = start + close_index
+                break
+
+            start = stop
+            chunk_size *= 2
+
+        if close_bar is not None:
+            close_event = open_event if close_bar == entry_bar else first_event[close_bar]
+            close_signal = signal if close_bar == entry_bar else first_signal[close_bar]
+
+            if close_at_open[close_index]:
+                close_type = SignalType.EXIT
+            elif stop_loss_hit[close_index]:
+                close_type = SignalType.STOP_LOSS
+            else:
+                close_type = SignalType.TAKE_PROFIT
+        else:
+            close_bar = size - 1
+            close_event = last_event[close_bar]
+            close_signal = SignalType.EXIT
+            close_type = SignalType.EXIT
+
+        # Adjusted price after every event the position is carried into
+        adjusted_prices = np.add.accumulate(np.concatenate(([entry_price], swap[open_event + 1:close_event + 1])))
+        adjusted_price = adjusted_prices[-1]
+
+        # Equity at the end of every bar the position survives (SignalEvent.update_unrealized_profit)
+        held = slice(entry_bar, close_bar)
+        bar_adjusted_prices = adjusted_prices[last_event[held] - open_event]
+        current_close_price = close_price[held] + (0 if is_buy else spread_points)
+        unrealized_profit = (
+            position_size
+            * (current_close_price - bar_adjusted_prices if is_buy else bar_adjusted_prices - current_close_price)
+            * instrument.point_value
+            * instrument.currency_ratio
+        )
+        positions[held] = 1 if is_buy else -1
+        equity[held] = balance + unrealized_profit
+
+        # Close the position (TradeExecutor.close_trade, execute_stop_loss and execute_take_profit)
+        if close_type == SignalType.EXIT:
+            exit_price = open_price[close_bar] + (0 if is_buy else spread_points)
+            profit = position_size * (exit_price - adjusted_price if is_buy else adjusted_price - exit_price)
+            trade_signal = close_signal
+            trade_price = adjusted_price
+        else:
+            level = stop_loss if close_type == SignalType.STOP_LOSS else take_profit
+            profit = (
+                position_size
+                * (level - adjusted_price if is_buy else adjusted_price - level)
+                * instrument.point_value
+                * instrument.currency_ratio
+                - instrument.commission
+            )
+            trade_signal = close_type
+            trade_price = level
+
+        balance += profit
+        close_trade = Trade(
+            timestamp=timestamps[close_bar],
+            bar=close_event,
+            signal=trade_signal,
+            size=position_size * (1 if close_signal == SignalType.BUY else -1),
+            price=trade_price,
+            profit=profit,
+            balance=balance,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+        )
+
+        # A position closed by the EXIT event of a bar can be replaced by the entry that follows it
+        reopen = close_bar != entry_bar and close_event == first_event[close_bar] and bool(exits[close_bar])
+
+        return [open_trade, close_trade], balance, close_bar, reopen
+
+    def get_closes(self, start, stop, entry_bar, is_buy, stop_loss, take_profit, open_price, high_price, low_price, exits):
+        # The bars from start to stop where the position is closed at the open (a gap through a level or an EXIT)
+        # and where its stop loss and take profit are touched, the entry bar only checks the intrabar levels
+        spread_points = self.instrument.spread_points
+        bars = slice(start, stop)
+
+        if is_buy:
+            gap = ((stop_loss > 0) & (stop_loss >= open_price[bars])) | ((take_profit > 0) & (take_profit <= open_price[bars]))
+            stop_loss_hit = (stop_loss > 0) & (low_price[bars] <= stop_loss)
+            take_profit_hit = (take_profit > 0) & (high_price[bars] >= take_profit)
+        else:
+            ask_open_price = open_price[bars] + spread_points
+            gap = ((stop_loss > 0) & (stop_loss <= ask_open_price)) | ((take_profit > 0) & (take_profit >= ask_open_price))
+            stop_loss_hit = (stop_loss > 0) & (high_price[bars] + spread_points >= stop_loss)
+            take_profit_hit = (take_profit > 0) & (low_price[bars] <= take_profit)
+
+        # The EXIT of the entry bar comes before the entry, it can't close the new position
+        close_at_open = gap | exits[bars]
+
+        if start == entry_bar:
+            close_at_open[0] = gap[0]
+
+        return close_at_open, stop_loss_hit, take_profit_hit
+
+    def resolve_intrabar(self, start, timestamps, high_price, low_price, signal, stop_loss, take_profit, close_at_open, stop_loss_hit, take_profit_hit):
+        # Resolve the bars touching the levels in order, until the first one that closes the position
+        resolver = self.intrabar_resolver
+        touched = stop_loss_hit | take_profit_hit if resolver.resolve_all_levels else stop_loss_hit & take_profit_hit
+
+        for index in np.flatnonzero(close_at_open | stop_loss_hit | take_profit_hit):
+            if close_at_open[index] or not touched[index]:
+                break
+
+            bar = start + index
+            resolved_levels = resolver.resolve(
+                timestamp=timestamps[bar],
+                trade_state_signal=signal,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+                use_stop_loss=stop_loss > 0,
+                use_take_profit=take_profit > 0,
+                spread_points=self.instrument.spread_points,
+                high_price=high_price[bar],
+                low_price=low_price[bar],
+            )
+
+            if resolved_levels is None:
+                break
+
+            stop_loss_hit[index], take_profit_hit[index] = resolved_levels
+
+            if stop_loss_hit[index] or take_profit_hit[index]:
+                break
+
+    @property
+    def results(self):
+        return self.trade_store.to_frame()
+
+    def get_closing_trades(self):
+        # Every position is a trade opening it followed by a trade closing it
+        return np.arange(1, len(self.trade_store), 2)
+
+    def get_analytics(self, periods_per_year=252):
+        """
+        Returns the Analytics of the last run, memoized until the next run.
+
+        Args:
+            periods_per_year (int, optional): The number of bars per year. Defaults to 252.
+        """
+        analytics_key = (self.trade_store, periods_per_year)
+
+        if self.analytics_cache is None or self.analytics_cache[0] != analytics_key:
+            self.analytics_cache = (
+                analytics_key,
+                Analytics(
+                    equity=self.equity,
+                    trade_profits=self.trade_store.view()["profit"][self.get_closing_trades()],
+                    initial_balance=self.initial_balance,
+                    positions=self.positions.to_numpy() != 0,
+                    periods_per_year=periods_per_year,
+                ),
+            )
+
+        return self.analytics_cache[1]
+
+    @property
+    def analytics(self):
+        return self.get_analytics()
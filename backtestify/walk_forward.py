@@ -0,0 +1,239 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from backtestify.account import Account
+from backtestify.backtester import Backtester
+from backtestify.bar_data import BarData
+from backtestify.optimizer import Optimizer
+from backtestify.shared_frame import SharedFrame
+
+# State of a worker process, set once by WalkForward.init_worker
+_worker = {}
+
+
+class WalkForward:
+    """
+    The WalkForward class evaluates a Strategy subclass on rolling or anchored train/test windows of the same
+    market info. With a parameter grid, the parameters with the best train metrics of every window are the ones
+    evaluated on its test segment, otherwise every test segment runs with the given parameters.
+
+    The segments run in parallel worker processes sharing the market info through shared memory. A segment
+    doesn't replay the bars before it to warm up its indicators: a single pass per parameter set feeds only the
+    indicators over the market info and checkpoints the strategy state (Strategy.get_state) at every segment
+    start, and every segment resumes from its checkpoint and runs only its own bars.
+
+    Attributes:
+        strategy_cls (type): The Strategy subclass, created as strategy_cls(prices_info, **params).
+        prices_info (pandas.DataFrame): The market info of the windows.
+        instrument (FinancialInstrument): The instrument being traded.
+        account (Account): The account whose initial balance is used by every segment.
+        train_size (int): The number of bars of the train segments, the first one with anchored windows.
+        test_size (int): The number of bars of the test segments.
+        step (int, optional): The number of bars between the start of two windows. Defaults to test_size.
+        anchored (bool, optional): The train segments start at the first bar and grow. Defaults to False.
+        param_grid (dict or list, optional): The parameters to choose from on every train segment, as in the
+            Optimizer. Defaults to None.
+        params (dict, optional): The parameters of the strategy when there is no grid. Defaults to None.
+        sort_by (str, optional): The train metric the parameters are chosen by, the highest. Defaults to
+            "net_profit".
+        n_jobs (int, optional): The number of worker processes, 1 runs in this process. Defaults to the CPU count.
+        periods_per_year (int, optional): The number of bars per year of the metrics. Defaults to 252.
+        train_results (pandas.DataFrame): The metrics of every window and parameter set on the train segments.
+    """
+
+    def __init__(
+        self,
+        strategy_cls,
+        prices_info,
+        instrument,
+        account,
+        train_size,
+        test_size,
+        step=None,
+        anchored=False,
+        param_grid=None,
+        params=None,
+        sort_by="net_profit",
+        n_jobs=None,
+        periods_per_year=252,
+    ):
+        if train_size < 0 or test_size <= 0:
+            raise ValueError("The train size can't be negative and the test size must be positive.")
+
+        self.strategy_cls = strategy_cls
+        self.prices_info = prices_info
+        self.instrument = instrument
+        self.account = account
+        self.train_size = train_size
+        self.test_size = test_size
+        self.step = step or test_size
+        self.anchored = anchored
+        self.param_grid = param_grid
+        self.params = params or {}
+        self.sort_by = sort_by
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.periods_per_year = periods_per_year
+        self.train_results = None
+
+    def get_windows(self):
+        windows = []
+        train_start = 0
+        size = len(self.prices_info)
+
+        while train_start + self.train_size + self.test_size <= size:
+            test_start = train_start + self.train_size
+            windows.append({
+                "window": len(windows),
+                "train_start": 0 if self.anchored else train_start,
+                "train_end": test_start,
+                "test_start": test_start,
+                "test_end": test_start + self.test_size,
+            })
+            train_start += self.step
+
+        return windows
+
+    def get_checkpoints(self, params, positions):
+        """
+        Returns the strategy state before every bar position, feeding only the indicators of the strategy up to
+        the last position.
+        """
+        strategy = self.strategy_cls(self.prices_info.copy(deep=False), **params)
+        strategy.bars = BarData(strategy.prices_info)
+        strategy.reset_indicators()
+        positions = set(positions)
+        checkpoints = {}
+
+        for index in range(max(positions, default=0) + 1):
+            if index in positions:
+                checkpoints[index] = strategy.get_state()
+
+            strategy.current_index = index
+            strategy.bar_position = index
+            strategy.update_indicators()
+
+        return checkpoints
+
+    def run(self):
+        windows = self.get_windows()
+
+        if not windows:
+            raise ValueError("The market info is shorter than a train and a test segment.")
+
+        param_sets = Optimizer.expand_param_grid(self.param_grid) if self.param_grid is not None else [self.params]
+        is_search = len(param_sets) > 1
+        positions = [window["test_start"] for window in windows]
+
+        if is_search:
+            positions += [window["train_start"] for window in windows]
+
+        checkpoints = [self.get_checkpoints(params, positions) for params in param_sets]
+        worker_args = (self.strategy_cls, self.instrument, self.account.balance, self.periods_per_year)
+        n_jobs = min(self.n_jobs, len(windows) * len(param_sets))
+
+        if n_jobs <= 1:
+            WalkForward.init_worker(None, *worker_args, prices_info=self.prices_info)
+            return self.run_windows(windows, param_sets, checkpoints, is_search, map)
+
+        with SharedFrame(self.prices_info) as shared_frame:
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=WalkForward.init_worker,
+                initargs=(shared_frame.descriptor, *worker_args),
+            ) as executor:
+                return self.run_windows(windows, param_sets, checkpoints, is_search, executor.map)
+
+    def run_windows(self, windows, param_sets, checkpoints, is_search, map_function):
+        best_params = [0] * len(windows)
+
+        if is_search:
+            tasks = [
+                (window["train_start"], window["train_end"], params, checkpoints[position][window["train_start"]])
+                for window in windows
+                for position, params in enumerate(param_sets)
+            ]
+            train_metrics = list(map_function(WalkForward.run_segment, tasks))
+            train_results = []
+
+            for window in windows:
+                runs = train_metrics[window["window"] * len(param_sets):(window["window"] + 1) * len(param_sets)]
+                best_params[window["window"]] = max(range(len(param_sets)), key=lambda position: runs[position][self.sort_by])
+                train_results.extend(
+                    {"window": window["window"], **params, **metrics} for params, metrics in zip(param_sets, runs)
+                )
+
+            self.train_results = pd.DataFrame(train_results)
+
+        tasks = [
+            (
+                window["test_start"],
+                window["test_end"],
+                param_sets[best_params[window["window"]]],
+                checkpoints[best_params[window["window"]]][window["test_start"]],
+            )
+            for window in windows
+        ]
+        test_metrics = map_function(WalkForward.run_segment, tasks)
+        timestamps = self.get_timestamps()
+
+        return pd.DataFrame([
+            {
+                **self.get_window_bounds(window, timestamps),
+                **param_sets[best_params[window["window"]]],
+                **metrics,
+            }
+            for window, metrics in zip(windows, test_metrics)
+        ])
+
+    def get_window_bounds(self, window, timestamps):
+        # Timestamps of the first and last bar of the segments when the market info has them, positions otherwise
+        bounds = {"window": window["window"]}
+
+        for segment in ["train", "test"]:
+            start, end = window[f"{segment}_start"], window[f"{segment}_end"]
+
+            if timestamps is None:
+                bounds[f"{segment}_start"], bounds[f"{segment}_end"] = start, end
+            else:
+                bounds[f"{segment}_start"] = timestamps[start] if end > start else None
+                bounds[f"{segment}_end"] = timestamps[end - 1] if end > start else None
+
+        return bounds
+
+    def get_timestamps(self):
+        if self.prices_info.index.name == "timestamp":
+            return self.prices_info.index
+        elif "timestamp" in self.prices_info.columns:
+            return self.prices_info["timestamp"].array
+
+        return None
+
+    @staticmethod
+    def init_worker(descriptor, strategy_cls, instrument, initial_balance, periods_per_year, prices_info=None):
+        _worker.clear()
+
+        if descriptor is not None:
+            _worker["memory"], prices_info = SharedFrame.attach(descriptor)
+
+        _worker["prices_info"] = prices_info
+        _worker["strategy_cls"] = strategy_cls
+        _worker["instrument"] = instrument
+        _worker["initial_balance"] = initial_balance
+        _worker["periods_per_year"] = periods_per_year
+
+    @staticmethod
+    def run_segment(task):
+        start, end, params, checkpoint = task
+        strategy = _worker["strategy_cls"](_worker["prices_info"].copy(deep=False), **params)
+        strategy.start_bar = start
+        strategy.end_bar = end
+
+        if start > 0:
+            strategy.set_state(checkpoint)
+
+        backtester = Backtester(strategy, _worker["instrument"], Account(_worker["initial_balance"]), record_store=True)
+        backtester.run()
+
+        return backtester.get_analytics(periods_per_year=_worker["periods_per_year"]).metrics
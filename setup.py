@@ -16,6 +16,7 @@ setuptools.setup(
         "Bug Tracker": "https://github.com/EladioRocha/backtestify/issues"
     },
     license="Apache License 2.0",
-    packages=["backtestify"],
-    install_requires=["pandas"]
+    packages=["backtestify", "backtestify.bench", "backtestify.indicators"],
+    install_requires=["numpy", "pandas"],
+    extras_require={"numba": ["numba"], "arrow": ["pyarrow"]}
 )
\ No newline at end of file